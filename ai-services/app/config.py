@@ -3,7 +3,7 @@ Configuration settings for AI services using OpenRouter API.
 """
 
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseSettings, validator
 
 
@@ -18,6 +18,21 @@ class Settings(BaseSettings):
     # OpenRouter API settings
     OPENROUTER_API_KEY: str = os.getenv("OPENROUTER_API_KEY", "")
     OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
+    OPENROUTER_TIMEOUT: float = float(os.getenv("OPENROUTER_TIMEOUT", "120"))
+    
+    # Shared HTTP connection pool for OpenRouter traffic
+    OPENROUTER_MAX_CONNECTIONS: int = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "100"))
+    OPENROUTER_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENROUTER_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENROUTER_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "30"))
+    OPENROUTER_HTTP2: bool = os.getenv("OPENROUTER_HTTP2", "true").lower() == "true"
+    
+    # Startup: services initialise in the background and the /models catalog is cached on disk
+    MODEL_CATALOG_CACHE_PATH: str = os.getenv("MODEL_CATALOG_CACHE_PATH", "/tmp/dms_openrouter_models.json")
+    MODEL_CATALOG_CACHE_TTL_SECONDS: int = int(os.getenv("MODEL_CATALOG_CACHE_TTL_SECONDS", "86400"))
+    SERVICE_READY_TIMEOUT_SECONDS: float = float(os.getenv("SERVICE_READY_TIMEOUT_SECONDS", "10"))
+    # Exponential backoff between retries of failed initialization and catalog refreshes
+    SERVICE_INIT_RETRY_BASE_SECONDS: float = float(os.getenv("SERVICE_INIT_RETRY_BASE_SECONDS", "5"))
+    SERVICE_INIT_RETRY_MAX_SECONDS: float = float(os.getenv("SERVICE_INIT_RETRY_MAX_SECONDS", "300"))
     
     # Model configurations for different tasks
     OCR_MODEL: str = os.getenv("OCR_MODEL", "anthropic/claude-3-haiku")
@@ -44,12 +59,119 @@ class Settings(BaseSettings):
     
     # Processing limits
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB read size when spooling uploads
+    UPLOAD_TEMP_DIR: str = os.getenv("UPLOAD_TEMP_DIR", "")
     MAX_BATCH_SIZE: int = 10
+    OCR_BATCH_WINDOW: int = int(os.getenv("OCR_BATCH_WINDOW", "3"))  # Files in OCR at once per batch
     MAX_TEXT_LENGTH: int = 50000
+    CLASSIFICATION_CONTENT_TOKENS: int = int(os.getenv("CLASSIFICATION_CONTENT_TOKENS", "1250"))  # ~5000 chars
+    
+    # Completion token caps; calls reserve less when the task needs less
+    CLASSIFICATION_MAX_TOKENS: int = int(os.getenv("CLASSIFICATION_MAX_TOKENS", "800"))
+    EXTRACTION_MAX_TOKENS: int = int(os.getenv("EXTRACTION_MAX_TOKENS", "3000"))
+    ANALYSIS_MAX_TOKENS: int = int(os.getenv("ANALYSIS_MAX_TOKENS", "4000"))
+    
+    CHUNK_MAX_CHARS: int = int(os.getenv("CHUNK_MAX_CHARS", "12000"))  # Longer content is map-reduced
+    CHUNK_CONCURRENCY: int = int(os.getenv("CHUNK_CONCURRENCY", "4"))
+    MAX_CLASSIFY_BATCH_SIZE: int = int(os.getenv("MAX_CLASSIFY_BATCH_SIZE", "50"))
+    BATCH_CLASSIFY_CONCURRENCY: int = int(os.getenv("BATCH_CLASSIFY_CONCURRENCY", "8"))
+    BATCH_CLASSIFY_ITEM_TIMEOUT: float = float(os.getenv("BATCH_CLASSIFY_ITEM_TIMEOUT", "90"))
+    
+    # Packing of short documents into shared batch classification requests
+    CLASSIFICATION_PACKING_ENABLED: bool = os.getenv("CLASSIFICATION_PACKING_ENABLED", "false").lower() == "true"
+    CLASSIFICATION_PACK_SIZE: int = int(os.getenv("CLASSIFICATION_PACK_SIZE", "8"))
+    CLASSIFICATION_PACK_MAX_DOCUMENT_CHARS: int = int(os.getenv("CLASSIFICATION_PACK_MAX_DOCUMENT_CHARS", "1500"))
+    CLASSIFICATION_PACK_MAX_CHARS: int = int(os.getenv("CLASSIFICATION_PACK_MAX_CHARS", "8000"))
+    
+    # Result cache for classify/extract/analyze model calls
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+    RESULT_CACHE_TTL_SECONDS: int = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+    RESULT_CACHE_REDIS_ENABLED: bool = os.getenv("RESULT_CACHE_REDIS_ENABLED", "false").lower() == "true"
+    RESULT_CACHE_REDIS_PREFIX: str = "dms:ai:result:"
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # JSON output mode (response_format) for models that support it
+    STRUCTURED_OUTPUT_ENABLED: bool = os.getenv("STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+    # Models assumed to accept json_object when the catalog lacks supported_parameters
+    STRUCTURED_OUTPUT_MODEL_PREFIXES: List[str] = ["openai/"]
+    
+    # Adaptive model routing between FAST_MODEL, the task model and ACCURATE_MODEL
+    MODEL_ROUTING_ENABLED: bool = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() == "true"
+    ROUTING_SMALL_DOCUMENT_CHARS: int = int(os.getenv("ROUTING_SMALL_DOCUMENT_CHARS", "2000"))
+    ROUTING_WINDOW_SIZE: int = int(os.getenv("ROUTING_WINDOW_SIZE", "200"))
+    ROUTING_MIN_SAMPLES: int = int(os.getenv("ROUTING_MIN_SAMPLES", "20"))
+    ROUTING_MAX_ERROR_RATE: float = float(os.getenv("ROUTING_MAX_ERROR_RATE", "0.25"))
+    ROUTING_MAX_P95_SECONDS: float = float(os.getenv("ROUTING_MAX_P95_SECONDS", "60"))
     
+    # Retries of transient upstream errors (429, 5xx, timeouts)
+    RETRY_MAX_ATTEMPTS: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    RETRY_AFTER_MAX_SECONDS: float = float(os.getenv("RETRY_AFTER_MAX_SECONDS", "30"))
+    
+    # Per-model circuit breaker
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    
+    # Client-side limits on OpenRouter traffic across all uvicorn workers
+    UPSTREAM_RATE_LIMIT_ENABLED: bool = os.getenv("UPSTREAM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    UPSTREAM_REQUESTS_PER_SECOND: float = float(os.getenv("UPSTREAM_REQUESTS_PER_SECOND", "20"))
+    UPSTREAM_BURST: float = float(os.getenv("UPSTREAM_BURST", "40"))
+    # Share one bucket through Redis; otherwise each worker gets 1/WEB_CONCURRENCY of the rate
+    UPSTREAM_RATE_LIMIT_REDIS_ENABLED: bool = os.getenv("UPSTREAM_RATE_LIMIT_REDIS_ENABLED", "false").lower() == "true"
+    UPSTREAM_RATE_LIMIT_REDIS_KEY: str = "dms:ai:upstream_bucket"
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "4"))
+    # AIMD concurrency bounds per worker and the latency that counts as overload
+    UPSTREAM_CONCURRENCY_INITIAL: int = int(os.getenv("UPSTREAM_CONCURRENCY_INITIAL", "16"))
+    UPSTREAM_CONCURRENCY_MIN: int = int(os.getenv("UPSTREAM_CONCURRENCY_MIN", "2"))
+    UPSTREAM_CONCURRENCY_MAX: int = int(os.getenv("UPSTREAM_CONCURRENCY_MAX", "64"))
+    UPSTREAM_LATENCY_TARGET_SECONDS: float = float(os.getenv("UPSTREAM_LATENCY_TARGET_SECONDS", "30"))
+    
+    # Hedged requests: race a fallback model when the primary is slower than its usual p95
+    HEDGING_ENABLED: bool = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_DEFAULT_DELAY_SECONDS: float = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "15"))
+    HEDGE_MIN_DELAY_SECONDS: float = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "2"))
+    HEDGE_MAX_DELAY_SECONDS: float = float(os.getenv("HEDGE_MAX_DELAY_SECONDS", "30"))
+    # Hedges allowed per primary request, and the largest burst of hedges
+    HEDGE_BUDGET_RATIO: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+    HEDGE_BUDGET_BURST: float = float(os.getenv("HEDGE_BUDGET_BURST", "5"))
+    # Fallback per model, used for hedges and while a model's circuit is open
+    HEDGE_FALLBACK_MODELS: Dict[str, str] = {
+        "anthropic/claude-3-haiku": "openai/gpt-3.5-turbo",
+        "openai/gpt-3.5-turbo": "anthropic/claude-3-haiku",
+        "anthropic/claude-3-sonnet": "anthropic/claude-3-haiku",
+        "anthropic/claude-3-opus": "anthropic/claude-3-sonnet",
+    }
+    
+    # Local fast-path classifier (escalates to CLASSIFICATION_MODEL below the threshold)
+    LOCAL_CLASSIFIER_ENABLED: bool = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() == "true"
+    LOCAL_CLASSIFIER_MODEL_PATH: str = os.getenv("LOCAL_CLASSIFIER_MODEL_PATH", "models/local_classifier.npz")
+    LOCAL_CLASSIFIER_THRESHOLD: float = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.95"))
+    LOCAL_CLASSIFIER_TRAINING_LOG: str = os.getenv("LOCAL_CLASSIFIER_TRAINING_LOG", "")
+    LOCAL_CLASSIFIER_MIN_TRAINING_CONFIDENCE: float = float(os.getenv("LOCAL_CLASSIFIER_MIN_TRAINING_CONFIDENCE", "0.8"))
+    
+    # Per-request stage tracing (Server-Timing header, optional JSONL export)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "")
+    TRACE_EXPORT_SAMPLE_RATE: float = float(os.getenv("TRACE_EXPORT_SAMPLE_RATE", "1.0"))
+
+    # Anonymised OpenRouter traffic recording for replay load tests (directory; empty disables)
+    OPENROUTER_RECORD_PATH: str = os.getenv("OPENROUTER_RECORD_PATH", "")
+    OPENROUTER_RECORD_SAMPLE_RATE: float = float(os.getenv("OPENROUTER_RECORD_SAMPLE_RATE", "1.0"))
+    OPENROUTER_RECORD_FLUSH_SECONDS: float = float(os.getenv("OPENROUTER_RECORD_FLUSH_SECONDS", "5"))
+    # Key for the document hashes in recordings; share it across workers so repeats match.
+    # Keep it separate from any auth secret. Unset: a random key per worker
+    OPENROUTER_RECORD_HASH_KEY: str = os.getenv("OPENROUTER_RECORD_HASH_KEY", "")
+
     # Rate limiting
-    RATE_LIMIT_PER_MINUTE: int = 60
-    RATE_LIMIT_PER_HOUR: int = 1000
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+    RATE_LIMIT_PER_HOUR: int = int(os.getenv("RATE_LIMIT_PER_HOUR", "1000"))
+    # Per-user counts are shared across workers through Redis, synced in batches;
+    # enable with more than one worker (each worker otherwise enforces the limits alone)
+    RATE_LIMIT_REDIS_ENABLED: bool = os.getenv("RATE_LIMIT_REDIS_ENABLED", "false").lower() == "true"
+    RATE_LIMIT_SYNC_INTERVAL: float = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "1"))
+    RATE_LIMIT_REDIS_PREFIX: str = "dms:ai:ratelimit:"
     
     # Security
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key")
@@ -63,6 +185,11 @@ class Settings(BaseSettings):
     TESSERACT_CMD: str = os.getenv("TESSERACT_CMD", "tesseract")
     SUPPORTED_LANGUAGES: List[str] = ["eng", "fra", "deu", "spa", "ita", "por", "rus", "chi_sim", "jpn", "ara"]
     
+    # OCR process pool (0 workers = split CPUs evenly across uvicorn workers)
+    OCR_POOL_WORKERS: int = int(os.getenv("OCR_POOL_WORKERS", "0"))
+    OCR_POOL_START_METHOD: str = os.getenv("OCR_POOL_START_METHOD", "spawn")
+    OCR_POOL_WARM_MODULES: List[str] = ["numpy", "cv2", "PIL.Image", "pytesseract", "skimage"]
+    
     # AI prompt templates
     CLASSIFICATION_PROMPT: str = """
     Analyze the following document content and classify it into appropriate categories.
@@ -3,42 +3,116 @@ Document classification service using OpenRouter AI models.
 Provides intelligent document categorization and tagging.
 """
 
-from typing import Dict, List, Optional, Any
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional, Any, AsyncGenerator, Tuple
 import structlog
+from prometheus_client import Counter
 
+from .local_classifier import LocalClassifier
+from .model_router import model_router
 from .openrouter_client import OpenRouterClient
 from ..config import settings
+from ..utils.json_output import parse_json_reply
+from ..utils.tokens import fit_text_to_tokens
+from ..utils.tracing import span
 
 logger = structlog.get_logger(__name__)
 
+CLASSIFICATION_PATH = Counter(
+    "ai_classification_path_total",
+    "Classifications answered by the local fast path versus the LLM",
+    ["path"]
+)
+
+# Fields requested from the model for every classified document
+CLASSIFICATION_FIELDS = [
+    "primary_category: Main document category (Legal, Financial, Technical, Medical, HR, Marketing, etc.)",
+    "secondary_categories: List of subcategories",
+    "document_type: Specific document type (Contract, Invoice, Report, Manual, etc.)",
+    "confidence: Confidence score (0.0 to 1.0)",
+    "tags: Relevant tags and keywords (list of strings)",
+    "subject_area: Subject matter or domain",
+    "language: Primary language detected",
+    "formality_level: Formal, Semi-formal, or Informal",
+    "target_audience: Intended audience (Internal, External, Public, etc.)",
+    "urgency_level: Low, Medium, High, or Critical",
+    "sensitivity_level: Public, Internal, Confidential, or Restricted",
+    "action_required: Whether the document requires action (boolean)",
+    "key_topics: Main topics covered (list)",
+    "industry_vertical: Relevant industry sector if applicable",
+    "compliance_indicators: Regulatory or compliance relevance"
+]
+CLASSIFICATION_KEYS = [field.split(":", 1)[0] for field in CLASSIFICATION_FIELDS]
+
 
 class ClassificationService:
     """Service for AI-powered document classification."""
     
-    def __init__(self):
-        self.openrouter_client = None
+    def __init__(self, openrouter_client: Optional[OpenRouterClient] = None):
+        self.openrouter_client = openrouter_client
         self.model = settings.CLASSIFICATION_MODEL
+        self.local_classifier: Optional[LocalClassifier] = None
         self.is_initialized = False
+        # initializing, ready or failed; reported by /health
+        self.status = "initializing"
+        self.init_error: Optional[str] = None
+        self._init_done = asyncio.Event()
     
     async def initialize(self):
-        """Initialize the classification service."""
+        """
+        Initialize the classification service without blocking on the network.
+        
+        The model catalog comes from its disk cache (refreshed in the
+        background), so a slow or unreachable OpenRouter cannot delay or
+        fail startup, and a missing or broken local classifier only disables
+        the fast path. Any other failure is recorded in ``status`` and
+        ``init_error`` and raised, and waiting requests fail fast.
+        """
         try:
-            self.openrouter_client = OpenRouterClient()
-            
-            # Test the connection
-            await self.openrouter_client.get_models()
+            if self.openrouter_client is None:
+                self.openrouter_client = OpenRouterClient()
             
-            self.is_initialized = True
-            logger.info("Classification service initialized", model=self.model)
+            await self.openrouter_client.load_model_catalog()
+            await asyncio.to_thread(self._load_local_classifier)
             
         except Exception as e:
+            self.status = "failed"
+            self.init_error = str(e)
+            self._init_done.set()
             logger.error("Failed to initialize classification service", error=str(e))
             raise
+        
+        self.is_initialized = True
+        self.status = "ready"
+        self._init_done.set()
+        logger.info("Classification service initialized", model=self.model)
+    
+    async def wait_until_ready(self, timeout: Optional[float] = None):
+        """
+        Wait for background initialization to finish.
+        
+        Raises:
+            ValueError: If the service is not ready within ``timeout``
+                (default ``SERVICE_READY_TIMEOUT_SECONDS``) or failed to initialize
+        """
+        if not self.is_initialized:
+            try:
+                await asyncio.wait_for(
+                    self._init_done.wait(),
+                    timeout if timeout is not None else settings.SERVICE_READY_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+        if not self.is_initialized:
+            raise ValueError(f"Classification service not initialized ({self.status})")
     
     async def classify_content(
         self,
         content: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Classify document content into categories and tags.
@@ -46,27 +120,41 @@ class ClassificationService:
         Args:
             content: Document content to classify
             metadata: Additional document metadata
+            use_cache: Set to False to bypass the model result cache
             
         Returns:
             Classification results including categories, tags, and confidence scores
         """
         try:
-            if not self.is_initialized:
-                raise ValueError("Classification service not initialized")
+            await self.wait_until_ready()
             
             logger.info("Starting document classification", content_length=len(content))
             
+            with span("local_classifier"):
+                local_result = await self._classify_locally(content, metadata)
+            if local_result is not None:
+                return local_result
+            
             # Prepare classification prompt
-            classification_prompt = self._build_classification_prompt(content, metadata)
+            with span("prompt_build"):
+                classification_prompt = self._build_classification_prompt(content, metadata)
+            model = model_router.choose("classification", len(content))
             
             # Use OpenRouter client for classification
             result = await self.openrouter_client.classify_content(
                 content=classification_prompt,
-                model=self.model
+                model=model,
+                use_cache=use_cache
             )
             
             # Enhance results with additional processing
-            enhanced_result = await self._enhance_classification_result(result, content, metadata)
+            with span("enhance"):
+                enhanced_result = await self._enhance_classification_result(
+                    result, content, metadata, model_used=result.pop("model_used", model)
+                )
+            CLASSIFICATION_PATH.labels(path="llm").inc()
+            with span("training_log"):
+                await self._record_training_example(content, enhanced_result)
             
             logger.info("Document classification completed", 
                        primary_category=enhanced_result.get("primary_category"),
@@ -78,50 +166,331 @@ class ClassificationService:
             logger.error("Document classification failed", error=str(e))
             raise
     
+    async def stream_classify(
+        self,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Classify document content, emitting result fields as the model produces them.
+        
+        Args:
+            content: Document content to classify
+            metadata: Additional document metadata
+            
+        Yields:
+            ("field", ...) and ("item", ...) events while streaming, then
+            ("result", enhanced_classification)
+        """
+        await self.wait_until_ready()
+        
+        local_result = await self._classify_locally(content, metadata)
+        if local_result is not None:
+            yield "result", local_result
+            return
+        
+        classification_prompt = self._build_classification_prompt(content, metadata)
+        model = model_router.choose("classification", len(content))
+        
+        async for event, data in self.openrouter_client.stream_classification(
+            content=classification_prompt,
+            model=model
+        ):
+            if event != "result":
+                yield event, data
+                continue
+            
+            enhanced_result = await self._enhance_classification_result(
+                data, content, metadata, model_used=model
+            )
+            CLASSIFICATION_PATH.labels(path="llm").inc()
+            await self._record_training_example(content, enhanced_result)
+            yield "result", enhanced_result
+    
+    def _load_local_classifier(self):
+        """Load the local fast-path classifier if one has been trained."""
+        path = settings.LOCAL_CLASSIFIER_MODEL_PATH
+        if not settings.LOCAL_CLASSIFIER_ENABLED or not os.path.exists(path):
+            return
+        
+        try:
+            self.local_classifier = LocalClassifier.load(path)
+            logger.info("Local classifier loaded", path=path, categories=self.local_classifier.classes)
+        except Exception as e:
+            logger.warning("Failed to load local classifier", path=path, error=str(e))
+    
+    async def _classify_locally(
+        self,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Answer from the local classifier when it is confident enough, else return None."""
+        if self.local_classifier is None:
+            return None
+        
+        prediction = self.local_classifier.predict(content)
+        if prediction["confidence"] < settings.LOCAL_CLASSIFIER_THRESHOLD:
+            logger.info("Local classifier not confident, escalating to LLM",
+                       primary_category=prediction["primary_category"],
+                       confidence=prediction["confidence"])
+            return None
+        
+        CLASSIFICATION_PATH.labels(path="local").inc()
+        # Fields the local model does not predict stay null rather than guessed
+        result = dict.fromkeys(CLASSIFICATION_KEYS)
+        result.update(prediction)
+        return await self._enhance_classification_result(
+            result, content, metadata, model_used=LocalClassifier.MODEL_NAME, fill_defaults=False
+        )
+    
+    async def _record_training_example(self, content: str, result: Dict[str, Any]):
+        """Append a confident LLM classification to the local classifier training log."""
+        path = settings.LOCAL_CLASSIFIER_TRAINING_LOG
+        if not path:
+            return
+        
+        categories = await self.get_supported_categories()
+        if result.get("primary_category") not in categories:
+            return
+        
+        try:
+            if float(result.get("confidence", 0)) < settings.LOCAL_CLASSIFIER_MIN_TRAINING_CONFIDENCE:
+                return
+        except (TypeError, ValueError):
+            return
+        
+        record = json.dumps({
+            "content": content[:5000],
+            "primary_category": result["primary_category"],
+            "document_type": result.get("document_type")
+        })
+        
+        def append():
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(record + "\n")
+        
+        try:
+            await asyncio.to_thread(append)
+        except Exception as e:
+            logger.warning("Failed to record classification training example", error=str(e))
+    
     async def batch_classify(
         self,
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        pack: Optional[bool] = None
     ) -> List[Dict[str, Any]]:
         """
         Classify multiple documents in batch.
         
+        Documents are classified concurrently, at most ``concurrency`` at a
+        time. A failure or timeout only affects its own entry, and results
+        are returned in the same order as ``documents``.
+        
         Args:
             documents: List of document dictionaries with 'content' and optional 'metadata'
+            concurrency: Maximum number of in-flight classifications
+            item_timeout: Per-request timeout in seconds
+            pack: Classify several short documents per model request
             
         Returns:
             List of classification results
         """
-        try:
-            logger.info("Starting batch classification", document_count=len(documents))
+        results = [
+            result async for result in self.iter_batch_classify(
+                documents,
+                concurrency=concurrency,
+                item_timeout=item_timeout,
+                pack=pack
+            )
+        ]
+        results.sort(key=lambda r: r["document_index"])
+        
+        return results
+    
+    async def iter_batch_classify(
+        self,
+        documents: List[Dict[str, Any]],
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        pack: Optional[bool] = None
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Classify multiple documents, yielding each result as soon as it completes.
+        
+        Every result carries its ``document_index``; results arrive in
+        completion order, not input order.
+        
+        Args:
+            documents: List of document dictionaries with 'content' and optional 'metadata'
+            concurrency: Maximum number of in-flight model requests
+            item_timeout: Per-request timeout in seconds
+            pack: Classify several short documents per model request
             
-            results = []
-            for i, doc in enumerate(documents):
+        Yields:
+            Classification results tagged with ``document_index``
+        """
+        concurrency = concurrency or settings.BATCH_CLASSIFY_CONCURRENCY
+        item_timeout = item_timeout or settings.BATCH_CLASSIFY_ITEM_TIMEOUT
+        pack = settings.CLASSIFICATION_PACKING_ENABLED if pack is None else pack
+        
+        units = self._plan_batch_units(documents, pack)
+        
+        logger.info("Starting batch classification", 
+                   document_count=len(documents),
+                   request_count=len(units),
+                   concurrency=concurrency)
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def classify_unit(unit: List[int]) -> List[Dict[str, Any]]:
+            fallback: List[int] = []
+            async with semaphore:
                 try:
-                    result = await self.classify_content(
-                        content=doc.get("content", ""),
-                        metadata=doc.get("metadata")
+                    if len(unit) == 1:
+                        index = unit[0]
+                        result = await asyncio.wait_for(
+                            self.classify_content(
+                                content=documents[index].get("content", ""),
+                                metadata=documents[index].get("metadata")
+                            ),
+                            timeout=item_timeout
+                        )
+                        result["document_index"] = index
+                        return [result]
+                    
+                    results, fallback = await asyncio.wait_for(
+                        self._classify_packed(documents, unit),
+                        timeout=item_timeout
                     )
-                    result["document_index"] = i
-                    results.append(result)
                     
+                except asyncio.TimeoutError:
+                    logger.error("Document classification timed out in batch", 
+                               document_indexes=unit, timeout=item_timeout)
+                    return [
+                        self._batch_error(index, f"Classification timed out after {item_timeout}s")
+                        for index in unit
+                    ]
                 except Exception as e:
                     logger.error("Failed to classify document in batch", 
-                               document_index=i, error=str(e))
-                    results.append({
-                        "document_index": i,
-                        "error": str(e),
-                        "success": False
-                    })
+                               document_indexes=unit, error=str(e))
+                    return [self._batch_error(index, str(e)) for index in unit]
+            
+            # Documents the packed request could not answer are classified one request
+            # each, outside this unit's permit so they queue for the semaphore like any other
+            for single in await asyncio.gather(*(classify_unit([index]) for index in fallback)):
+                results.extend(single)
+            return results
+        
+        tasks = [asyncio.create_task(classify_unit(unit)) for unit in units]
+        successful = 0
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for result in await next_done:
+                    if result.get("success", True):
+                        successful += 1
+                    yield result
             
             logger.info("Batch classification completed", 
                        total_documents=len(documents),
-                       successful_classifications=len([r for r in results if r.get("success", True)]))
+                       successful_classifications=successful)
             
-            return results
+        finally:
+            # Stop outstanding work if the consumer went away early
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    def _plan_batch_units(self, documents: List[Dict[str, Any]], pack: bool) -> List[List[int]]:
+        """Group document indexes into model requests, packing short documents together."""
+        if not pack:
+            return [[i] for i in range(len(documents))]
+        
+        units = []
+        current: List[int] = []
+        current_chars = 0
+        
+        for i, doc in enumerate(documents):
+            length = len(doc.get("content", ""))
+            if length > settings.CLASSIFICATION_PACK_MAX_DOCUMENT_CHARS:
+                units.append([i])
+                continue
             
-        except Exception as e:
-            logger.error("Batch classification failed", error=str(e))
-            raise
+            if current and (
+                len(current) >= settings.CLASSIFICATION_PACK_SIZE
+                or current_chars + length > settings.CLASSIFICATION_PACK_MAX_CHARS
+            ):
+                units.append(current)
+                current, current_chars = [], 0
+            
+            current.append(i)
+            current_chars += length
+        
+        if current:
+            units.append(current)
+        
+        return units
+    
+    async def _classify_packed(
+        self,
+        documents: List[Dict[str, Any]],
+        indexes: List[int]
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Classify a group of short documents in one request.
+        
+        Returns the results obtained and the indexes that still need one
+        request each (the packed reply was unusable, or at most one document
+        was left after local classification).
+        """
+        results = []
+        remaining = []
+        
+        # Documents the local classifier is confident about never reach the model
+        for index in indexes:
+            doc = documents[index]
+            local_result = await self._classify_locally(doc.get("content", ""), doc.get("metadata"))
+            if local_result is not None:
+                local_result["document_index"] = index
+                results.append(local_result)
+            else:
+                remaining.append(index)
+        
+        if len(remaining) <= 1:
+            return results, remaining
+        
+        group = [documents[i] for i in remaining]
+        
+        try:
+            packed_results = await self.openrouter_client.classify_packed_content(
+                content=self._build_packed_classification_prompt(group),
+                document_count=len(group),
+                model=self.model
+            )
+        except ValueError as e:
+            logger.warning("Packed classification unusable, classifying individually",
+                          document_indexes=remaining, error=str(e))
+            return results, remaining
+        
+        for index, doc, packed_result in zip(remaining, group, packed_results):
+            content = doc.get("content", "")
+            result = await self._enhance_classification_result(packed_result, content, doc.get("metadata"))
+            result["document_index"] = index
+            CLASSIFICATION_PATH.labels(path="llm").inc()
+            await self._record_training_example(content, result)
+            results.append(result)
+        
+        return results, []
+    
+    def _batch_error(self, index: int, error: str) -> Dict[str, Any]:
+        """Build the per-document error entry used in batch results."""
+        return {
+            "document_index": index,
+            "error": error,
+            "success": False
+        }
     
     def _build_classification_prompt(
         self,
@@ -132,30 +501,34 @@ class ClassificationService:
         
         prompt_parts = [
             "Analyze and classify the following document content:",
-            f"\nCONTENT:\n{content[:5000]}{'...' if len(content) > 5000 else ''}"
+            f"\nCONTENT:\n{fit_text_to_tokens(content, settings.CLASSIFICATION_CONTENT_TOKENS)}"
         ]
         
         if metadata:
             prompt_parts.append(f"\nMETADATA:\n{metadata}")
         
-        prompt_parts.extend([
-            "\nPlease provide a comprehensive classification analysis in JSON format with:",
-            "1. primary_category: Main document category (Legal, Financial, Technical, Medical, HR, Marketing, etc.)",
-            "2. secondary_categories: List of subcategories",
-            "3. document_type: Specific document type (Contract, Invoice, Report, Manual, etc.)",
-            "4. confidence: Confidence score (0.0 to 1.0)",
-            "5. tags: Relevant tags and keywords (list of strings)",
-            "6. subject_area: Subject matter or domain",
-            "7. language: Primary language detected",
-            "8. formality_level: Formal, Semi-formal, or Informal",
-            "9. target_audience: Intended audience (Internal, External, Public, etc.)",
-            "10. urgency_level: Low, Medium, High, or Critical",
-            "11. sensitivity_level: Public, Internal, Confidential, or Restricted",
-            "12. action_required: Whether the document requires action (boolean)",
-            "13. key_topics: Main topics covered (list)",
-            "14. industry_vertical: Relevant industry sector if applicable",
-            "15. compliance_indicators: Regulatory or compliance relevance"
-        ])
+        prompt_parts.append("\nPlease provide a comprehensive classification analysis in JSON format with:")
+        prompt_parts.extend(f"{i}. {field}" for i, field in enumerate(CLASSIFICATION_FIELDS, start=1))
+        
+        return "\n".join(prompt_parts)
+    
+    def _build_packed_classification_prompt(self, documents: List[Dict[str, Any]]) -> str:
+        """Build a single prompt that classifies several short documents at once."""
+        
+        prompt_parts = [
+            f"Analyze and classify each of the following {len(documents)} documents independently:"
+        ]
+        
+        for number, doc in enumerate(documents, start=1):
+            prompt_parts.append(f"\n=== DOCUMENT {number} ===\nCONTENT:\n{doc.get('content', '')}")
+            if doc.get("metadata"):
+                prompt_parts.append(f"METADATA:\n{doc['metadata']}")
+        
+        prompt_parts.append(
+            f"\nRespond with a JSON array of exactly {len(documents)} objects, one per document "
+            "in the order given. Each object must contain document_number (1-based) and:"
+        )
+        prompt_parts.extend(f"{i}. {field}" for i, field in enumerate(CLASSIFICATION_FIELDS, start=1))
         
         return "\n".join(prompt_parts)
     
@@ -163,33 +536,36 @@ class ClassificationService:
         self,
         base_result: Dict[str, Any],
         content: str,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        model_used: Optional[str] = None,
+        fill_defaults: bool = True
     ) -> Dict[str, Any]:
         """Enhance classification results with additional analysis."""
         
         enhanced_result = base_result.copy()
         
         # Ensure required fields exist with defaults
-        enhanced_result.setdefault("primary_category", "Unknown")
-        enhanced_result.setdefault("secondary_categories", [])
-        enhanced_result.setdefault("document_type", "Document")
-        enhanced_result.setdefault("confidence", 0.5)
-        enhanced_result.setdefault("tags", [])
-        enhanced_result.setdefault("subject_area", "General")
-        enhanced_result.setdefault("language", "en")
-        enhanced_result.setdefault("formality_level", "Formal")
-        enhanced_result.setdefault("target_audience", "Internal")
-        enhanced_result.setdefault("urgency_level", "Medium")
-        enhanced_result.setdefault("sensitivity_level", "Internal")
-        enhanced_result.setdefault("action_required", False)
-        enhanced_result.setdefault("key_topics", [])
-        enhanced_result.setdefault("industry_vertical", None)
-        enhanced_result.setdefault("compliance_indicators", [])
+        if fill_defaults:
+            enhanced_result.setdefault("primary_category", "Unknown")
+            enhanced_result.setdefault("secondary_categories", [])
+            enhanced_result.setdefault("document_type", "Document")
+            enhanced_result.setdefault("confidence", 0.5)
+            enhanced_result.setdefault("tags", [])
+            enhanced_result.setdefault("subject_area", "General")
+            enhanced_result.setdefault("language", "en")
+            enhanced_result.setdefault("formality_level", "Formal")
+            enhanced_result.setdefault("target_audience", "Internal")
+            enhanced_result.setdefault("urgency_level", "Medium")
+            enhanced_result.setdefault("sensitivity_level", "Internal")
+            enhanced_result.setdefault("action_required", False)
+            enhanced_result.setdefault("key_topics", [])
+            enhanced_result.setdefault("industry_vertical", None)
+            enhanced_result.setdefault("compliance_indicators", [])
         
         # Add processing metadata
         enhanced_result.update({
             "processing_info": {
-                "model_used": self.model,
+                "model_used": model_used or self.model,
                 "content_length": len(content),
                 "processing_timestamp": None,  # Will be set by caller
                 "version": "1.0"
@@ -253,6 +629,8 @@ class ClassificationService:
     async def suggest_tags(self, content: str, category: Optional[str] = None) -> List[str]:
         """Suggest relevant tags for document content."""
         try:
+            await self.wait_until_ready()
+            
             # Use a simpler prompt for tag suggestion
             tag_prompt = f"""
             Suggest 5-10 relevant tags for the following document content:
@@ -269,33 +647,29 @@ class ClassificationService:
             Example: ["contract", "legal", "agreement", "terms", "commercial"]
             """
             
-            async with OpenRouterClient() as client:
-                messages = client.format_messages(
-                    system_prompt="You are a document tagging expert. Generate relevant tags as JSON arrays.",
-                    user_content=tag_prompt
-                )
-                
-                response = await client.chat_completion(
-                    model=settings.FAST_MODEL,  # Use faster model for tag suggestions
-                    messages=messages,
-                    temperature=0.3,
-                    max_tokens=200
-                )
-                
-                content_result = response["choices"][0]["message"]["content"]
-                
-                # Try to parse as JSON array
-                try:
-                    import json
-                    tags = json.loads(content_result)
-                    if isinstance(tags, list):
-                        return [str(tag) for tag in tags[:10]]  # Limit to 10 tags
-                except:
-                    pass
-                
-                # Fallback: extract tags from text
-                return self._extract_tags_from_text(content_result)
-                
+            client = self.openrouter_client
+            messages = client.format_messages(
+                system_prompt="You are a document tagging expert. Generate relevant tags as JSON arrays.",
+                user_content=tag_prompt
+            )
+            
+            response = await client.chat_completion(
+                model=settings.FAST_MODEL,  # Use faster model for tag suggestions
+                messages=messages,
+                temperature=0.3,
+                max_tokens=200
+            )
+            
+            content_result = response["choices"][0]["message"]["content"]
+            
+            # Try to parse as JSON array
+            tags = parse_json_reply(content_result, "tags", expected=list)
+            if isinstance(tags, list):
+                return [str(tag) for tag in tags[:10]]  # Limit to 10 tags
+            
+            # Fallback: extract tags from text
+            return self._extract_tags_from_text(content_result)
+            
         except Exception as e:
             logger.error("Tag suggestion failed", error=str(e))
             return []
@@ -0,0 +1,250 @@
+"""
+Local CPU-only document classifier used as a fast path in front of the LLM.
+A multinomial naive Bayes model over hashed word features, trained from past
+LLM classification results.
+
+Usage:
+    python -m app.services.local_classifier train --data results.jsonl --model local_classifier.npz
+    python -m app.services.local_classifier evaluate --data results.jsonl --model local_classifier.npz
+"""
+
+import argparse
+import json
+import random
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9'&-]+")
+
+
+class LocalClassifier:
+    """Multinomial naive Bayes classifier over hashed bag-of-words features."""
+
+    MODEL_NAME = "local"
+
+    def __init__(self, n_features: int = 2 ** 16, max_chars: int = 5000):
+        self.n_features = n_features
+        self.max_chars = max_chars
+        self.classes: List[str] = []
+        self.document_types: List[str] = []
+        self.class_log_prior: Optional[np.ndarray] = None
+        self.feature_log_prob: Optional[np.ndarray] = None
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return hashed feature indexes and their counts for a document."""
+        tokens = TOKEN_PATTERN.findall(text[:self.max_chars].lower())
+        if not tokens:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # crc32 keeps hashes stable across processes, unlike hash()
+        hashed = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) % self.n_features for token in tokens),
+            dtype=np.int64,
+            count=len(tokens)
+        )
+        indexes, counts = np.unique(hashed, return_counts=True)
+        return indexes, counts.astype(np.float32)
+
+    def fit(
+        self,
+        texts: List[str],
+        labels: List[str],
+        document_types: Optional[List[str]] = None,
+        alpha: float = 1.0
+    ) -> "LocalClassifier":
+        """
+        Train the classifier.
+
+        Args:
+            texts: Document contents
+            labels: Primary category for each document
+            document_types: Optional document type for each document; the most
+                frequent type per category is reported with predictions
+            alpha: Additive (Laplace) smoothing
+
+        Returns:
+            The fitted classifier
+        """
+        if not texts or len(texts) != len(labels):
+            raise ValueError("texts and labels must be non-empty and of equal length")
+
+        self.classes = sorted(set(labels))
+        class_index = {label: i for i, label in enumerate(self.classes)}
+
+        feature_counts = np.zeros((len(self.classes), self.n_features), dtype=np.float64)
+        class_counts = np.zeros(len(self.classes), dtype=np.float64)
+
+        for text, label in zip(texts, labels):
+            row = class_index[label]
+            indexes, counts = self._features(text)
+            np.add.at(feature_counts[row], indexes, counts)
+            class_counts[row] += 1
+
+        smoothed = feature_counts + alpha
+        self.feature_log_prob = (
+            np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        ).astype(np.float32)
+        self.class_log_prior = np.log(class_counts / class_counts.sum()).astype(np.float32)
+
+        types_by_class: Dict[str, Counter] = {label: Counter() for label in self.classes}
+        for label, document_type in zip(labels, document_types or [None] * len(labels)):
+            if document_type:
+                types_by_class[label][document_type] += 1
+        self.document_types = [
+            types_by_class[label].most_common(1)[0][0] if types_by_class[label] else "Document"
+            for label in self.classes
+        ]
+
+        return self
+
+    def predict(self, text: str) -> Dict[str, Any]:
+        """
+        Predict the primary category of a document.
+
+        Returns:
+            Dictionary with primary_category, document_type and confidence
+        """
+        if self.feature_log_prob is None:
+            raise ValueError("Local classifier has not been trained")
+
+        indexes, counts = self._features(text)
+        joint_log_likelihood = self.class_log_prior + self.feature_log_prob[:, indexes] @ counts
+
+        # The raw joint log-likelihood grows with document length, so its softmax
+        # saturates at 1.0 for any real document. Scoring per token keeps the
+        # confidence meaningful against the threshold; the argmax is unchanged.
+        per_token = joint_log_likelihood / max(float(counts.sum()), 1.0)
+        shifted = np.exp(per_token - per_token.max())
+        probabilities = shifted / shifted.sum()
+        best = int(probabilities.argmax())
+
+        return {
+            "primary_category": self.classes[best],
+            "document_type": self.document_types[best],
+            "confidence": float(probabilities[best])
+        }
+
+    def evaluate(self, texts: List[str], labels: List[str], threshold: float) -> Dict[str, float]:
+        """
+        Measure accuracy overall and on the documents the fast path would answer.
+
+        Returns:
+            Dictionary with accuracy, coverage (share answered locally at the
+            threshold) and accepted_accuracy (accuracy on that share)
+        """
+        correct = accepted = accepted_correct = 0
+
+        for text, label in zip(texts, labels):
+            prediction = self.predict(text)
+            hit = prediction["primary_category"] == label
+            correct += hit
+            if prediction["confidence"] >= threshold:
+                accepted += 1
+                accepted_correct += hit
+
+        total = len(texts) or 1
+        return {
+            "documents": len(texts),
+            "accuracy": correct / total,
+            "coverage": accepted / total,
+            "accepted_accuracy": accepted_correct / accepted if accepted else 0.0
+        }
+
+    def save(self, path: str) -> None:
+        """Persist the trained model as a compressed NumPy archive."""
+        np.savez_compressed(
+            path,
+            n_features=np.array(self.n_features),
+            max_chars=np.array(self.max_chars),
+            classes=np.array(self.classes),
+            document_types=np.array(self.document_types),
+            class_log_prior=self.class_log_prior,
+            feature_log_prob=self.feature_log_prob
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        """Load a model written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            classifier = cls(n_features=int(data["n_features"]), max_chars=int(data["max_chars"]))
+            classifier.classes = [str(c) for c in data["classes"]]
+            classifier.document_types = [str(t) for t in data["document_types"]]
+            classifier.class_log_prior = data["class_log_prior"]
+            classifier.feature_log_prob = data["feature_log_prob"]
+
+        return classifier
+
+
+def load_training_data(path: str) -> Tuple[List[str], List[str], List[str]]:
+    """Read the JSONL log of LLM classifications written by ClassificationService."""
+    texts, labels, document_types = [], [], []
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("content") and record.get("primary_category"):
+                texts.append(record["content"])
+                labels.append(record["primary_category"])
+                document_types.append(record.get("document_type"))
+
+    return texts, labels, document_types
+
+
+def _split(records: List[Tuple[str, str, str]], holdout: float, seed: int):
+    """Shuffle and split records into training and holdout sets."""
+    records = list(records)
+    random.Random(seed).shuffle(records)
+    cut = int(len(records) * (1 - holdout))
+    return records[:cut], records[cut:]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point for training and evaluating the local classifier."""
+    from ..config import settings
+
+    parser = argparse.ArgumentParser(description="Train or evaluate the local fast-path classifier")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train a model from logged LLM results")
+    train_parser.add_argument("--data", required=True, help="JSONL file of logged LLM classifications")
+    train_parser.add_argument("--model", default=settings.LOCAL_CLASSIFIER_MODEL_PATH, help="Output model path")
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    train_parser.add_argument("--seed", type=int, default=42)
+
+    eval_parser = subparsers.add_parser("evaluate", help="Evaluate a trained model")
+    eval_parser.add_argument("--data", required=True, help="JSONL file of logged LLM classifications")
+    eval_parser.add_argument("--model", default=settings.LOCAL_CLASSIFIER_MODEL_PATH, help="Model path")
+
+    for sub in (train_parser, eval_parser):
+        sub.add_argument("--threshold", type=float, default=settings.LOCAL_CLASSIFIER_THRESHOLD)
+
+    args = parser.parse_args(argv)
+    texts, labels, document_types = load_training_data(args.data)
+
+    if args.command == "train":
+        train, holdout = _split(zip(texts, labels, document_types), args.holdout, args.seed)
+        classifier = LocalClassifier().fit(
+            [r[0] for r in train], [r[1] for r in train], [r[2] for r in train]
+        )
+        classifier.save(args.model)
+        print(f"Trained on {len(train)} documents, {len(classifier.classes)} categories -> {args.model}")
+
+        if holdout:
+            metrics = classifier.evaluate([r[0] for r in holdout], [r[1] for r in holdout], args.threshold)
+            print(json.dumps(metrics, indent=2))
+    else:
+        classifier = LocalClassifier.load(args.model)
+        print(json.dumps(classifier.evaluate(texts, labels, args.threshold), indent=2))
+
+
+if __name__ == "__main__":
+    main()
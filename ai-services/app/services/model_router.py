@@ -0,0 +1,192 @@
+"""
+Adaptive model routing.
+Chooses between FAST_MODEL, the task's configured model and ACCURATE_MODEL
+from document size, the caller's latency tier and observed model health.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+ROUTING_DECISIONS = Counter(
+    "ai_model_routing_decisions_total",
+    "Model routing decisions by task, chosen model and reason",
+    ["task", "model", "reason"]
+)
+
+LATENCY_TIERS = ("fast", "standard", "accurate")
+
+# Set per request from the X-Latency-Tier header
+_latency_tier: ContextVar[str] = ContextVar("latency_tier", default="standard")
+
+
+def set_latency_tier(tier: Optional[str]) -> None:
+    """Set the latency tier for model calls in the current request context."""
+    tier = (tier or "").strip().lower()
+    _latency_tier.set(tier if tier in LATENCY_TIERS else "standard")
+
+
+def current_latency_tier() -> str:
+    """Latency tier requested by the current request context."""
+    return _latency_tier.get()
+
+
+def task_model(task: str) -> str:
+    """The configured default model for a task."""
+    return {
+        "classification": settings.CLASSIFICATION_MODEL,
+        "extraction": settings.EXTRACTION_MODEL,
+        "analysis": settings.ANALYSIS_MODEL,
+        "summary": settings.SUMMARY_MODEL,
+    }.get(task, settings.FAST_MODEL)
+
+
+class ModelStats:
+    """Rolling window of call latencies and outcomes for one model."""
+
+    def __init__(self, window_size: int):
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window_size)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self._samples.append((latency, ok))
+
+    @property
+    def count(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0-100) over successful calls, or None without data."""
+        latencies = sorted(latency for latency, ok in self._samples if ok)
+        if not latencies:
+            return None
+        index = min(int(round(q / 100 * (len(latencies) - 1))), len(latencies) - 1)
+        return latencies[index]
+
+    @property
+    def error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+
+
+class ModelRouter:
+    """Picks a model per request and tracks per-model latency and error rates."""
+
+    def __init__(self, window_size: Optional[int] = None):
+        self.window_size = window_size or settings.ROUTING_WINDOW_SIZE
+        self._stats: Dict[str, ModelStats] = {}
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        """Record the outcome of one upstream call."""
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats(self.window_size)
+        stats.record(latency, ok)
+
+    @contextmanager
+    def track(self, model: str) -> Iterator[None]:
+        """Record the latency and outcome of the upstream call made inside this block."""
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Abandoned calls say nothing about the model's health
+            raise
+        except Exception:
+            self.record(model, time.monotonic() - started, ok=False)
+            raise
+        self.record(model, time.monotonic() - started, ok=True)
+
+    def latency_percentile(self, model: str, q: float) -> Optional[float]:
+        """Observed latency percentile for a model, or None if it has no successful calls."""
+        stats = self._stats.get(model)
+        return stats.percentile(q) if stats else None
+
+    def is_healthy(self, model: str) -> bool:
+        """Whether a model's recent error rate and p95 latency are within limits."""
+        stats = self._stats.get(model)
+        if stats is None or stats.count < settings.ROUTING_MIN_SAMPLES:
+            # Not enough data to judge; assume healthy
+            return True
+
+        if stats.error_rate > settings.ROUTING_MAX_ERROR_RATE:
+            return False
+
+        p95 = stats.percentile(95)
+        return p95 is None or p95 <= settings.ROUTING_MAX_P95_SECONDS
+
+    def _candidates(self, task: str, content_length: int, tier: str) -> Tuple[List[str], str]:
+        """Ordered candidate models and the reason for the preferred one."""
+        default = task_model(task)
+
+        if tier == "fast":
+            candidates = [settings.FAST_MODEL, default]
+            # Prefer whichever has actually been answering faster
+            p50 = {m: self.latency_percentile(m, 50) for m in candidates}
+            if all(v is not None for v in p50.values()):
+                candidates.sort(key=lambda m: p50[m])
+            return candidates, "tier_fast"
+
+        if tier == "accurate":
+            return [settings.ACCURATE_MODEL, default], "tier_accurate"
+
+        if content_length <= settings.ROUTING_SMALL_DOCUMENT_CHARS:
+            return [settings.FAST_MODEL, default], "small_document"
+
+        return [default, settings.FAST_MODEL], "default"
+
+    def choose(self, task: str, content_length: int, tier: Optional[str] = None) -> str:
+        """
+        Choose the model for one request.
+
+        Args:
+            task: classification, extraction, analysis or summary
+            content_length: Length of the document content in characters
+            tier: Latency tier; defaults to the current request's tier
+
+        Returns:
+            Model identifier
+        """
+        if not settings.MODEL_ROUTING_ENABLED:
+            return task_model(task)
+
+        tier = tier or current_latency_tier()
+        candidates, reason = self._candidates(task, content_length, tier)
+        # Drop duplicates (e.g. when the task model is FAST_MODEL) keeping order
+        candidates = list(dict.fromkeys(candidates))
+
+        model = next((m for m in candidates if self.is_healthy(m)), candidates[0])
+        if model != candidates[0]:
+            reason = "failover"
+            logger.warning("Routing around unhealthy model",
+                          task=task, unhealthy=candidates[0], model=model)
+
+        ROUTING_DECISIONS.labels(task=task, model=model, reason=reason).inc()
+        return model
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Current per-model statistics, for diagnostics."""
+        return {
+            model: {
+                "samples": stats.count,
+                "p50": stats.percentile(50),
+                "p95": stats.percentile(95),
+                "error_rate": stats.error_rate,
+            }
+            for model, stats in self._stats.items()
+        }
+
+
+# Shared per-process router so every client feeds the same statistics
+model_router = ModelRouter()
+
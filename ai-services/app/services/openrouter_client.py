@@ -3,44 +3,188 @@ OpenRouter API client for AI services integration.
 Provides a unified interface for accessing multiple AI models through OpenRouter.
 """
 
+import asyncio
 import json
 import time
-from typing import Dict, List, Optional, Any, AsyncGenerator
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Any, AsyncGenerator, Awaitable, Callable, Tuple
 import httpx
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt
 
 from ..config import settings
+from .model_router import model_router
+from ..utils.cassette import recording_transport
+from ..utils.circuit_breaker import circuit_breakers
+from ..utils.hedging import HEDGED_REQUESTS, HedgeBudget
+from ..utils.incremental_json import IncrementalJSONParser
+from ..utils.metrics import UPSTREAM_REQUEST_SECONDS, UPSTREAM_RETRIES, UPSTREAM_TOKENS
+from ..utils.json_output import (
+    ANALYSIS_SCHEMA,
+    CLASSIFICATION_SCHEMA,
+    EXTRACTION_SCHEMA,
+    JsonReply,
+    response_format_for
+)
+from ..utils.singleflight import SingleFlight
+from ..utils.chunking import merge_partial_results, split_into_chunks
+from ..utils.cache import ResultCache, cache_bypassed, make_cache_key, result_cache
+from ..utils.tracing import span
+from ..utils.upstream_limiter import upstream_limiter
+from ..utils.tokens import (
+    MESSAGE_OVERHEAD_TOKENS,
+    estimate_messages_tokens,
+    estimate_tokens,
+    fit_text_to_tokens,
+    model_catalog
+)
 
 logger = structlog.get_logger(__name__)
 
+# Upstream statuses worth retrying: timeouts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry transport failures and transient HTTP statuses, never other 4xx errors."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+def _is_throttled(exc: BaseException) -> bool:
+    """Whether the upstream rejected a request for exceeding its rate limit."""
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429
+
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    """Errors that mean the model is unavailable, as counted by its circuit breaker."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) from an HTTP error, if present."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    
+    value = exc.response.headers.get("retry-after")
+    if not value:
+        return None
+    
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_label(exc: BaseException) -> str:
+    """Short metric label for an upstream error: the HTTP status or exception type."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return str(exc.response.status_code)
+    return type(exc).__name__
+
+
+def _fallback_response_format(response_format: Optional[Dict[str, Any]], model: str) -> Optional[Dict[str, Any]]:
+    """Rebuild a structured output request for a fallback model, which may not accept the primary's schema."""
+    if not response_format:
+        return None
+    json_schema = response_format.get("json_schema") or {}
+    task = json_schema.get("name", "json_result").removesuffix("_result")
+    return response_format_for(model, task, json_schema.get("schema"))
+
+
+def _record_retry(retry_state: RetryCallState) -> None:
+    exc = retry_state.outcome.exception()
+    UPSTREAM_RETRIES.labels(reason=_error_label(exc)).inc()
+    logger.warning("Retrying OpenRouter request", attempt=retry_state.attempt_number, reason=_error_label(exc))
+
+
+def _retry_delay(exc: BaseException, attempt: int) -> float:
+    """Wait as long as the upstream asked via Retry-After (capped), else back off exponentially (1-10s)."""
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        return min(retry_after, settings.RETRY_AFTER_MAX_SECONDS)
+    return min(10.0, 2.0 ** (attempt - 1))
+
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    return _retry_delay(retry_state.outcome.exception(), retry_state.attempt_number)
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """
+    Create the pooled HTTP client used for all OpenRouter traffic.
+    
+    One instance is meant to be shared per worker process so TLS
+    connections are kept alive and reused across requests. A custom
+    ``transport`` (e.g. a mock upstream for benchmarks) replaces the network.
+    With ``OPENROUTER_RECORD_PATH`` set, traffic is journalled for replay.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.OPENROUTER_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENROUTER_KEEPALIVE_EXPIRY
+    )
+    return httpx.AsyncClient(
+        base_url=settings.OPENROUTER_BASE_URL,
+        headers={
+            "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
+            "HTTP-Referer": "https://dms.yourdomain.com",
+            "X-Title": "Document Management System",
+            "Content-Type": "application/json"
+        },
+        timeout=settings.OPENROUTER_TIMEOUT,
+        limits=limits,
+        http2=settings.OPENROUTER_HTTP2,
+        transport=recording_transport(transport, limits=limits, http2=settings.OPENROUTER_HTTP2)
+    )
+
 
 class OpenRouterClient:
     """Client for interacting with OpenRouter API."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[ResultCache] = None
+    ):
+        self.cache = cache or result_cache
+        self.single_flight = SingleFlight()
+        self.hedge_budget = HedgeBudget()
         self.base_url = settings.OPENROUTER_BASE_URL
         self.api_key = settings.OPENROUTER_API_KEY
-        self.client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "HTTP-Referer": "https://dms.yourdomain.com",
-                "X-Title": "Document Management System",
-                "Content-Type": "application/json"
-            },
-            timeout=120.0
-        )
+        # Only close the HTTP client on exit when this instance created it
+        self._owns_client = http_client is None
+        self.client = http_client or create_http_client()
+        self._catalog_task: Optional[asyncio.Task] = None
+        self._catalog_refreshing = False
+        self.catalog_error: Optional[str] = None
     
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
+        await self.aclose()
+    
+    async def aclose(self):
+        """Stop catalog refreshes and close the underlying HTTP client if this instance owns it."""
+        if self._catalog_task is not None and not self._catalog_task.done():
+            self._catalog_task.cancel()
+        if self._owns_client:
+            await self.client.aclose()
     
     @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
+        retry=retry_if_exception(_is_retryable),
+        stop=stop_after_attempt(settings.RETRY_MAX_ATTEMPTS),
+        wait=_retry_wait,
+        before_sleep=_record_retry,
         reraise=True
     )
     async def chat_completion(
@@ -67,6 +211,8 @@ class OpenRouterClient:
             API response dictionary
         """
         try:
+            requested_model = model
+            model = self._available_model(model)
             payload = {
                 "model": model,
                 "messages": messages,
@@ -74,25 +220,53 @@ class OpenRouterClient:
                 "stream": stream,
                 **kwargs
             }
+            if model != requested_model and payload.get("response_format"):
+                response_format = _fallback_response_format(payload.pop("response_format"), model)
+                if response_format:
+                    payload["response_format"] = response_format
+            
+            prompt_tokens = estimate_messages_tokens(messages)
             
             if max_tokens:
-                payload["max_tokens"] = max_tokens
+                # Shrink the completion reservation rather than overflow the context window
+                budget = model_catalog.completion_budget(model, prompt_tokens, max_tokens)
+                if budget <= 0:
+                    raise ValueError(
+                        f"Prompt of ~{prompt_tokens} tokens exceeds the context window of {model}"
+                    )
+                if budget < max_tokens:
+                    logger.warning("Reducing max_tokens to fit context window",
+                                  model=model, requested=max_tokens, max_tokens=budget)
+                payload["max_tokens"] = budget
             
-            logger.info("Sending OpenRouter request", model=model, message_count=len(messages))
+            logger.info("Sending OpenRouter request", model=model, message_count=len(messages),
+                       estimated_prompt_tokens=prompt_tokens)
             
-            response = await self.client.post("/chat/completions", json=payload)
-            response.raise_for_status()
+            if stream or not settings.HEDGING_ENABLED:
+                result = await self._post_completion(payload)
+                served_model = model
+            else:
+                result, served_model = await self._hedged_completion(payload, prompt_tokens, max_tokens)
             
-            result = response.json()
+            # Report the model that answered (a hedge may have won on the fallback) by the id it was requested with
+            result["model"] = served_model
             
             # Log usage information
             if "usage" in result:
                 usage = result["usage"]
+                for kind in ("prompt_tokens", "completion_tokens"):
+                    if usage.get(kind) is not None:
+                        UPSTREAM_TOKENS.labels(model=served_model, kind=kind.split("_")[0]).observe(usage[kind])
                 logger.info("OpenRouter response received", 
-                           model=model,
+                           model=served_model,
                            prompt_tokens=usage.get("prompt_tokens"),
                            completion_tokens=usage.get("completion_tokens"),
-                           total_tokens=usage.get("total_tokens"))
+                           total_tokens=usage.get("total_tokens"),
+                           estimated_cost=model_catalog.estimate_cost(
+                               served_model,
+                               usage.get("prompt_tokens") or 0,
+                               usage.get("completion_tokens") or 0
+                           ))
             
             return result
             
@@ -103,6 +277,128 @@ class OpenRouterClient:
             logger.error("OpenRouter request failed", error=str(e), model=model)
             raise
     
+    def _available_model(self, model: str) -> str:
+        """Fail over to the configured fallback while the model's circuit is open."""
+        if not circuit_breakers.is_open(model):
+            return model
+        
+        fallback = settings.HEDGE_FALLBACK_MODELS.get(model)
+        if fallback and not circuit_breakers.is_open(fallback):
+            logger.warning("Circuit open, failing over", model=model, fallback=fallback)
+            return fallback
+        
+        # No healthy fallback: the breaker rejects the call immediately
+        return model
+    
+    async def _post_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one chat completion request, recording its latency for routing."""
+        model = payload["model"]
+        with circuit_breakers.get(model).call(_is_upstream_failure):
+            async with upstream_limiter.slot(model, _is_throttled):
+                started = time.perf_counter()
+                try:
+                    with span("upstream", model=model), model_router.track(model):
+                        response = await self.client.post("/chat/completions", json=payload)
+                        response.raise_for_status()
+                except Exception as e:
+                    UPSTREAM_REQUEST_SECONDS.labels(model=model, outcome=_error_label(e)).observe(
+                        time.perf_counter() - started
+                    )
+                    raise
+                UPSTREAM_REQUEST_SECONDS.labels(model=model, outcome="ok").observe(time.perf_counter() - started)
+        
+        return response.json()
+    
+    def _hedge_delay(self, model: str) -> float:
+        """Seconds to wait for the primary model before hedging, from its latency percentile."""
+        observed = model_router.latency_percentile(model, settings.HEDGE_PERCENTILE)
+        if observed is None:
+            return settings.HEDGE_DEFAULT_DELAY_SECONDS
+        return min(max(observed, settings.HEDGE_MIN_DELAY_SECONDS), settings.HEDGE_MAX_DELAY_SECONDS)
+    
+    def _hedge_payload(
+        self,
+        payload: Dict[str, Any],
+        prompt_tokens: int,
+        max_tokens: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Copy of the request for the fallback model, or None if there is no usable fallback."""
+        fallback = settings.HEDGE_FALLBACK_MODELS.get(payload["model"])
+        if not fallback or fallback == payload["model"]:
+            return None
+        
+        hedge_payload = dict(payload, model=fallback)
+        response_format = _fallback_response_format(hedge_payload.pop("response_format", None), fallback)
+        if response_format:
+            hedge_payload["response_format"] = response_format
+        
+        if max_tokens:
+            budget = model_catalog.completion_budget(fallback, prompt_tokens, max_tokens)
+            if budget <= 0:
+                return None
+            hedge_payload["max_tokens"] = budget
+        
+        return hedge_payload
+    
+    async def _hedged_completion(
+        self,
+        payload: Dict[str, Any],
+        prompt_tokens: int,
+        max_tokens: Optional[int]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Send a request, racing a backup on the fallback model if the primary is slow.
+        
+        If the primary has not answered within its latency-percentile deadline
+        and the hedge budget allows, the same request is sent to the fallback
+        model. The first successful reply wins and the other request is cancelled.
+        
+        Returns:
+            The reply and the model that produced it
+        """
+        model = payload["model"]
+        self.hedge_budget.record_request()
+        hedge_payload = self._hedge_payload(payload, prompt_tokens, max_tokens)
+        
+        if hedge_payload is None:
+            return await self._post_completion(payload), model
+        
+        primary = asyncio.ensure_future(self._post_completion(payload))
+        tasks = [primary]
+        
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(model))
+            if done:
+                return primary.result(), model
+            
+            if not self.hedge_budget.try_acquire():
+                HEDGED_REQUESTS.labels(model=model, outcome="budget_exhausted").inc()
+                return await primary, model
+            
+            logger.info("Hedging slow OpenRouter request", model=model, fallback=hedge_payload["model"])
+            hedge = asyncio.ensure_future(self._post_completion(hedge_payload))
+            tasks.append(hedge)
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        HEDGED_REQUESTS.labels(
+                            model=model,
+                            outcome="primary_won" if task is primary else "hedge_won"
+                        ).inc()
+                        return task.result(), model if task is primary else hedge_payload["model"]
+            
+            HEDGED_REQUESTS.labels(model=model, outcome="both_failed").inc()
+            return primary.result(), model
+            
+        finally:
+            # Cancel whichever request lost the race (or all, if we were cancelled)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
     async def stream_completion(
         self,
         model: str,
@@ -123,43 +419,189 @@ class OpenRouterClient:
             
         Yields:
             Streaming response chunks
+        
+        Failures are retried like ``chat_completion`` until the first chunk
+        arrives; after that the caller has seen partial output, so they raise.
         """
-        try:
-            payload = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "stream": True,
-                **kwargs
-            }
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "stream": True,
+            **kwargs
+        }
+        
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        
+        attempt = 0
+        while True:
+            attempt += 1
+            received = False
+            try:
+                logger.info("Starting OpenRouter stream", model=model, attempt=attempt)
+                
+                # An abandoned stream neither trips nor resets the breaker
+                with circuit_breakers.get(model).call(_is_upstream_failure):
+                    async with upstream_limiter.slot(model, _is_throttled) as upstream_slot, \
+                            self.client.stream("POST", "/chat/completions", json=payload) as response:
+                        response.raise_for_status()
+                        
+                        async for line in response.aiter_lines():
+                            if line.startswith("data: "):
+                                data = line[6:]  # Remove "data: " prefix
+                                
+                                if data.strip() == "[DONE]":
+                                    break
+                                
+                                try:
+                                    chunk = json.loads(data)
+                                except json.JSONDecodeError:
+                                    continue
+                                # Time to first chunk is the latency signal; the rest is paced by the reader
+                                upstream_slot.first_chunk()
+                                received = True
+                                yield chunk
+                return
+                                
+            except Exception as e:
+                if not received and attempt < settings.RETRY_MAX_ATTEMPTS and _is_retryable(e):
+                    UPSTREAM_RETRIES.labels(reason=_error_label(e)).inc()
+                    logger.warning("Retrying OpenRouter stream", attempt=attempt, reason=_error_label(e))
+                    await asyncio.sleep(_retry_delay(e, attempt))
+                    continue
+                
+                if isinstance(e, httpx.HTTPStatusError):
+                    logger.error("OpenRouter stream error", status_code=e.response.status_code, error=e.response.text)
+                else:
+                    logger.error("OpenRouter stream failed", error=str(e), model=model)
+                raise
+    
+    async def stream_text(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Stream only the text deltas of a chat completion."""
+        async for chunk in self.stream_completion(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        ):
+            choices = chunk.get("choices") or []
+            if not choices:
+                continue
             
-            if max_tokens:
-                payload["max_tokens"] = max_tokens
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                yield delta
+    
+    async def stream_structured(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        parse: Callable[[str], Dict[str, Any]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Stream a JSON reply, emitting structured events as it is generated.
+        
+        Yields:
+            ("token", text) for each content delta,
+            ("field", {"name", "value"}) when a top-level field is complete,
+            ("item", {"field", "index", "value"}) when a top-level array element is complete,
+            and finally ("result", parse(full_reply))
+        """
+        parser = IncrementalJSONParser()
+        parts = []
+        extra = {"response_format": response_format} if response_format else {}
+        
+        async for delta in self.stream_text(model, messages, temperature=temperature, max_tokens=max_tokens, **extra):
+            parts.append(delta)
+            yield "token", delta
             
-            logger.info("Starting OpenRouter stream", model=model)
+            for event in parser.feed(delta):
+                if event[0] == "field":
+                    yield "field", {"name": event[1], "value": event[2]}
+                else:
+                    yield "item", {"field": event[1], "index": event[2], "value": event[3]}
+        
+        yield "result", parse("".join(parts))
+    
+    async def _emit_result(self, result: Awaitable[Dict[str, Any]]) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Emit a non-streamed result as the ``field`` events and final ``result`` of ``stream_structured``."""
+        result = await result
+        for name, value in result.items():
+            yield "field", {"name": name, "value": value}
+        yield "result", result
+    
+    async def cached_chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        use_cache: bool = True,
+        response_format: Optional[Dict[str, Any]] = None,
+        cache_if: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Dict[str, Any]:
+        """
+        Send a chat completion request, serving identical requests from the result cache.
+        
+        Concurrent identical requests that miss the cache are coalesced into
+        a single upstream call.
+        
+        Args:
+            model: Model identifier
+            messages: List of message objects
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            use_cache: Set to False to bypass the cache for this call
+            response_format: Optional structured output mode
+            cache_if: Predicate a response must satisfy to be cached
             
-            async with self.client.stream("POST", "/chat/completions", json=payload) as response:
-                response.raise_for_status()
-                
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = line[6:]  # Remove "data: " prefix
-                        
-                        if data.strip() == "[DONE]":
-                            break
-                        
-                        try:
-                            chunk = json.loads(data)
-                            yield chunk
-                        except json.JSONDecodeError:
-                            continue
-                            
-        except httpx.HTTPStatusError as e:
-            logger.error("OpenRouter stream error", status_code=e.response.status_code, error=e.response.text)
-            raise
-        except Exception as e:
-            logger.error("OpenRouter stream failed", error=str(e), model=model)
-            raise
+        Returns:
+            API response dictionary
+        """
+        use_cache = use_cache and settings.RESULT_CACHE_ENABLED and not cache_bypassed()
+        key = make_cache_key(model, messages, temperature, max_tokens, response_format)
+        
+        if use_cache:
+            with span("cache_lookup"):
+                cached = await self.cache.get(key)
+            if cached is not None:
+                logger.info("OpenRouter result served from cache", model=model)
+                return cached
+        
+        extra = {"response_format": response_format} if response_format else {}
+        
+        async def fetch() -> Dict[str, Any]:
+            response = await self.chat_completion(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            )
+            # Unusable replies are not cached, so a retry gets a fresh answer; nor are
+            # replies from a hedge or failover model, which are not this model's answer
+            if use_cache and response.get("model") == model and (cache_if is None or cache_if(response)):
+                await self.cache.set(key, response)
+            return response
+        
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await fetch()
+        
+        # Identical requests already in flight share one upstream call; cache-bypassing
+        # callers only share with each other, never with a call that may cache its reply
+        return await self.single_flight.do(key if use_cache else f"{key}:no-cache", fetch)
     
     async def get_models(self) -> List[Dict[str, Any]]:
         """Get available models from OpenRouter."""
@@ -168,12 +610,69 @@ class OpenRouterClient:
             response.raise_for_status()
             
             models_data = response.json()
-            return models_data.get("data", [])
+            models = models_data.get("data", [])
+            model_catalog.update_from_models(models)
+            await asyncio.to_thread(model_catalog.save_cache, settings.MODEL_CATALOG_CACHE_PATH, models)
+            return models
             
         except Exception as e:
             logger.error("Failed to get models", error=str(e))
             raise
     
+    async def load_model_catalog(self) -> None:
+        """
+        Load the model catalog from its disk cache without any network call,
+        then keep it fresh in the background.
+        
+        Until the first refresh completes, the cache (even if expired) or
+        the built-in defaults are used.
+        """
+        await asyncio.to_thread(model_catalog.load_cache, settings.MODEL_CATALOG_CACHE_PATH)
+        if self._catalog_task is None or self._catalog_task.done():
+            self._catalog_task = asyncio.create_task(self._keep_catalog_fresh())
+    
+    async def _keep_catalog_fresh(self) -> None:
+        """Refresh the catalog from ``/models`` whenever it expires, retrying failures with backoff."""
+        failures = 0
+        while True:
+            if model_catalog.updated_at is not None:
+                remaining = model_catalog.updated_at + settings.MODEL_CATALOG_CACHE_TTL_SECONDS - time.time()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                    continue
+            
+            self._catalog_refreshing = True
+            try:
+                await self.get_models()
+                self.catalog_error = None
+                failures = 0
+            except Exception as e:
+                # get_models already logged it; keep serving from the cache or defaults
+                self.catalog_error = str(e)
+                failures += 1
+            finally:
+                self._catalog_refreshing = False
+            
+            if failures:
+                await asyncio.sleep(min(
+                    settings.SERVICE_INIT_RETRY_MAX_SECONDS,
+                    settings.SERVICE_INIT_RETRY_BASE_SECONDS * 2 ** (failures - 1)
+                ))
+    
+    def catalog_status(self) -> str:
+        """
+        ``ready``, ``refreshing``, ``initializing`` (nothing loaded yet), ``stale``
+        (the last refresh failed; serving an older catalog) or ``failed`` (no
+        catalog, using built-in defaults). Refreshes are retried in the background.
+        """
+        if self._catalog_refreshing:
+            return "refreshing"
+        if model_catalog.updated_at is None:
+            return "failed" if self.catalog_error else "initializing"
+        if self.catalog_error:
+            return "stale"
+        return "ready"
+    
     async def get_model_info(self, model_id: str) -> Optional[Dict[str, Any]]:
         """Get information about a specific model."""
         try:
@@ -204,35 +703,106 @@ class OpenRouterClient:
         
         return messages
     
+    def build_prompt(
+        self,
+        model: str,
+        template: str,
+        content: str,
+        system_prompt: str,
+        completion_tokens: int,
+        **fields
+    ) -> str:
+        """
+        Format a prompt template, truncating content to the model's token budget.
+        
+        The budget is the model's context window minus the template, the
+        system prompt and the completion reservation.
+        """
+        overhead = (
+            estimate_tokens(template.format(content="", **fields))
+            + estimate_tokens(system_prompt)
+            + 2 * MESSAGE_OVERHEAD_TOKENS
+        )
+        budget = model_catalog.content_budget(model, overhead, completion_tokens)
+        with span("prompt_fit"):
+            fitted = fit_text_to_tokens(content, budget)
+        
+        if len(fitted) < len(content):
+            logger.warning("Content truncated to fit model context",
+                          model=model, content_length=len(content), kept=len(fitted))
+        
+        return template.format(content=fitted, **fields)
+    
     async def classify_content(
         self,
         content: str,
         model: Optional[str] = None,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Classify document content using AI."""
-        model = model or settings.CLASSIFICATION_MODEL
-        prompt = custom_prompt or settings.CLASSIFICATION_PROMPT.format(content=content)
+        model = model or model_router.choose("classification", len(content))
+        messages, max_tokens = self._classification_messages(content, model, custom_prompt)
+        reply = JsonReply("classification")
         
-        messages = self.format_messages(
-            system_prompt="You are a document classification expert. Analyze documents and provide structured classification results in JSON format.",
-            user_content=prompt
-        )
-        
-        response = await self.chat_completion(
+        response = await self.cached_chat_completion(
             model=model,
             messages=messages,
             temperature=0.3,  # Lower temperature for more consistent classification
-            max_tokens=2000
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            response_format=response_format_for(model, "classification", CLASSIFICATION_SCHEMA),
+            cache_if=reply.cacheable
         )
         
-        # Extract and parse the response
-        content_result = response["choices"][0]["message"]["content"]
+        result = self._parse_classification(response["choices"][0]["message"]["content"], reply)
+        result["model_used"] = response.get("model") or model
+        return result
+    
+    async def stream_classification(
+        self,
+        content: str,
+        model: Optional[str] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Stream a classification, emitting fields as soon as they are complete.
         
-        try:
-            # Try to parse as JSON
-            result = json.loads(content_result)
-        except json.JSONDecodeError:
+        Yields:
+            Events from ``stream_structured``, ending with ("result", parsed_classification)
+        """
+        model = model or model_router.choose("classification", len(content))
+        messages, max_tokens = self._classification_messages(content, model)
+        
+        async for event in self.stream_structured(
+            model, messages, self._parse_classification, temperature=0.3, max_tokens=max_tokens,
+            response_format=response_format_for(model, "classification", CLASSIFICATION_SCHEMA)
+        ):
+            yield event
+    
+    def _classification_messages(
+        self,
+        content: str,
+        model: str,
+        custom_prompt: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the classification messages and completion budget."""
+        system_prompt = "You are a document classification expert. Analyze documents and provide structured classification results in JSON format."
+        max_tokens = settings.CLASSIFICATION_MAX_TOKENS
+        prompt = custom_prompt or self.build_prompt(
+            model, settings.CLASSIFICATION_PROMPT, content, system_prompt, max_tokens
+        )
+        
+        messages = self.format_messages(
+            system_prompt=system_prompt,
+            user_content=prompt
+        )
+        
+        return messages, max_tokens
+    
+    def _parse_classification(self, content_result: str, reply: Optional[JsonReply] = None) -> Dict[str, Any]:
+        """Parse a classification reply, falling back to a placeholder result."""
+        result = (reply or JsonReply("classification")).parse(content_result)
+        if not isinstance(result, dict):
             # If not JSON, return as text with basic structure
             result = {
                 "primary_category": "Unknown",
@@ -245,37 +815,172 @@ class OpenRouterClient:
         
         return result
     
+    async def classify_packed_content(
+        self,
+        content: str,
+        document_count: int,
+        model: Optional[str] = None,
+        use_cache: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify several documents packed into one prompt.
+        
+        Args:
+            content: Packed prompt listing every document
+            document_count: Number of documents in the prompt
+            model: Model identifier
+            use_cache: Set to False to bypass the result cache
+            
+        Returns:
+            One classification result per document, in prompt order
+            
+        Raises:
+            ValueError: If the reply is not a JSON array with one object per document
+        """
+        model = model or model_router.choose("classification", len(content))
+        
+        messages = self.format_messages(
+            system_prompt="You are a document classification expert. Classify every document you are given and respond with a JSON array only.",
+            user_content=content
+        )
+        # An array, or an object wrapping one
+        reply = JsonReply("packed_classification", expected=None)
+        
+        def cacheable(response: Dict[str, Any]) -> bool:
+            # Only a reply with one classification per document is worth reusing
+            if not reply.cacheable(response):
+                return False
+            try:
+                self._packed_classifications(reply.parse(response["choices"][0]["message"]["content"]), document_count)
+            except ValueError:
+                return False
+            return True
+        
+        response = await self.cached_chat_completion(
+            model=model,
+            messages=messages,
+            temperature=0.3,
+            max_tokens=min(4000, 500 * document_count),
+            use_cache=use_cache,
+            cache_if=cacheable
+        )
+        
+        parsed = reply.parse(response["choices"][0]["message"]["content"])
+        if parsed is None:
+            raise ValueError("Packed classification reply is not valid JSON")
+        
+        return self._packed_classifications(parsed, document_count)
+    
+    @staticmethod
+    def _packed_classifications(parsed: Any, document_count: int) -> List[Dict[str, Any]]:
+        """
+        Validate a parsed packed reply and return its classifications in document order.
+        
+        Raises:
+            ValueError: If it is not an array (or an object wrapping one) of one object per document
+        """
+        # Some models wrap the array in an object
+        if isinstance(parsed, dict):
+            parsed = next((v for v in parsed.values() if isinstance(v, list)), None)
+        
+        if not isinstance(parsed, list) or len(parsed) != document_count:
+            raise ValueError(f"Expected a JSON array of {document_count} classifications")
+        
+        if not all(isinstance(item, dict) for item in parsed):
+            raise ValueError("Packed classification entries must be JSON objects")
+        
+        if all(isinstance(item.get("document_number"), int) for item in parsed):
+            parsed = sorted(parsed, key=lambda item: item["document_number"])
+        
+        # Copies, so the parsed reply shared with the cache check is left untouched
+        return [{k: v for k, v in item.items() if k != "document_number"} for item in parsed]
+    
     async def extract_information(
         self,
         content: str,
         extraction_types: List[str],
         model: Optional[str] = None,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Extract structured information from content."""
-        model = model or settings.EXTRACTION_MODEL
-        prompt = custom_prompt or settings.EXTRACTION_PROMPT.format(
-            content=content,
-            extraction_types=", ".join(extraction_types)
-        )
+        model = model or model_router.choose("extraction", len(content))
         
-        messages = self.format_messages(
-            system_prompt="You are an information extraction expert. Extract structured data from documents and provide results in JSON format.",
-            user_content=prompt
-        )
+        if custom_prompt is None and len(content) > settings.CHUNK_MAX_CHARS:
+            partials = await self._map_chunks(
+                content,
+                lambda chunk: self.extract_information(chunk, extraction_types, model=model, use_cache=use_cache)
+            )
+            return merge_partial_results(partials)
         
-        response = await self.chat_completion(
+        messages, max_tokens = self._extraction_messages(content, extraction_types, model, custom_prompt)
+        reply = JsonReply("extraction")
+        
+        response = await self.cached_chat_completion(
             model=model,
             messages=messages,
             temperature=0.2,  # Very low temperature for consistent extraction
-            max_tokens=3000
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            response_format=response_format_for(model, "extraction", EXTRACTION_SCHEMA),
+            cache_if=reply.cacheable
         )
         
-        content_result = response["choices"][0]["message"]["content"]
+        return self._parse_extraction(response["choices"][0]["message"]["content"], reply)
+    
+    async def stream_extraction(
+        self,
+        content: str,
+        extraction_types: List[str],
+        model: Optional[str] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Stream an extraction, emitting fields and entities as soon as they are complete.
         
-        try:
-            result = json.loads(content_result)
-        except json.JSONDecodeError:
+        Yields:
+            Events from ``stream_structured``, ending with ("result", parsed_extraction)
+        """
+        if len(content) > settings.CHUNK_MAX_CHARS:
+            async for event in self._emit_result(self.extract_information(content, extraction_types, model=model)):
+                yield event
+            return
+        
+        model = model or model_router.choose("extraction", len(content))
+        messages, max_tokens = self._extraction_messages(content, extraction_types, model)
+        
+        async for event in self.stream_structured(
+            model, messages, self._parse_extraction, temperature=0.2, max_tokens=max_tokens,
+            response_format=response_format_for(model, "extraction", EXTRACTION_SCHEMA)
+        ):
+            yield event
+    
+    def _extraction_messages(
+        self,
+        content: str,
+        extraction_types: List[str],
+        model: str,
+        custom_prompt: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the extraction messages and completion budget."""
+        system_prompt = "You are an information extraction expert. Extract structured data from documents and provide results in JSON format."
+        # Extracted data grows with the input, so size the reservation from it
+        max_tokens = min(settings.EXTRACTION_MAX_TOKENS, 500 + estimate_tokens(content) // 2)
+        prompt = custom_prompt or self.build_prompt(
+            model, settings.EXTRACTION_PROMPT, content, system_prompt, max_tokens,
+            extraction_types=", ".join(extraction_types)
+        )
+        
+        messages = self.format_messages(
+            system_prompt=system_prompt,
+            user_content=prompt
+        )
+        
+        return messages, max_tokens
+    
+    def _parse_extraction(self, content_result: str, reply: Optional[JsonReply] = None) -> Dict[str, Any]:
+        """Parse an extraction reply, falling back to a placeholder result."""
+        result = (reply or JsonReply("extraction")).parse(content_result)
+        if not isinstance(result, dict):
             result = {
                 "entities": [],
                 "dates": [],
@@ -292,32 +997,96 @@ class OpenRouterClient:
         content: str,
         analysis_types: List[str],
         model: Optional[str] = None,
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Perform comprehensive content analysis."""
-        model = model or settings.ANALYSIS_MODEL
-        prompt = custom_prompt or settings.ANALYSIS_PROMPT.format(
-            content=content,
-            analysis_types=", ".join(analysis_types)
-        )
+        model = model or model_router.choose("analysis", len(content))
         
-        messages = self.format_messages(
-            system_prompt="You are a document analysis expert. Provide comprehensive analysis and insights in JSON format.",
-            user_content=prompt
-        )
+        if custom_prompt is None and len(content) > settings.CHUNK_MAX_CHARS:
+            partials = await self._map_chunks(
+                content,
+                lambda chunk: self.analyze_content(chunk, analysis_types, model=model, use_cache=use_cache)
+            )
+            if all("raw_response" in p for p in partials):
+                # No chunk reply could be parsed, so a paid reduce would only condense placeholders
+                logger.error("Analysis failed for every chunk", chunk_count=len(partials))
+                return {**partials[0], "error": "No section of the document could be analysed"}
+            
+            merged = merge_partial_results(partials)
+            if len(partials) > 1:
+                await self._reduce_summaries(merged, use_cache=use_cache)
+            return merged
         
-        response = await self.chat_completion(
+        messages, max_tokens = self._analysis_messages(content, analysis_types, model, custom_prompt)
+        reply = JsonReply("analysis")
+        
+        response = await self.cached_chat_completion(
             model=model,
             messages=messages,
             temperature=0.5,  # Moderate temperature for balanced analysis
-            max_tokens=4000
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            response_format=response_format_for(model, "analysis", ANALYSIS_SCHEMA),
+            cache_if=reply.cacheable
         )
         
-        content_result = response["choices"][0]["message"]["content"]
+        return self._parse_analysis(response["choices"][0]["message"]["content"], reply)
+    
+    async def stream_analysis(
+        self,
+        content: str,
+        analysis_types: List[str],
+        model: Optional[str] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Stream a content analysis as it is generated.
+        
+        Yields:
+            Events from ``stream_structured``, ending with ("result", parsed_analysis)
+        """
+        if len(content) > settings.CHUNK_MAX_CHARS:
+            # Too long for one request: map-reduce without streaming, then emit the fields at once
+            async for event in self._emit_result(self.analyze_content(content, analysis_types, model=model)):
+                yield event
+            return
         
-        try:
-            result = json.loads(content_result)
-        except json.JSONDecodeError:
+        model = model or model_router.choose("analysis", len(content))
+        messages, max_tokens = self._analysis_messages(content, analysis_types, model)
+        
+        async for event in self.stream_structured(
+            model, messages, self._parse_analysis, temperature=0.5, max_tokens=max_tokens,
+            response_format=response_format_for(model, "analysis", ANALYSIS_SCHEMA)
+        ):
+            yield event
+    
+    def _analysis_messages(
+        self,
+        content: str,
+        analysis_types: List[str],
+        model: str,
+        custom_prompt: Optional[str] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the analysis messages and completion budget."""
+        system_prompt = "You are a document analysis expert. Provide comprehensive analysis and insights in JSON format."
+        # Each requested analysis type adds a section to the reply
+        max_tokens = min(settings.ANALYSIS_MAX_TOKENS, 600 + 250 * len(analysis_types))
+        prompt = custom_prompt or self.build_prompt(
+            model, settings.ANALYSIS_PROMPT, content, system_prompt, max_tokens,
+            analysis_types=", ".join(analysis_types)
+        )
+        
+        messages = self.format_messages(
+            system_prompt=system_prompt,
+            user_content=prompt
+        )
+        
+        return messages, max_tokens
+    
+    def _parse_analysis(self, content_result: str, reply: Optional[JsonReply] = None) -> Dict[str, Any]:
+        """Parse an analysis reply, falling back to a placeholder result."""
+        result = (reply or JsonReply("analysis")).parse(content_result)
+        if not isinstance(result, dict):
             result = {
                 "summary": "Analysis unavailable",
                 "insights": [],
@@ -330,6 +1099,62 @@ class OpenRouterClient:
         
         return result
     
+    async def _map_chunks(
+        self,
+        content: str,
+        process_chunk: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Split long content on section/paragraph boundaries and process chunks in parallel.
+        
+        Returns the parsed per-chunk results, skipping chunks whose reply
+        could not be parsed unless every chunk failed.
+        """
+        chunks = split_into_chunks(content, settings.CHUNK_MAX_CHARS)
+        semaphore = asyncio.Semaphore(settings.CHUNK_CONCURRENCY)
+        
+        async def run(chunk: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await process_chunk(chunk)
+        
+        logger.info("Processing long content in chunks", content_length=len(content), chunk_count=len(chunks))
+        partials = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        
+        usable = [p for p in partials if "raw_response" not in p]
+        if len(usable) < len(partials):
+            logger.warning("Some chunk results could not be parsed",
+                          chunk_count=len(chunks), failed=len(partials) - len(usable))
+        
+        return usable or list(partials)
+    
+    async def _reduce_summaries(self, merged: Dict[str, Any], use_cache: bool = True):
+        """Condense joined per-chunk summaries in a merged result into single summaries."""
+        for key, value in merged.items():
+            if "summary" not in key.lower() or not isinstance(value, str) or "\n\n" not in value:
+                continue
+            
+            messages = self.format_messages(
+                system_prompt="You are a professional document summarizer. Create clear, concise, and comprehensive summaries.",
+                user_content=(
+                    "The following are summaries of consecutive sections of one document. "
+                    "Combine them into a single coherent executive summary of 3-5 sentences. "
+                    f"Respond with the summary text only.\n\n{value}"
+                )
+            )
+            
+            try:
+                response = await self.cached_chat_completion(
+                    model=settings.SUMMARY_MODEL,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=500,
+                    use_cache=use_cache
+                )
+                merged[key] = response["choices"][0]["message"]["content"].strip()
+            except Exception as e:
+                # The joined section summaries are still a usable result
+                logger.warning("Summary reduction failed", key=key, error=str(e))
+    
     async def summarize_content(
         self,
         content: str,
@@ -338,15 +1163,8 @@ class OpenRouterClient:
         max_length: Optional[int] = None
     ) -> str:
         """Generate a summary of the content."""
-        model = model or settings.SUMMARY_MODEL
-        prompt = custom_prompt or settings.SUMMARY_PROMPT.format(content=content)
-        
-        messages = self.format_messages(
-            system_prompt="You are a professional document summarizer. Create clear, concise, and comprehensive summaries.",
-            user_content=prompt
-        )
-        
-        max_tokens = max_length or 1000
+        model = model or model_router.choose("summary", len(content))
+        messages, max_tokens = self._summary_messages(content, model, custom_prompt, max_length)
         
         response = await self.chat_completion(
             model=model,
@@ -355,4 +1173,47 @@ class OpenRouterClient:
             max_tokens=max_tokens
         )
         
-        return response["choices"][0]["message"]["content"]
\ No newline at end of file
+        return response["choices"][0]["message"]["content"]
+    
+    async def stream_summary(
+        self,
+        content: str,
+        model: Optional[str] = None,
+        max_length: Optional[int] = None
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Stream a summary as it is generated.
+        
+        Yields:
+            ("token", text) for each content delta, then ("result", {"summary": text})
+        """
+        model = model or model_router.choose("summary", len(content))
+        messages, max_tokens = self._summary_messages(content, model, max_length=max_length)
+        parts = []
+        
+        async for delta in self.stream_text(model, messages, temperature=0.4, max_tokens=max_tokens):
+            parts.append(delta)
+            yield "token", delta
+        
+        yield "result", {"summary": "".join(parts)}
+    
+    def _summary_messages(
+        self,
+        content: str,
+        model: str,
+        custom_prompt: Optional[str] = None,
+        max_length: Optional[int] = None
+    ) -> Tuple[List[Dict[str, str]], int]:
+        """Build the summary messages and completion budget."""
+        system_prompt = "You are a professional document summarizer. Create clear, concise, and comprehensive summaries."
+        max_tokens = max_length or 1000
+        prompt = custom_prompt or self.build_prompt(
+            model, settings.SUMMARY_PROMPT, content, system_prompt, max_tokens
+        )
+        
+        messages = self.format_messages(
+            system_prompt=system_prompt,
+            user_content=prompt
+        )
+        
+        return messages, max_tokens
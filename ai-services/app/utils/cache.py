@@ -0,0 +1,170 @@
+"""
+Content-addressed result cache for OpenRouter model calls.
+Combines an in-process LRU tier with an optional shared Redis tier.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+RESULT_CACHE_REQUESTS = Counter(
+    "ai_result_cache_requests_total",
+    "Result cache lookups by tier and outcome",
+    ["tier", "outcome"]
+)
+
+# Set per request (e.g. from a ``Cache-Control: no-cache`` header) to skip the cache
+_cache_bypass: ContextVar[bool] = ContextVar("result_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache() -> Iterator[None]:
+    """Skip cache lookups and writes for model calls made inside this block."""
+    token = _cache_bypass.set(True)
+    try:
+        yield
+    finally:
+        _cache_bypass.reset(token)
+
+
+def set_cache_bypass(enabled: bool) -> None:
+    """Enable or disable the cache bypass for the current request context."""
+    _cache_bypass.set(enabled)
+
+
+def cache_bypassed() -> bool:
+    """Whether the current request context asked to skip the cache."""
+    return _cache_bypass.get()
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: Optional[int],
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """Build a stable content hash for a chat completion request."""
+    request = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    if response_format is not None:
+        request["response_format"] = response_format
+
+    payload = json.dumps(
+        request,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional Redis) cache for model responses."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_enabled: Optional[bool] = None
+    ):
+        self.max_entries = max_entries if max_entries is not None else settings.RESULT_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.RESULT_CACHE_TTL_SECONDS
+        self.redis_enabled = settings.RESULT_CACHE_REDIS_ENABLED if redis_enabled is None else redis_enabled
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._redis = None
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _get_redis(self):
+        """Lazily create the Redis client; returns None when the tier is disabled."""
+        if not self.redis_enabled:
+            return None
+
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(settings.REDIS_URL)
+
+        return self._redis
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached response, promoting Redis hits into memory."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                RESULT_CACHE_REQUESTS.labels(tier="memory", outcome="hit").inc()
+                return value
+            del self._entries[key]
+
+        redis_client = self._get_redis()
+        if redis_client is not None:
+            try:
+                raw = await redis_client.get(settings.RESULT_CACHE_REDIS_PREFIX + key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._store_local(key, value)
+                    self.stats["redis_hits"] += 1
+                    RESULT_CACHE_REQUESTS.labels(tier="redis", outcome="hit").inc()
+                    return value
+            except Exception as e:
+                logger.warning("Result cache Redis lookup failed", error=str(e))
+
+        self.stats["misses"] += 1
+        RESULT_CACHE_REQUESTS.labels(tier="all", outcome="miss").inc()
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response in every enabled tier."""
+        self._store_local(key, value)
+        self.stats["writes"] += 1
+
+        redis_client = self._get_redis()
+        if redis_client is not None:
+            try:
+                await redis_client.set(
+                    settings.RESULT_CACHE_REDIS_PREFIX + key,
+                    json.dumps(value),
+                    ex=self.ttl_seconds
+                )
+            except Exception as e:
+                logger.warning("Result cache Redis write failed", error=str(e))
+
+    def _store_local(self, key: str, value: Dict[str, Any]) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry from the in-process tier."""
+        self._entries.clear()
+
+    async def close(self) -> None:
+        """Close the Redis connection if one was opened."""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Shared per-process cache so every OpenRouterClient sees the same entries
+result_cache = ResultCache()
@@ -0,0 +1,369 @@
+"""
+Anonymised recording of OpenRouter traffic for replay load tests.
+
+When ``OPENROUTER_RECORD_PATH`` is set, the shared HTTP client is wrapped
+in a ``RecordingTransport``. Each chat completion is written to a gzip
+JSONL journal in that directory (one file per worker) together with its
+timings and the inbound request it served. No document text is stored:
+message contents are reduced to their length and a keyed hash, reply
+strings are replaced with filler of the same length, reply numbers are
+rounded to their order of magnitude and reply keys outside the known
+result schemas are hashed, so only the shape of the traffic remains. Anonymising and serialising happen in the flush thread, off the
+event loop.
+"""
+
+import asyncio
+import glob
+import gzip
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import secrets
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+import structlog
+
+from ..config import settings
+from .json_output import ANALYSIS_SCHEMA, CLASSIFICATION_SCHEMA, EXTRACTION_SCHEMA, extract_json
+from .tracing import current_trace
+
+logger = structlog.get_logger(__name__)
+
+_FILLER = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+
+# Flush early if this many records are waiting, regardless of the interval
+_MAX_BUFFERED = 500
+
+# Reply keys kept verbatim: our result schemas and the generic fields models nest
+# inside them. Any other key may be document content (structured_data keys,
+# entity names) and is replaced by its keyed hash.
+KNOWN_KEYS = frozenset(
+    key
+    for schema in (CLASSIFICATION_SCHEMA, EXTRACTION_SCHEMA, ANALYSIS_SCHEMA)
+    for key in schema["properties"]
+) | {
+    "document_number", "documents", "classifications", "results",
+    "text", "type", "value", "currency", "name", "label", "category", "score", "date", "amount"
+}
+
+
+def filler(length: int) -> str:
+    """Placeholder text of exactly ``length`` characters."""
+    repeats = length // len(_FILLER) + 1
+    return (_FILLER * repeats)[:length]
+
+
+_hash_key: Optional[bytes] = None
+
+
+def _get_hash_key() -> bytes:
+    global _hash_key
+    if _hash_key is None:
+        if settings.OPENROUTER_RECORD_HASH_KEY:
+            _hash_key = settings.OPENROUTER_RECORD_HASH_KEY.encode("utf-8")
+        else:
+            logger.warning("OPENROUTER_RECORD_HASH_KEY is not set; documents repeated across workers will not match")
+            _hash_key = secrets.token_bytes(32)
+    return _hash_key
+
+
+def content_hash(text: str) -> str:
+    """Keyed hash of a message, so repeated documents are recognisable without being readable."""
+    return hmac.new(_get_hash_key(), text.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+def task_hash(system_prompt: str) -> str:
+    """Unkeyed hash of a system prompt; these are our own constants and identify the task."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def bucket(number: Any) -> Any:
+    """Round a number down to its order of magnitude (4237 -> 1000, -0.87 -> -0.1), keeping its type."""
+    if isinstance(number, bool) or not number or not math.isfinite(number):
+        return number
+    magnitude = math.copysign(10 ** math.floor(math.log10(abs(number))), number)
+    return int(magnitude) if isinstance(number, int) else magnitude
+
+
+def scrub(value: Any) -> Any:
+    """Replace every string in a JSON value with filler and bucket its numbers, keeping known keys and structure."""
+    if isinstance(value, dict):
+        return {(k if k in KNOWN_KEYS else content_hash(k)): scrub(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [scrub(v) for v in value]
+    if isinstance(value, str):
+        return filler(len(value))
+    if isinstance(value, (int, float)):
+        return bucket(value)
+    return value
+
+
+def scrub_reply(text: str) -> str:
+    """
+    Anonymise a model reply, preserving JSON shape where the reply contains JSON.
+
+    Prose around the JSON becomes filler of the same length, so the reply
+    keeps its size. Replies with no complete JSON value (including ones cut
+    off by the token limit) become filler throughout and stay unparseable.
+    """
+    value = extract_json(text)
+    if value is None:
+        return filler(len(text))
+    scrubbed = json.dumps(scrub(value))
+    padding = len(text) - len(scrubbed)
+    return filler(padding - 1) + " " + scrubbed if padding > 1 else scrubbed
+
+
+def _anonymise_request(payload: Dict[str, Any]) -> Dict[str, Any]:
+    messages = payload.get("messages", [])
+    system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+    return {
+        "model": payload.get("model"),
+        "task": task_hash(system),
+        "stream": bool(payload.get("stream")),
+        "max_tokens": payload.get("max_tokens"),
+        "temperature": payload.get("temperature"),
+        "response_format": payload.get("response_format", {}).get("type") if payload.get("response_format") else None,
+        "messages": [
+            {"role": m.get("role"), "chars": len(m.get("content") or ""), "hash": content_hash(m.get("content") or "")}
+            for m in messages
+        ]
+    }
+
+
+def _parse_completion(body: bytes, stream: bool) -> Dict[str, Any]:
+    """Pull the reply text, model and usage out of a JSON or SSE completion body."""
+    if not stream:
+        data = json.loads(body)
+        choices = data.get("choices") or [{}]
+        return {
+            "model": data.get("model"),
+            "content": (choices[0].get("message") or {}).get("content") or "",
+            "usage": data.get("usage"),
+            "chunks": 1
+        }
+
+    parts: List[str] = []
+    result: Dict[str, Any] = {"model": None, "usage": None}
+    for line in body.decode("utf-8", errors="replace").splitlines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if not data or data == "[DONE]":
+            continue
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            continue
+        result["model"] = event.get("model") or result["model"]
+        result["usage"] = event.get("usage") or result["usage"]
+        for choice in event.get("choices") or []:
+            parts.append((choice.get("delta") or {}).get("content") or "")
+
+    result["content"] = "".join(parts)
+    result["chunks"] = len(parts)
+    return result
+
+
+def build_record(
+    payload: Dict[str, Any],
+    started_at: float,
+    ttfb: Optional[float],
+    duration: float,
+    status: Optional[int] = None,
+    retry_after: Optional[str] = None,
+    body: Optional[bytes] = None,
+    error: Optional[str] = None,
+    trace_id: Optional[str] = None,
+    endpoint: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build one anonymised journal entry."""
+    request = _anonymise_request(payload)
+    response: Dict[str, Any] = {"status": status, "error": error}
+
+    if status == 200 and body is not None:
+        try:
+            completion = _parse_completion(body, request["stream"])
+            completion["content"] = scrub_reply(completion["content"])
+            response.update(completion)
+        except (ValueError, AttributeError, IndexError):
+            response["error"] = "unparseable_body"
+    elif retry_after is not None:
+        response["retry_after"] = retry_after
+
+    return {
+        "t": round(started_at, 3),
+        "trace": trace_id,
+        "endpoint": endpoint,
+        "request": request,
+        "response": response,
+        "ttfb_ms": round(ttfb * 1000, 1) if ttfb is not None else None,
+        "duration_ms": round(duration * 1000, 1)
+    }
+
+
+class CassetteRecorder:
+    """Buffers journal entries and appends them to this worker's gzip JSONL file."""
+
+    def __init__(self, directory: str, sample_rate: float = 1.0, flush_interval: float = 5.0):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.path = os.path.join(directory, f"openrouter-{int(time.time())}-{os.getpid()}.jsonl.gz")
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def sampled(self) -> bool:
+        """Sample whole inbound requests, so every upstream call of a traced request is kept or dropped together."""
+        if self.sample_rate >= 1:
+            return True
+        trace = current_trace()
+        if trace is None:
+            return random.random() < self.sample_rate
+        return int(trace.trace_id[:8], 16) / 0xFFFFFFFF < self.sample_rate
+
+    def add(self, **call: Any) -> None:
+        """Queue one upstream call (``build_record`` arguments) for anonymising in the flush thread."""
+        trace = current_trace()
+        call.update(trace_id=trace.trace_id if trace else None, endpoint=trace.name if trace else None)
+        self._buffer.append(call)
+        due = time.monotonic() - self._last_flush >= self.flush_interval
+        if (due or len(self._buffer) >= _MAX_BUFFERED) and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def _write(self, calls: List[Dict[str, Any]]) -> None:
+        lines = [json.dumps(build_record(**call), separators=(",", ":"), default=str) for call in calls]
+        # Each flush appends a gzip member; readers treat the file as one stream
+        with gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        calls, self._buffer = self._buffer, []
+        self._last_flush = time.monotonic()
+        try:
+            await asyncio.to_thread(self._write, calls)
+        except OSError as e:
+            logger.warning("Failed to write traffic recording", path=self.path, error=str(e))
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.flush()
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Passes a response body through unchanged, recording it once fully read."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_complete):
+        self._stream = stream
+        self._on_complete = on_complete
+        self._chunks: List[bytes] = []
+        self._complete = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._chunks.append(chunk)
+            yield chunk
+        self._complete = True
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+        self._on_complete(b"".join(self._chunks), self._complete)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that journals chat completions passing through it."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, recorder: CassetteRecorder):
+        self.transport = transport
+        self.recorder = recorder
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST" or not request.url.path.endswith("/chat/completions") or not self.recorder.sampled():
+            return await self.transport.handle_async_request(request)
+
+        try:
+            payload = json.loads(request.content)
+        except ValueError:
+            return await self.transport.handle_async_request(request)
+
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.HTTPError as e:
+            self.recorder.add(
+                payload=payload, started_at=started_at, ttfb=None,
+                duration=time.perf_counter() - started, error=type(e).__name__
+            )
+            raise
+        ttfb = time.perf_counter() - started
+
+        def on_complete(body: bytes, complete: bool) -> None:
+            self.recorder.add(
+                payload=payload, started_at=started_at, ttfb=ttfb,
+                duration=time.perf_counter() - started,
+                status=response.status_code,
+                retry_after=response.headers.get("retry-after"),
+                body=body if complete else None,
+                error=None if complete else "cancelled"
+            )
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, on_complete),
+            extensions=response.extensions
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+        await self.recorder.close()
+
+
+def recording_transport(transport: Optional[httpx.AsyncBaseTransport], **transport_kwargs) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Wrap ``transport`` for recording when ``OPENROUTER_RECORD_PATH`` is set.
+
+    Without a transport, a network transport is built from ``transport_kwargs``
+    (``limits``, ``http2``), since the client ignores those once a transport is given.
+    """
+    if not settings.OPENROUTER_RECORD_PATH:
+        return transport
+
+    recorder = CassetteRecorder(
+        settings.OPENROUTER_RECORD_PATH,
+        sample_rate=settings.OPENROUTER_RECORD_SAMPLE_RATE,
+        flush_interval=settings.OPENROUTER_RECORD_FLUSH_SECONDS
+    )
+    _get_hash_key()  # Warn at startup rather than on the first flush if no key is configured
+    logger.info("Recording OpenRouter traffic", path=recorder.path, sample_rate=recorder.sample_rate)
+    return RecordingTransport(transport or httpx.AsyncHTTPTransport(**transport_kwargs), recorder)
+
+
+def read_cassette(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield journal entries from a recording file or every recording in a directory, oldest first."""
+    paths = sorted(glob.glob(os.path.join(path, "*.jsonl.gz"))) if os.path.isdir(path) else [path]
+    records = []
+    for file_path in paths:
+        try:
+            with gzip.open(file_path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except (EOFError, gzip.BadGzipFile) as e:
+            # A worker killed mid-write leaves a truncated last member; keep what was read
+            logger.warning("Truncated traffic recording", path=file_path, error=str(e))
+    records.sort(key=lambda r: r["t"])
+    yield from records
@@ -0,0 +1,160 @@
+"""
+Document chunking and result merging for map-reduce processing of long content.
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+# Lines that start a new section: markdown headings, numbered headings,
+# "Chapter/Section/Article/Part" headings and short all-caps titles
+SECTION_HEADING = re.compile(
+    r"^\s*(#{1,6}\s+\S"
+    r"|\d+(\.\d+)*\.?\s+[A-Z]"
+    r"|(?i:chapter|section|article|part|attachment|appendix)\b"
+    r"|[A-Z][A-Z0-9 ,&/-]{3,80}$)"
+)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _is_heading(block: str) -> bool:
+    first_line = block.strip().split("\n", 1)[0]
+    return len(first_line) <= 120 and bool(SECTION_HEADING.match(first_line))
+
+
+def _split_oversized(block: str, max_chars: int) -> List[str]:
+    """Split a single block larger than ``max_chars`` on sentences, then hard-wrap."""
+    pieces: List[str] = []
+    current = ""
+
+    for sentence in SENTENCE_END.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        pieces.append(current)
+
+    return pieces
+
+
+def split_into_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most ``max_chars`` on natural boundaries.
+
+    Paragraphs are packed greedily. A section heading starts a new chunk
+    once the current one is at least half full, so sections stay together
+    where they fit. Paragraphs that are too long are split on sentences.
+
+    Args:
+        text: Document content
+        max_chars: Maximum characters per chunk
+
+    Returns:
+        List of chunks covering the whole text
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    blocks = [b for b in re.split(r"\n\s*\n", text) if b.strip()]
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    def flush():
+        nonlocal current, current_len
+        if current:
+            chunks.append("\n\n".join(current))
+        current, current_len = [], 0
+
+    for block in blocks:
+        if len(block) > max_chars:
+            flush()
+            chunks.extend(_split_oversized(block, max_chars))
+            continue
+
+        if current and _is_heading(block) and current_len >= max_chars // 2:
+            flush()
+
+        if current_len + len(block) + 2 > max_chars:
+            flush()
+
+        current.append(block)
+        current_len += len(block) + 2
+
+    flush()
+    return chunks
+
+
+def _dedupe_key(item: Any) -> str:
+    """Normalised identity used to de-duplicate list items across chunks."""
+    if isinstance(item, str):
+        return item.strip().lower()
+    if isinstance(item, dict):
+        # Entities are usually identified by their text/name and type
+        for field in ("text", "name", "value", "entity", "phrase"):
+            if isinstance(item.get(field), str):
+                return f"{item.get('type', '')}|{item[field].strip().lower()}"
+    return json.dumps(item, sort_keys=True, default=str).lower()
+
+
+def merge_partial_results(
+    partials: List[Dict[str, Any]],
+    join_key: Callable[[str], bool] = lambda key: "summary" in key.lower()
+) -> Dict[str, Any]:
+    """
+    Merge per-chunk JSON results into one result.
+
+    Lists are concatenated and de-duplicated, numbers are averaged, nested
+    objects are merged recursively and other strings take the most common
+    value. Strings under keys matching ``join_key`` (summaries) are joined
+    with blank lines so the caller can reduce them.
+
+    Args:
+        partials: Parsed results, one per chunk
+        join_key: Predicate selecting keys whose string values are joined
+
+    Returns:
+        Merged result
+    """
+    merged: Dict[str, Any] = {}
+    keys: List[str] = []
+    for partial in partials:
+        keys.extend(k for k in partial if k not in keys)
+
+    for key in keys:
+        values = [p[key] for p in partials if p.get(key) is not None]
+        if not values:
+            merged[key] = None
+            continue
+
+        if all(isinstance(v, list) for v in values):
+            seen = set()
+            combined = []
+            for item in (i for v in values for i in v):
+                identity = _dedupe_key(item)
+                if identity not in seen:
+                    seen.add(identity)
+                    combined.append(item)
+            merged[key] = combined
+        elif all(isinstance(v, dict) for v in values):
+            merged[key] = merge_partial_results(values, join_key)
+        elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            merged[key] = sum(values) / len(values)
+        elif all(isinstance(v, str) for v in values) and join_key(key):
+            merged[key] = "\n\n".join(v for v in values if v.strip())
+        else:
+            votes = Counter(json.dumps(v, sort_keys=True, default=str) for v in values)
+            merged[key] = json.loads(votes.most_common(1)[0][0])
+
+    return merged
@@ -0,0 +1,162 @@
+"""
+Per-model circuit breakers for upstream model calls.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = Gauge(
+    "ai_circuit_breaker_state",
+    "Circuit breaker state per model (0 closed, 1 half-open, 2 open)",
+    ["model"],
+    multiprocess_mode="max"
+)
+CIRCUIT_REJECTIONS = Counter(
+    "ai_circuit_breaker_rejections_total",
+    "Model calls rejected without being sent because the circuit was open",
+    ["model"]
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open."""
+
+    def __init__(self, model: str, retry_after: float):
+        self.model = model
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for {model}; retry in {retry_after:.0f}s")
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately. Once ``reset_timeout`` has passed a single trial
+    call is let through (half-open); its success closes the circuit and its
+    failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.CIRCUIT_RESET_SECONDS
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        CIRCUIT_STATE.labels(model=name).set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("Circuit breaker state changed", model=self.name, old=self.state, new=state)
+            self.state = state
+            CIRCUIT_STATE.labels(model=self.name).set(_STATE_VALUES[state])
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through."""
+        return max(self.opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    @property
+    def is_open(self) -> bool:
+        """Whether a call made now would be rejected."""
+        if self.state == OPEN:
+            return self.retry_after > 0
+        return self.state == HALF_OPEN and self._trial_in_flight
+
+    def allow(self) -> bool:
+        """Reserve permission for one call, moving open to half-open once the timeout passes."""
+        if self.state == OPEN and self.retry_after <= 0:
+            self._set_state(HALF_OPEN)
+
+        if self.state == CLOSED:
+            return True
+
+        if self.state == HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_in_flight = False
+        self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def release(self) -> None:
+        """Give back a reserved call that ended without a verdict (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+    @contextmanager
+    def call(self, is_failure: Callable[[BaseException], bool] = lambda e: True) -> Iterator[None]:
+        """
+        Guard one call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.allow():
+            CIRCUIT_REJECTIONS.labels(model=self.name).inc()
+            raise CircuitOpenError(self.name, self.retry_after)
+
+        try:
+            yield
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                # The upstream answered (e.g. a 400), so it is not down
+                self.record_success()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+
+
+class CircuitBreakerRegistry:
+    """Lazily created breaker per model."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = self._breakers[model] = CircuitBreaker(model)
+        return breaker
+
+    def is_open(self, model: str) -> bool:
+        breaker = self._breakers.get(model)
+        return breaker is not None and breaker.is_open
+
+
+# Shared per-process breakers so every client sees the same upstream health
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,46 @@
+"""
+Budget for hedged (duplicate backup) model requests.
+"""
+
+from typing import Optional
+
+from prometheus_client import Counter
+
+from ..config import settings
+
+HEDGED_REQUESTS = Counter(
+    "ai_hedged_requests_total",
+    "Hedged model requests by primary model and outcome",
+    ["model", "outcome"]
+)
+
+
+class HedgeBudget:
+    """
+    Token bucket limiting hedges to a fraction of primary requests.
+
+    Every primary request earns ``ratio`` tokens and every hedge spends
+    one, so at most ``ratio`` of requests are duplicated over time. The
+    bucket holds at most ``burst`` tokens, so a quiet period cannot be
+    followed by a flood of hedges.
+    """
+
+    def __init__(self, ratio: Optional[float] = None, burst: Optional[float] = None):
+        self.ratio = settings.HEDGE_BUDGET_RATIO if ratio is None else ratio
+        self.burst = settings.HEDGE_BUDGET_BURST if burst is None else burst
+        self._tokens = self.burst
+        self.stats = {"granted": 0, "denied": 0}
+
+    def record_request(self) -> None:
+        """Credit the bucket for one primary request."""
+        self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Spend one token on a hedge; False if the budget is exhausted."""
+        if self._tokens >= 1:
+            self._tokens -= 1
+            self.stats["granted"] += 1
+            return True
+
+        self.stats["denied"] += 1
+        return False
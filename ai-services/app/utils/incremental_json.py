@@ -0,0 +1,157 @@
+"""
+Incremental JSON parser for streamed model replies.
+Emits each top-level field, and each element of top-level arrays, as soon as
+it is complete, long before the whole object has arrived.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Event tuples returned by IncrementalJSONParser.feed:
+#   ("field", name, value)        a top-level field is complete
+#   ("item", name, index, value)  an element of a top-level array field is complete
+Event = Tuple[Any, ...]
+
+
+class IncrementalJSONParser:
+    """
+    Streaming scanner for a single top-level JSON object.
+
+    Text before the opening brace (prose, a ```json fence) and after the
+    closing brace is ignored. Values that fail to parse are skipped; the
+    complete reply should still be parsed once the stream ends.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self.started = False
+        self.done = False
+
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # "key" -> "colon" -> "value" -> ("after_value") -> "key" ...
+        self._expecting = "key"
+        self._key_start = 0
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self._array_mode = False
+        self._item_start = 0
+        self._item_index = 0
+
+    def feed(self, chunk: str) -> List[Event]:
+        """Consume the next piece of text and return the events it completed."""
+        if self.done or not chunk:
+            return []
+
+        self._text += chunk
+        events: List[Event] = []
+        text = self._text
+
+        for i in range(self._position, len(text)):
+            c = text[i]
+
+            if not self.started:
+                if c == "{":
+                    self.started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._close_string(text, i, events)
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expecting == "key":
+                    self._key_start = i
+                continue
+
+            if self._depth == 1:
+                self._scan_top_level(text, i, c, events)
+                if self.done:
+                    break
+            else:
+                self._scan_nested(text, i, c, events)
+
+        self._position = len(text)
+        return events
+
+    def _close_string(self, text: str, i: int, events: List[Event]) -> None:
+        if self._depth != 1:
+            return
+
+        if self._expecting == "key":
+            self._key = self._loads(text[self._key_start:i + 1])
+            self._expecting = "colon"
+        elif self._expecting == "value":
+            self._emit_field(text[self._value_start:i + 1], events)
+            self._expecting = "after_value"
+
+    def _scan_top_level(self, text: str, i: int, c: str, events: List[Event]) -> None:
+        if self._expecting == "colon":
+            if c == ":":
+                self._expecting = "value"
+                self._value_start = i + 1
+        elif self._expecting == "value":
+            if c in "{[":
+                self._depth += 1
+                self._array_mode = c == "["
+                self._item_start = i + 1
+                self._item_index = 0
+            elif c in ",}":
+                self._emit_field(text[self._value_start:i], events)
+                self._expecting = "key"
+        elif c == ",":
+            self._expecting = "key"
+
+        if c == "}" and self._depth == 1 and self._expecting in ("key", "after_value"):
+            self.done = True
+
+    def _scan_nested(self, text: str, i: int, c: str, events: List[Event]) -> None:
+        if c in "{[":
+            self._depth += 1
+        elif c in "}]":
+            if self._depth == 2 and self._array_mode and text[self._item_start:i].strip():
+                self._emit_item(text[self._item_start:i], events)
+            self._depth -= 1
+            if self._depth == 1:
+                self._emit_field(text[self._value_start:i + 1], events)
+                self._expecting = "after_value"
+                self._array_mode = False
+        elif c == "," and self._depth == 2 and self._array_mode:
+            self._emit_item(text[self._item_start:i], events)
+            self._item_start = i + 1
+            self._item_index += 1
+
+    def _emit_field(self, raw: str, events: List[Event]) -> None:
+        value = self._loads(raw)
+        if isinstance(self._key, str) and value is not _INVALID:
+            events.append(("field", self._key, value))
+
+    def _emit_item(self, raw: str, events: List[Event]) -> None:
+        value = self._loads(raw)
+        if isinstance(self._key, str) and value is not _INVALID:
+            events.append(("item", self._key, self._item_index, value))
+
+    @staticmethod
+    def _loads(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, ValueError):
+            logger.debug("Skipping unparseable streamed JSON value", raw=raw[:100])
+            return _INVALID
+
+
+_INVALID = object()
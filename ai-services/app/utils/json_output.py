@@ -0,0 +1,242 @@
+"""
+Structured (JSON) output support for model calls.
+Builds ``response_format`` payloads for models that accept them and tolerantly
+extracts JSON from replies that wrap it in code fences or prose.
+"""
+
+import json
+import re
+from typing import Any, Dict, Optional
+
+import structlog
+from prometheus_client import Counter
+
+from ..config import settings
+from .tokens import model_catalog
+from .tracing import span
+
+logger = structlog.get_logger(__name__)
+
+JSON_PARSE_RESULTS = Counter(
+    "ai_json_parse_total",
+    "Parsing of model JSON replies (ok: direct, recovered: extracted from fences/prose, failed: unusable)",
+    ["task", "outcome"]
+)
+
+CODE_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+CLASSIFICATION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "primary_category": {"type": "string"},
+        "secondary_categories": _STRING_LIST,
+        "document_type": {"type": "string"},
+        "confidence": {"type": "number"},
+        "tags": _STRING_LIST,
+        "subject_area": {"type": "string"},
+        "language": {"type": "string"},
+        "formality_level": {"type": "string"},
+        "target_audience": {"type": "string"},
+        "urgency_level": {"type": "string"},
+        "sensitivity_level": {"type": "string"},
+        "action_required": {"type": "boolean"},
+        "key_topics": _STRING_LIST,
+        "industry_vertical": {"type": ["string", "null"]},
+        "compliance_indicators": _STRING_LIST
+    },
+    "required": ["primary_category", "document_type", "confidence", "tags"]
+}
+
+EXTRACTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "entities": {"type": "array", "items": {"type": "object"}},
+        "dates": {"type": "array"},
+        "amounts": {"type": "array"},
+        "key_phrases": {"type": "array"},
+        "structured_data": {"type": "object"}
+    },
+    "required": ["entities", "dates", "amounts", "key_phrases"]
+}
+
+ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "insights": {"type": "array"},
+        "sentiment": {},
+        "readability": {},
+        "topics": {"type": "array"},
+        "recommendations": {"type": "array"}
+    },
+    "required": ["summary", "insights", "sentiment", "topics", "recommendations"]
+}
+
+
+def response_format_for(model: str, task: str, schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Choose the strongest JSON output mode the model supports.
+
+    ``json_schema`` is only sent when the OpenRouter catalog lists
+    ``structured_outputs`` for the model. Without catalog data (cold start,
+    failed refresh) models matching the configured prefixes get plain
+    ``json_object``, which they accept even where schemas are rejected.
+
+    Returns:
+        A ``response_format`` payload, or None to rely on the prompt alone
+    """
+    if not settings.STRUCTURED_OUTPUT_ENABLED:
+        return None
+
+    supported = model_catalog.get(model).get("supported_parameters")
+    if supported is None:
+        supports_schema = False
+        supports_json = any(model.startswith(p) for p in settings.STRUCTURED_OUTPUT_MODEL_PREFIXES)
+    else:
+        supports_schema = "structured_outputs" in supported
+        supports_json = "response_format" in supported
+
+    if supports_schema and schema is not None:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": f"{task}_result", "strict": False, "schema": schema}
+        }
+    if supports_json:
+        return {"type": "json_object"}
+    return None
+
+
+def _balanced_span(text: str, start: int) -> Optional[str]:
+    """Return the balanced JSON object/array starting at ``start``, if it closes."""
+    depth = 0
+    in_string = False
+    escape = False
+
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return None
+
+
+def _matches(value: Any, expected: Optional[type]) -> bool:
+    return expected is None or isinstance(value, expected)
+
+
+def extract_json(text: str, expected: Optional[type] = None) -> Optional[Any]:
+    """
+    Extract the top-level JSON value from a model reply.
+
+    Accepts bare JSON, JSON inside a Markdown code fence, or JSON
+    surrounded by prose. Only an outermost value is returned: prose is
+    scanned once for balanced ``{...}``/``[...]`` spans, in order, without
+    looking inside them, so a truncated reply gives None rather than one of
+    its nested values and ``[{...}, {...}]`` is never reduced to its first
+    element. The first span of type ``expected`` (dict or list; any when
+    None) is returned.
+    """
+    if not text:
+        return None
+
+    try:
+        value = json.loads(text)
+        return value if _matches(value, expected) else None
+    except json.JSONDecodeError:
+        pass
+
+    for match in CODE_FENCE.finditer(text):
+        try:
+            value = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if _matches(value, expected):
+            return value
+
+    # Scan top-level spans left to right, never looking inside one, so an array
+    # of objects is not mistaken for its first element
+    position = 0
+    while True:
+        starts = [i for i in (text.find("{", position), text.find("[", position)) if i >= 0]
+        if not starts:
+            return None
+        start = min(starts)
+        span = _balanced_span(text, start)
+        if span is None:
+            # Unterminated, e.g. a reply cut off at max_tokens
+            return None
+        try:
+            value = json.loads(span)
+            if _matches(value, expected):
+                return value
+        except json.JSONDecodeError:
+            pass
+        position = start + len(span)
+
+
+def parse_json_reply(text: str, task: str, expected: Optional[type] = dict) -> Optional[Any]:
+    """
+    Parse a model reply as JSON, recording whether it was direct, recovered or failed.
+
+    Returns None unless the top-level value is of type ``expected``
+    (any type when ``expected`` is None).
+    """
+    with span("json_parse", task=task):
+        try:
+            value = json.loads(text)
+            if _matches(value, expected):
+                JSON_PARSE_RESULTS.labels(task=task, outcome="ok").inc()
+                return value
+            value = None
+        except (json.JSONDecodeError, TypeError):
+            value = extract_json(text, expected) if isinstance(text, str) else None
+
+    if value is None:
+        JSON_PARSE_RESULTS.labels(task=task, outcome="failed").inc()
+        logger.warning("Model reply is not parseable JSON", task=task, reply_preview=(text or "")[:200])
+    else:
+        JSON_PARSE_RESULTS.labels(task=task, outcome="recovered").inc()
+
+    return value
+
+
+class JsonReply:
+    """
+    One model reply parsed as JSON, shared by the cache check and the result
+    parser so the reply text is parsed only once.
+    """
+
+    def __init__(self, task: str, expected: Optional[type] = dict):
+        self.task = task
+        self.expected = expected
+        self._text: Optional[str] = None
+        self._value: Optional[Any] = None
+
+    def parse(self, text: str) -> Optional[Any]:
+        if self._text is None or text is not self._text:
+            self._value = parse_json_reply(text, self.task, self.expected)
+            self._text = text
+        return self._value
+
+    def cacheable(self, response: Dict[str, Any]) -> bool:
+        """Whether a chat completion carries a usable JSON reply (``cache_if`` callback)."""
+        try:
+            text = response["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return False
+        return self.parse(text) is not None
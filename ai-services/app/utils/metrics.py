@@ -0,0 +1,90 @@
+"""
+Prometheus metrics for model calls, OCR and request stages.
+
+Under uvicorn's multiple worker processes, set ``PROMETHEUS_MULTIPROC_DIR``
+to a directory shared by the workers (emptied before they start); each
+process then writes its samples there and ``/metrics`` aggregates them.
+"""
+
+import asyncio
+import os
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, make_asgi_app, multiprocess
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 131072)
+
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "ai_upstream_request_duration_seconds",
+    "OpenRouter chat completion latency by model and outcome (ok or HTTP status/error type)",
+    ["model", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+UPSTREAM_TOKENS = Histogram(
+    "ai_upstream_tokens",
+    "Tokens per OpenRouter request, as reported by the upstream",
+    ["model", "kind"],
+    buckets=TOKEN_BUCKETS
+)
+UPSTREAM_RETRIES = Counter(
+    "ai_upstream_retries_total",
+    "Retried OpenRouter requests by reason (HTTP status or error type)",
+    ["reason"]
+)
+
+OCR_DOCUMENT_SECONDS = Histogram(
+    "ai_ocr_document_duration_seconds",
+    "Time to OCR one document, by file type",
+    ["file_type"],
+    buckets=LATENCY_BUCKETS
+)
+OCR_PAGE_SECONDS = Histogram(
+    "ai_ocr_page_duration_seconds",
+    "Average OCR time per page of each processed document",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+
+HTTP_QUEUE_SECONDS = Histogram(
+    "ai_http_request_queue_seconds",
+    "Time from request arrival until its handler starts (body read, middleware, event loop wait)",
+    ["endpoint"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+HTTP_PROCESSING_SECONDS = Histogram(
+    "ai_http_request_processing_seconds",
+    "Time from handler start until the response is fully sent",
+    ["endpoint", "status"],
+    buckets=LATENCY_BUCKETS
+)
+EVENT_LOOP_LAG = Histogram(
+    "ai_event_loop_lag_seconds",
+    "How late the event loop ran a timer; high values mean blocking work on the loop",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+
+def create_metrics_app():
+    """ASGI app serving /metrics, aggregating all workers in multiprocess mode."""
+    if not MULTIPROCESS:
+        return make_asgi_app()
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return make_asgi_app(registry=registry)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the shared multiprocess directory."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Sample event loop lag until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - started - interval, 0.0))
@@ -0,0 +1,156 @@
+"""
+ASGI middleware shared by the AI services application.
+"""
+
+import time
+from typing import Iterable, Mapping
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from .metrics import HTTP_PROCESSING_SECONDS, HTTP_QUEUE_SECONDS
+from .tracing import export_trace, start_trace
+
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip middleware that leaves incremental streaming endpoints uncompressed.
+    
+    The gzip compressor buffers small writes, which would hold back
+    NDJSON/SSE events until enough output accumulates.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        compresslevel: int = 9,
+        streaming_paths: Iterable[str] = ()
+    ) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.streaming_paths = frozenset(streaming_paths)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.streaming_paths:
+            await self.app(scope, receive, send)
+            return
+        
+        await super().__call__(scope, receive, send)
+
+
+async def mark_handler_start(request: Request) -> None:
+    """App-wide dependency marking when a request's handler begins running."""
+    request.state.handler_started_at = time.perf_counter()
+
+
+class RequestTimingMiddleware:
+    """
+    Record per-endpoint queue wait and processing time.
+    
+    Queue wait runs from arrival until ``mark_handler_start``; processing
+    runs from there until the last byte of the response is sent.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        received_at = time.perf_counter()
+        state = scope.setdefault("state", {})
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            started_at = state.get("handler_started_at")
+            if started_at is not None:
+                # Label by route template so path parameters do not explode cardinality
+                endpoint = getattr(scope.get("route"), "path", scope["path"])
+                HTTP_QUEUE_SECONDS.labels(endpoint=endpoint).observe(started_at - received_at)
+                HTTP_PROCESSING_SECONDS.labels(endpoint=endpoint, status=str(status_code)).observe(
+                    time.perf_counter() - started_at
+                )
+
+
+class TracingMiddleware:
+    """
+    Trace each HTTP request and report its stage timings.
+    
+    Completed spans are sent in a ``Server-Timing`` response header; for
+    streaming responses that is only the work done before the first byte.
+    The full trace, including background tasks, is exported when the
+    request finishes.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        trace = start_trace(f'{scope["method"]} {scope["path"]}')
+        status_code = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing())
+                headers.append("X-Trace-Id", trace.trace_id)
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            await export_trace(trace, route=route, status=status_code)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject uploads whose ``Content-Length`` exceeds the endpoint's limit.
+    
+    Starlette spools the whole multipart body before a handler runs, so
+    without this an oversized upload is received in full only to be
+    refused. Bodies without a ``Content-Length`` are still limited per
+    file when the handler spools them.
+    """
+    
+    # Room for multipart boundaries and part headers on top of the file data
+    MULTIPART_OVERHEAD = 64 * 1024
+    
+    def __init__(self, app: ASGIApp, limits: Mapping[str, int]) -> None:
+        self.app = app
+        self.limits = dict(limits)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is not None:
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > limit + self.MULTIPART_OVERHEAD:
+                response = JSONResponse(
+                    {"detail": f"Upload too large. Maximum {limit // (1024 * 1024)}MB allowed"},
+                    status_code=413,
+                    headers={"Connection": "close"}
+                )
+                await response(scope, receive, send)
+                return
+        
+        await self.app(scope, receive, send)
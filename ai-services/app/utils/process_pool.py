@@ -0,0 +1,143 @@
+"""
+Process pool for CPU-bound OCR and image processing.
+Keeps heavy work off the event loop so other requests stay responsive.
+"""
+
+import asyncio
+import functools
+import importlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+OCR_POOL_IN_FLIGHT = Gauge(
+    "ai_ocr_pool_in_flight",
+    "Tasks submitted to the OCR process pool and not yet finished",
+    multiprocess_mode="livesum"
+)
+OCR_POOL_QUEUE_DEPTH = Gauge(
+    "ai_ocr_pool_queue_depth",
+    "Tasks waiting for a free OCR worker process",
+    multiprocess_mode="livesum"
+)
+OCR_POOL_TASKS = Counter(
+    "ai_ocr_pool_tasks_total",
+    "Tasks completed by the OCR process pool",
+    ["outcome"]
+)
+
+
+def default_pool_size() -> int:
+    """Split the machine's CPUs between the uvicorn workers sharing it."""
+    web_workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+    return max(1, (os.cpu_count() or 1) // max(1, web_workers))
+
+
+def _init_worker(modules: List[str]) -> None:
+    """Import heavy libraries as each worker process starts, so no task pays for it."""
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # A broken optional library must not break the pool; tasks needing it will fail
+            pass
+
+
+class ProcessPoolEngine:
+    """Warm process pool with queue-depth metrics for CPU-bound work."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.OCR_POOL_WORKERS or default_pool_size()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of submitted tasks still waiting for a worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def start(self, warm: bool = True):
+        """Create the pool and, unless ``warm`` is False, warm up every worker process."""
+        context = multiprocessing.get_context(settings.OCR_POOL_START_METHOD)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(settings.OCR_POOL_WARM_MODULES,)
+        )
+        if warm:
+            await self.warm_up()
+
+    async def warm_up(self):
+        """
+        Start every worker process ahead of the first task.
+
+        Submitting one task per worker at once makes the executor start all
+        of them; each imports the OCR modules in its initializer before
+        running any task, whichever process the warm-up tasks land on.
+        """
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, os.getpid)
+            for _ in range(self.max_workers)
+        ))
+
+        logger.info("OCR process pool started", workers=self.max_workers)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a picklable, module-level function in a worker process.
+
+        Prefer passing file paths over raw bytes; only the path crosses the
+        process boundary.
+        """
+        if self._executor is None:
+            raise RuntimeError("OCR process pool not started")
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+
+        self._in_flight += 1
+        self._update_gauges()
+        try:
+            result = await loop.run_in_executor(self._executor, call)
+            OCR_POOL_TASKS.labels(outcome="success").inc()
+            return result
+        except Exception:
+            OCR_POOL_TASKS.labels(outcome="error").inc()
+            raise
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+
+    async def run_with_buffer(self, fn: Callable, data: bytes, *args, **kwargs) -> Any:
+        """
+        Run ``fn(data, *args, **kwargs)`` in a worker, sending ``data`` over the pool's pipe.
+
+        Shared memory is deliberately not used: before Python 3.13 a worker
+        attaching to a block registers it with the resource tracker, which
+        then warns about or unlinks blocks the parent still owns. For large
+        inputs, write them to a file and pass the path to ``run`` instead.
+        """
+        return await self.run(fn, data, *args, **kwargs)
+
+    def _update_gauges(self):
+        OCR_POOL_IN_FLIGHT.set(self._in_flight)
+        OCR_POOL_QUEUE_DEPTH.set(self.queue_depth)
+
+    async def shutdown(self):
+        """Stop the worker processes, cancelling tasks that have not started."""
+        if self._executor is None:
+            return
+
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        logger.info("OCR process pool stopped")
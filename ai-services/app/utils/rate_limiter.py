@@ -0,0 +1,232 @@
+"""
+Per-user API rate limiting.
+Decisions are made from in-process sliding-window counters, so a check
+never waits on the network; counts are synchronised with Redis in batches
+in the background so limits hold across all uvicorn workers.
+"""
+
+import asyncio
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+from fastapi import HTTPException
+from prometheus_client import Counter
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+RATE_LIMIT_DECISIONS = Counter(
+    "ai_rate_limit_decisions_total",
+    "Per-user API rate limit decisions",
+    ["outcome", "window"]
+)
+
+# (user_id, period, window index)
+WindowKey = Tuple[str, int, int]
+
+# Seconds between sweeps for idle users' windows on the request path
+PRUNE_INTERVAL = 60
+
+
+class _Window:
+    """Fixed-window counts for one user and period; the sliding estimate blends two windows."""
+
+    __slots__ = ("index", "current", "previous")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.current = 0
+        self.previous = 0
+
+    def roll(self, index: int) -> None:
+        if index == self.index:
+            return
+        self.previous = self.current if index == self.index + 1 else 0
+        self.current = 0
+        self.index = index
+
+
+class RateLimiter:
+    """
+    Sliding-window limiter keyed on user id.
+
+    Each window is approximated as the current fixed window plus the
+    previous one weighted by how much of it still overlaps the sliding
+    window. Accepted requests are counted locally and flushed to Redis
+    every ``RATE_LIMIT_SYNC_INTERVAL`` seconds; the cluster-wide totals
+    Redis returns replace the local counts.
+    """
+
+    def __init__(
+        self,
+        per_minute: Optional[int] = None,
+        per_hour: Optional[int] = None,
+        redis_enabled: Optional[bool] = None
+    ):
+        self.limits: List[Tuple[str, int, int]] = [
+            ("minute", 60, per_minute or settings.RATE_LIMIT_PER_MINUTE),
+            ("hour", 3600, per_hour or settings.RATE_LIMIT_PER_HOUR),
+        ]
+        self.redis_enabled = settings.RATE_LIMIT_REDIS_ENABLED if redis_enabled is None else redis_enabled
+        self._windows: Dict[Tuple[str, int], _Window] = {}
+        self._pending: Dict[WindowKey, int] = defaultdict(int)
+        self._redis = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._last_prune = time.time()
+
+    def _window(self, user_id: str, period: int, now: float) -> _Window:
+        index = int(now // period)
+        window = self._windows.get((user_id, period))
+        if window is None:
+            window = self._windows[(user_id, period)] = _Window(index)
+        window.roll(index)
+        return window
+
+    @staticmethod
+    def _retry_after(window: _Window, limit: int, period: int, now: float) -> int:
+        """Seconds until the sliding estimate leaves room for one more request."""
+        elapsed = now - window.index * period
+        if window.current + 1 > limit or window.previous == 0:
+            wait = period - elapsed
+        else:
+            # previous * (1 - (elapsed + wait) / period) + current + 1 <= limit
+            wait = period * (1 - (limit - window.current - 1) / window.previous) - elapsed
+        return max(1, math.ceil(wait))
+
+    async def check_rate_limit(self, user_id: str) -> None:
+        """
+        Count one request for ``user_id``.
+
+        Raises:
+            HTTPException: 429 with ``Retry-After`` if any window is exhausted
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        now = time.time()
+        user_id = str(user_id)
+        windows = []
+
+        # Sweep idle users here too: sync() only runs with Redis enabled
+        if now - self._last_prune >= PRUNE_INTERVAL:
+            self._prune(now)
+
+        for name, period, limit in self.limits:
+            window = self._window(user_id, period, now)
+            overlap = 1 - (now - window.index * period) / period
+            estimate = window.previous * overlap + window.current
+
+            if estimate + 1 > limit:
+                RATE_LIMIT_DECISIONS.labels(outcome="rejected", window=name).inc()
+                retry_after = self._retry_after(window, limit, period, now)
+                logger.info("Rate limit exceeded", user_id=user_id, window=name, limit=limit)
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Rate limit exceeded: {limit} requests per {name}",
+                    headers={
+                        "Retry-After": str(retry_after),
+                        "X-RateLimit-Limit": str(limit),
+                        "X-RateLimit-Remaining": "0",
+                    }
+                )
+            windows.append((period, window))
+
+        for period, window in windows:
+            window.current += 1
+            if self.redis_enabled:
+                self._pending[(user_id, period, window.index)] += 1
+
+        RATE_LIMIT_DECISIONS.labels(outcome="allowed", window="all").inc()
+
+    def start(self) -> None:
+        """Start the background Redis sync (no-op when Redis is disabled)."""
+        if self.redis_enabled and self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.RATE_LIMIT_SYNC_INTERVAL)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Rate limit sync with Redis failed", error=str(e))
+
+    def _get_redis(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    async def sync(self) -> None:
+        """Push local counts to Redis and adopt the cluster-wide totals."""
+        now = time.time()
+        self._prune(now)
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, defaultdict(int)
+        keys = list(batch)
+
+        try:
+            pipe = self._get_redis().pipeline(transaction=False)
+            for user_id, period, index in keys:
+                redis_key = f"{settings.RATE_LIMIT_REDIS_PREFIX}{user_id}:{period}:{index}"
+                pipe.incrby(redis_key, batch[(user_id, period, index)])
+                pipe.expire(redis_key, period * 2)
+            results = await pipe.execute()
+        except Exception:
+            # Keep the counts so they are sent with the next batch, unless their
+            # window has expired and they can no longer affect any decision
+            now = time.time()
+            for key, count in batch.items():
+                if self._live(key, now):
+                    self._pending[key] += count
+            raise
+
+        for (user_id, period, index), total in zip(keys, results[::2]):
+            window = self._windows.get((user_id, period))
+            if window is not None and window.index == index:
+                # Requests accepted since the batch was taken are not in Redis yet
+                window.current = int(total) + self._pending.get((user_id, period, index), 0)
+
+    @staticmethod
+    def _live(key: WindowKey, now: float) -> bool:
+        """Whether a window still affects decisions (it is the current or previous one)."""
+        _, period, index = key
+        return index >= int(now // period) - 1
+
+    def _prune(self, now: float) -> None:
+        """Forget users and pending counts whose windows no longer affect any decision."""
+        stale = [
+            key for key, window in self._windows.items()
+            if not self._live((key[0], key[1], window.index), now)
+        ]
+        for key in stale:
+            del self._windows[key]
+
+        for key in [key for key in self._pending if not self._live(key, now)]:
+            del self._pending[key]
+
+        self._last_prune = now
+
+    async def close(self) -> None:
+        """Stop syncing, flush outstanding counts and close Redis."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+        if self._redis is not None:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Final rate limit sync failed", error=str(e))
+            await self._redis.close()
+            self._redis = None
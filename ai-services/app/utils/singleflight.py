@@ -0,0 +1,62 @@
+"""
+In-flight request coalescing ("single-flight") for identical async calls.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict
+
+import structlog
+from prometheus_client import Counter
+
+logger = structlog.get_logger(__name__)
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "ai_single_flight_calls_total",
+    "Model calls by single-flight role (leader made the upstream call, coalesced shared it)",
+    ["role"]
+)
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among concurrent callers with the same key.
+    
+    The first caller for a key starts the call; callers arriving while it
+    is running await the same result instead of starting their own. The
+    shared call is shielded, so one caller being cancelled does not cancel
+    it for the others. Each caller gets its own deep copy of the result, so
+    one caller mutating it cannot affect another.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "coalesced": 0}
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` for ``key`` unless an identical call is already running."""
+        future = self._calls.get(key)
+        
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.stats["leaders"] += 1
+            SINGLE_FLIGHT_CALLS.labels(role="leader").inc()
+        else:
+            self.stats["coalesced"] += 1
+            SINGLE_FLIGHT_CALLS.labels(role="coalesced").inc()
+            logger.debug("Coalesced identical in-flight request", in_flight=len(self._calls))
+        
+        return copy.deepcopy(await asyncio.shield(future))
+    
+    def _forget(self, key: str, done: asyncio.Future) -> None:
+        if self._calls.get(key) is done:
+            del self._calls[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not done.cancelled():
+            done.exception()
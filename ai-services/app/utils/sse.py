@@ -0,0 +1,38 @@
+"""
+Server-sent events helpers for streaming endpoints.
+"""
+
+import json
+from typing import Any, AsyncIterator, Tuple
+
+import structlog
+from fastapi.responses import StreamingResponse
+
+logger = structlog.get_logger(__name__)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _encode_events(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception as e:
+        # Headers are already sent, so report failures in-band
+        logger.error("Streaming response failed", error=str(e))
+        yield format_sse("error", {"error": str(e)})
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Stream ``(event, data)`` pairs to the client as ``text/event-stream``."""
+    return StreamingResponse(
+        _encode_events(events),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Stop reverse proxies from buffering events
+        }
+    )
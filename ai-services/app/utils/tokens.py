@@ -0,0 +1,171 @@
+"""
+Local token estimation and per-model context/pricing budgets.
+Used to fit prompts to a model's context window before sending them.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Characters per token for typical English text with BPE tokenizers
+CHARS_PER_TOKEN = 4
+# Per-message framing overhead (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Headroom left for estimation error when filling a context window
+SAFETY_MARGIN_TOKENS = 256
+DEFAULT_CONTEXT_LENGTH = 8192
+
+# Fallback limits for the configured models, in tokens and USD per token.
+# Replaced by live values from OpenRouter's /models when available.
+DEFAULT_MODEL_LIMITS: Dict[str, Dict[str, Any]] = {
+    "anthropic/claude-3-haiku": {"context_length": 200000, "prompt_price": 0.25e-6, "completion_price": 1.25e-6},
+    "anthropic/claude-3-sonnet": {"context_length": 200000, "prompt_price": 3e-6, "completion_price": 15e-6},
+    "anthropic/claude-3-opus": {"context_length": 200000, "prompt_price": 15e-6, "completion_price": 75e-6},
+    "openai/gpt-3.5-turbo": {"context_length": 16385, "prompt_price": 0.5e-6, "completion_price": 1.5e-6},
+    "openai/gpt-4-vision-preview": {"context_length": 128000, "prompt_price": 10e-6, "completion_price": 30e-6},
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a string without a tokenizer.
+
+    ASCII text averages about four characters per token; multi-byte
+    characters (CJK, Cyrillic, accented text) cost noticeably more, so
+    every extra UTF-8 byte adds half a token.
+    """
+    if not text:
+        return 0
+
+    extra_bytes = len(text.encode("utf-8")) - len(text)
+    return len(text) // CHARS_PER_TOKEN + extra_bytes // 2 + 1
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """Estimate prompt tokens for a list of chat messages."""
+    return sum(estimate_tokens(m.get("content", "")) + MESSAGE_OVERHEAD_TOKENS for m in messages) + 2
+
+
+def fit_text_to_tokens(text: str, max_tokens: int, marker: str = "...") -> str:
+    """Truncate text so its estimated size fits within ``max_tokens``."""
+    estimated = estimate_tokens(text)
+    if estimated <= max_tokens:
+        return text
+
+    if max_tokens <= 0:
+        return ""
+
+    # Scale by the observed chars/token ratio, then trim until it fits
+    cut = int(len(text) * max_tokens / estimated)
+    while cut > 0 and estimate_tokens(text[:cut]) > max_tokens:
+        cut = int(cut * 0.95)
+
+    return text[:cut] + marker
+
+
+class ModelCatalog:
+    """Context window and pricing table for the models we call."""
+
+    def __init__(self):
+        self._models: Dict[str, Dict[str, Any]] = {k: dict(v) for k, v in DEFAULT_MODEL_LIMITS.items()}
+        self.updated_at: Optional[float] = None
+
+    def update_from_models(self, models: List[Dict[str, Any]]) -> None:
+        """Refresh limits from an OpenRouter ``/models`` response."""
+        for model in models:
+            model_id = model.get("id")
+            if not model_id:
+                continue
+
+            pricing = model.get("pricing") or {}
+            top_provider = model.get("top_provider") or {}
+            entry = self._models.setdefault(model_id, {})
+
+            try:
+                if model.get("context_length"):
+                    entry["context_length"] = int(model["context_length"])
+                if top_provider.get("max_completion_tokens"):
+                    entry["max_completion_tokens"] = int(top_provider["max_completion_tokens"])
+                if pricing.get("prompt") is not None:
+                    entry["prompt_price"] = float(pricing["prompt"])
+                if pricing.get("completion") is not None:
+                    entry["completion_price"] = float(pricing["completion"])
+            except (TypeError, ValueError):
+                logger.warning("Ignoring malformed model catalog entry", model=model_id)
+
+            if "supported_parameters" in model:
+                entry["supported_parameters"] = list(model.get("supported_parameters") or [])
+
+        self.updated_at = time.time()
+
+    def load_cache(self, path: str) -> Optional[float]:
+        """
+        Load a ``/models`` list saved by ``save_cache``.
+
+        Returns the age of the cached list in seconds, or None if there is
+        no usable cache file.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+            models = cached["models"]
+            saved_at = float(cached["saved_at"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring unreadable model catalog cache", path=path, error=str(e))
+            return None
+
+        self.update_from_models(models)
+        self.updated_at = saved_at
+        return max(time.time() - saved_at, 0.0)
+
+    @staticmethod
+    def save_cache(path: str, models: List[Dict[str, Any]]) -> None:
+        """Write a ``/models`` list to disk atomically, so concurrent workers never read a partial file."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"saved_at": time.time(), "models": models}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write model catalog cache", path=path, error=str(e))
+
+    def get(self, model: str) -> Dict[str, Any]:
+        """Return the catalog entry for a model (empty if unknown)."""
+        return self._models.get(model, {})
+
+    def context_length(self, model: str) -> int:
+        return self.get(model).get("context_length", DEFAULT_CONTEXT_LENGTH)
+
+    def completion_budget(self, model: str, prompt_tokens: int, desired: int) -> int:
+        """Largest completion size up to ``desired`` that fits beside the prompt."""
+        entry = self.get(model)
+        available = self.context_length(model) - prompt_tokens - SAFETY_MARGIN_TOKENS
+        budget = min(desired, available)
+        if entry.get("max_completion_tokens"):
+            budget = min(budget, entry["max_completion_tokens"])
+        return max(budget, 0)
+
+    def content_budget(self, model: str, overhead_tokens: int, completion_tokens: int) -> int:
+        """Tokens left for document content after the template and completion reservation."""
+        return max(
+            self.context_length(model) - overhead_tokens - completion_tokens - SAFETY_MARGIN_TOKENS,
+            0
+        )
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        """Estimated USD cost of a call, or None if the model's pricing is unknown."""
+        entry = self.get(model)
+        if "prompt_price" not in entry or "completion_price" not in entry:
+            return None
+        return prompt_tokens * entry["prompt_price"] + completion_tokens * entry["completion_price"]
+
+
+# Shared per-process catalog, refreshed from OpenRouter's model list
+model_catalog = ModelCatalog()
@@ -0,0 +1,142 @@
+"""
+Lightweight per-request tracing.
+Code marks stages with ``span(name)``; the spans of a request are returned
+in a ``Server-Timing`` header and can be appended to a local JSONL trace file.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import structlog
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+_TOKEN_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+
+class Span:
+    """One timed stage, relative to the start of its trace."""
+
+    __slots__ = ("name", "offset", "duration", "attrs")
+
+    def __init__(self, name: str, offset: float, duration: float, attrs: Dict[str, Any]):
+        self.name = name
+        self.offset = offset
+        self.duration = duration
+        self.attrs = attrs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "offset_ms": round(self.offset * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            **self.attrs
+        }
+
+
+class Trace:
+    """Spans recorded while handling one request."""
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        # Shared by child tasks too, since they inherit the context
+        self.spans: List[Span] = []
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Render completed spans as a ``Server-Timing`` header value.
+
+        Spans with the same name (e.g. one upstream call per chunk) are
+        summed, and the count is given in ``desc``.
+        """
+        totals: Dict[str, List[float]] = {}
+        for span in self.spans:
+            totals.setdefault(span.name, []).append(span.duration)
+
+        entries = []
+        for name, durations in totals.items():
+            entry = f"{_TOKEN_UNSAFE.sub('_', name)};dur={sum(durations) * 1000:.1f}"
+            if len(durations) > 1:
+                entry += f';desc="x{len(durations)}"'
+            entries.append(entry)
+        entries.append(f"total;dur={self.elapsed * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.elapsed * 1000, 3),
+            "spans": [s.to_dict() for s in sorted(self.spans, key=lambda s: s.offset)]
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def start_trace(name: str) -> Trace:
+    """Begin a trace for the current context."""
+    trace = Trace(name)
+    _current_trace.set(trace)
+    return trace
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """Time the enclosed block as a stage of the current request; no-op outside a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.spans.append(Span(name, started - trace.started, time.perf_counter() - started, attrs))
+
+
+def traced(name: str, fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap an async function so each call is recorded as a span."""
+    async def wrapper(*args, **kwargs):
+        with span(name):
+            return await fn(*args, **kwargs)
+    return wrapper
+
+
+def _append_line(path: str, line: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+async def export_trace(trace: Trace, **fields: Any) -> None:
+    """Append a finished trace to TRACE_EXPORT_PATH, subject to the sample rate."""
+    path = settings.TRACE_EXPORT_PATH
+    if not path or random.random() >= settings.TRACE_EXPORT_SAMPLE_RATE:
+        return
+
+    record = json.dumps({**trace.to_dict(), **fields}, default=str)
+    try:
+        await asyncio.to_thread(_append_line, path, record)
+    except OSError as e:
+        logger.warning("Failed to export trace", path=path, error=str(e))
@@ -0,0 +1,114 @@
+"""
+Helpers for receiving uploaded files without holding them in memory.
+"""
+
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Optional
+
+import structlog
+from fastapi import UploadFile
+
+from ..config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit."""
+    
+    def __init__(self, max_size: int):
+        super().__init__(f"File too large. Maximum {max_size // (1024 * 1024)}MB allowed")
+        self.max_size = max_size
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> str:
+    """
+    Copy an upload to a named temporary file that OCR workers can open.
+    
+    By the time a handler runs Starlette has already received the body
+    into its own spool file; oversized requests are refused before that by
+    ``UploadSizeLimitMiddleware``. Here the reported size is checked before
+    anything is copied, and the copy runs in one worker thread straight
+    from Starlette's spool file, one chunk in memory at a time. The limit
+    is enforced again while copying in case no size was reported.
+    
+    Args:
+        file: Uploaded file
+        max_size: Maximum accepted size in bytes (defaults to MAX_FILE_SIZE)
+        chunk_size: Copy size in bytes (defaults to UPLOAD_CHUNK_SIZE)
+        
+    Returns:
+        Path of the temporary file; the caller is responsible for removing it
+        
+    Raises:
+        UploadTooLargeError: If the upload exceeds ``max_size``
+    """
+    max_size = max_size or settings.MAX_FILE_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    
+    size = getattr(file, "size", None)
+    if size is not None and size > max_size:
+        raise UploadTooLargeError(max_size)
+    
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix, dir=settings.UPLOAD_TEMP_DIR or None)
+    
+    try:
+        received = await asyncio.to_thread(_copy_limited, file.file, fd, max_size, chunk_size)
+    except BaseException:
+        remove_spooled_upload(path)
+        raise
+    
+    logger.debug("Upload spooled to disk", filename=file.filename, size=received)
+    return path
+
+
+def _copy_limited(source: BinaryIO, fd: int, max_size: int, chunk_size: int) -> int:
+    """Copy ``source`` from its start into ``fd`` (closing it), stopping past ``max_size`` bytes."""
+    received = 0
+    source.seek(0)
+    with os.fdopen(fd, "wb") as out:
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            
+            received += len(chunk)
+            if received > max_size:
+                raise UploadTooLargeError(max_size)
+            
+            out.write(chunk)
+    return received
+
+
+def remove_spooled_upload(path: Optional[str]) -> None:
+    """Delete a file created by ``spool_upload``, ignoring files already gone."""
+    if not path:
+        return
+    
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Failed to remove spooled upload", path=path, error=str(e))
+
+
+@asynccontextmanager
+async def spooled_upload(
+    file: UploadFile,
+    max_size: Optional[int] = None
+) -> AsyncIterator[str]:
+    """Spool an upload to a temporary file for the duration of the block."""
+    path = await spool_upload(file, max_size=max_size)
+    try:
+        yield path
+    finally:
+        remove_spooled_upload(path)
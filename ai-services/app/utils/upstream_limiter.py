@@ -0,0 +1,270 @@
+"""
+Client-side limits on OpenRouter traffic.
+A token bucket (shared across worker processes through Redis, or local)
+caps the request rate, and an AIMD controller adapts the number of
+concurrent upstream requests to observed latency and 429 responses.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+
+from ..config import settings
+from .tracing import span
+
+logger = structlog.get_logger(__name__)
+
+UPSTREAM_CONCURRENCY_LIMIT = Gauge(
+    "ai_upstream_concurrency_limit",
+    "Current adaptive limit on concurrent upstream requests",
+    multiprocess_mode="liveall"
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "ai_upstream_in_flight",
+    "Upstream requests currently in flight",
+    multiprocess_mode="livesum"
+)
+UPSTREAM_THROTTLED = Counter(
+    "ai_upstream_throttled_total",
+    "Upstream 429 responses seen by the limiter",
+    ["model"]
+)
+UPSTREAM_LIMITER_WAIT = Histogram(
+    "ai_upstream_limiter_wait_seconds",
+    "Time spent waiting for a rate or concurrency slot before an upstream request",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+# Atomically refill the bucket from Redis server time and take tokens.
+# Returns the seconds to wait (as a string, to keep the fraction); 0 means granted.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+class LocalTokenBucket:
+    """In-process token bucket; the stand-in when Redis is not used."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _take(self, tokens: float) -> float:
+        """Take tokens if available; otherwise return the seconds until they will be."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Wait until ``tokens`` can be taken from the bucket."""
+        async with self._lock:
+            while True:
+                wait = self._take(tokens)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+
+def _per_worker_bucket(rate: float, burst: float) -> LocalTokenBucket:
+    """Local bucket holding this worker's equal share of a cluster-wide rate."""
+    workers = max(settings.WEB_CONCURRENCY, 1)
+    return LocalTokenBucket(rate / workers, max(burst / workers, 1))
+
+
+class RedisTokenBucket:
+    """Token bucket shared by every worker process through a Redis hash."""
+
+    def __init__(self, rate: float, burst: float, key: Optional[str] = None):
+        self.rate = rate
+        self.burst = burst
+        self.key = key or settings.UPSTREAM_RATE_LIMIT_REDIS_KEY
+        self._redis = None
+        self._script = None
+        # Used while Redis is unreachable, so an outage there does not stop upstream traffic
+        self._fallback = _per_worker_bucket(rate, burst)
+
+    def _get_script(self):
+        if self._script is None:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(settings.REDIS_URL)
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Wait until ``tokens`` can be taken from the shared bucket."""
+        while True:
+            try:
+                wait = float(await self._get_script()(keys=[self.key], args=[self.rate, self.burst, tokens]))
+            except Exception as e:
+                logger.warning("Shared rate limiter unavailable, using local bucket", error=str(e))
+                await self._fallback.acquire(tokens)
+                return
+
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+            self._script = None
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limit on concurrent requests.
+
+    Each request that completes within the latency target raises the limit
+    by ``1 / limit`` (about one per round of requests); a 429 halves it and a
+    slow response shrinks it by ``latency_backoff``.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        minimum: Optional[int] = None,
+        maximum: Optional[int] = None,
+        latency_target: Optional[float] = None
+    ):
+        self.minimum = minimum or settings.UPSTREAM_CONCURRENCY_MIN
+        self.maximum = maximum or settings.UPSTREAM_CONCURRENCY_MAX
+        self.limit = float(initial or settings.UPSTREAM_CONCURRENCY_INITIAL)
+        self.latency_target = latency_target or settings.UPSTREAM_LATENCY_TARGET_SECONDS
+        self.throttle_backoff = 0.5
+        self.latency_backoff = 0.9
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+        UPSTREAM_CONCURRENCY_LIMIT.set(self.limit)
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            UPSTREAM_IN_FLIGHT.inc()
+
+    async def release(self, latency: Optional[float] = None, throttled: bool = False) -> None:
+        """Free a slot and adjust the limit from the request's outcome."""
+        if throttled:
+            self.limit = max(self.minimum, self.limit * self.throttle_backoff)
+        elif latency is not None and latency > self.latency_target:
+            self.limit = max(self.minimum, self.limit * self.latency_backoff)
+        elif latency is not None:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        UPSTREAM_CONCURRENCY_LIMIT.set(self.limit)
+
+        async with self._condition:
+            self.in_flight -= 1
+            UPSTREAM_IN_FLIGHT.dec()
+            self._condition.notify_all()
+
+
+class SlotTimer:
+    """Times one upstream request; a stream marks its first chunk so later client reads are not counted."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.first_chunk_at: Optional[float] = None
+
+    def first_chunk(self) -> None:
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+
+    @property
+    def latency(self) -> float:
+        return (self.first_chunk_at or time.monotonic()) - self.started
+
+
+class UpstreamLimiter:
+    """Rate bucket plus adaptive concurrency, applied around every upstream request."""
+
+    def __init__(self, bucket=None, concurrency: Optional[AdaptiveConcurrencyLimiter] = None):
+        if bucket is None:
+            rate = settings.UPSTREAM_REQUESTS_PER_SECOND
+            burst = settings.UPSTREAM_BURST
+            if settings.UPSTREAM_RATE_LIMIT_REDIS_ENABLED:
+                bucket = RedisTokenBucket(rate, burst)
+            else:
+                bucket = _per_worker_bucket(rate, burst)
+        self.bucket = bucket
+        self.concurrency = concurrency or AdaptiveConcurrencyLimiter()
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        is_throttled: Callable[[BaseException], bool] = lambda e: False
+    ) -> AsyncIterator[SlotTimer]:
+        """
+        Hold a rate and concurrency slot for one upstream request.
+
+        The request's latency feeds the AIMD controller. Streams call
+        ``first_chunk()`` on the yielded timer, so only the time to the first
+        chunk is sampled and a slow downstream reader does not look like a
+        slow upstream.
+
+        Args:
+            model: Model being called, for metrics
+            is_throttled: Whether an exception is an upstream rate-limit response
+        """
+        if not settings.UPSTREAM_RATE_LIMIT_ENABLED:
+            yield SlotTimer()
+            return
+
+        waited = time.monotonic()
+        with span("upstream_queue"):
+            await self.bucket.acquire()
+            await self.concurrency.acquire()
+        timer = SlotTimer()
+        UPSTREAM_LIMITER_WAIT.observe(timer.started - waited)
+
+        latency = None
+        throttled = False
+        try:
+            yield timer
+            latency = timer.latency
+        except Exception as e:
+            throttled = is_throttled(e)
+            if throttled:
+                UPSTREAM_THROTTLED.labels(model=model).inc()
+            raise
+        finally:
+            await asyncio.shield(self.concurrency.release(latency, throttled=throttled))
+
+    async def close(self) -> None:
+        """Close the shared bucket's Redis connection, if any."""
+        if isinstance(self.bucket, RedisTokenBucket):
+            await self.bucket.close()
+
+
+# Shared per-process limiter for all OpenRouter traffic
+upstream_limiter = UpstreamLimiter()
@@ -0,0 +1 @@
+"""Offline benchmarks for the AI services; see ``benchmarks.run``."""
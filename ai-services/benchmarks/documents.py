@@ -0,0 +1,114 @@
+"""
+Synthetic documents and request payloads for every benchmarked endpoint.
+"""
+
+import io
+import random
+from typing import Any, Dict, Optional
+
+SIZES = {"small": 800, "medium": 6000, "large": 40000}
+
+_TEMPLATES = {
+    "invoice": [
+        "INVOICE {n}",
+        "Bill to: {company}, {street} Street, {city}.",
+        "Invoice date: 2024-{month:02d}-{day:02d}. Payment terms: net {terms} days.",
+        "Item {item}: {qty} units of {product} at ${price}.00 each.",
+        "A late fee of {fee}% per month applies to overdue balances.",
+    ],
+    "contract": [
+        "SECTION {n}. TERM AND TERMINATION",
+        "This agreement between {company} and its counterparty commences on 2024-{month:02d}-{day:02d}.",
+        "Either party may terminate this agreement with {terms} days written notice.",
+        "The supplier shall deliver {qty} units of {product} to {city} each quarter.",
+        "Confidential information must not be disclosed to third parties.",
+    ],
+    "report": [
+        "{n}. QUARTERLY RESULTS",
+        "Revenue in {city} grew by {fee}% compared with the previous quarter.",
+        "{company} shipped {qty} units of {product} across {terms} regions.",
+        "Operating costs were held flat while headcount rose to {item} employees.",
+        "The board recommends continued investment in {product} manufacturing.",
+    ],
+}
+
+_WORDS = {
+    "company": ["Acme Corporation", "Globex Ltd", "Initech", "Umbrella Holdings", "Stark Industries"],
+    "city": ["Berlin", "Chicago", "Lyon", "Osaka", "Toronto"],
+    "street": ["Main", "Market", "Station", "Harbour", "Elm"],
+    "product": ["steel brackets", "circuit boards", "office chairs", "pallets", "solar panels"],
+}
+
+
+class DocumentFactory:
+    """Deterministic generator of unique synthetic business documents."""
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.counter = 0
+
+    def text(self, size: str = "small", kind: Optional[str] = None, chars: Optional[int] = None) -> str:
+        """Generate a document of ``chars`` characters, or roughly ``SIZES[size]``."""
+        kind = kind or self.rng.choice(list(_TEMPLATES))
+        target = chars or SIZES[size]
+        self.counter += 1
+        paragraphs = [f"Reference {kind.upper()}-{self.counter:06d}"]
+        length = 0
+        n = 0
+
+        while length < target:
+            n += 1
+            values = {key: self.rng.choice(options) for key, options in _WORDS.items()}
+            values.update(
+                n=n,
+                month=self.rng.randint(1, 12),
+                day=self.rng.randint(1, 28),
+                terms=self.rng.choice([15, 30, 45, 60]),
+                item=self.rng.randint(1, 500),
+                qty=self.rng.randint(1, 1000),
+                price=self.rng.randint(5, 900),
+                fee=self.rng.randint(1, 9),
+            )
+            paragraph = "\n".join(line.format(**values) for line in _TEMPLATES[kind])
+            paragraphs.append(paragraph)
+            length += len(paragraph) + 2
+
+        return "\n\n".join(paragraphs)[:target]
+
+    def classification(self, size: str = "small") -> Dict[str, Any]:
+        return {"content": self.text(size), "document_id": f"doc-{self.counter}", "metadata": {"source": "benchmark"}}
+
+    def batch(self, count: int = 10, size: str = "small") -> Dict[str, Any]:
+        return {"documents": [self.classification(size) for _ in range(count)]}
+
+    def extraction(self, size: str = "medium") -> Dict[str, Any]:
+        return {
+            "content": self.text(size),
+            "document_id": f"doc-{self.counter}",
+            "extraction_types": ["entities", "dates", "amounts", "key_phrases"],
+        }
+
+    def analysis(self, size: str = "medium") -> Dict[str, Any]:
+        return {
+            "content": self.text(size),
+            "document_id": f"doc-{self.counter}",
+            "analysis_types": ["summary", "sentiment", "topics"],
+        }
+
+    def summary(self, size: str = "medium") -> Dict[str, Any]:
+        return {"content": self.text(size), "document_id": f"doc-{self.counter}", "max_length": 300}
+
+    def image(self, lines: int = 20) -> bytes:
+        """Render a short document as a PNG for the OCR endpoints (requires Pillow)."""
+        from PIL import Image, ImageDraw
+
+        text = self.text("small").splitlines()[:lines]
+        image = Image.new("L", (1240, 40 + 30 * len(text)), color=255)
+        draw = ImageDraw.Draw(image)
+        for row, line in enumerate(text):
+            draw.text((40, 20 + 30 * row), line, fill=0)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+
@@ -0,0 +1,212 @@
+"""
+Mock OpenRouter upstream for offline benchmarks.
+
+``MockOpenRouter`` is an ``httpx.MockTransport`` that answers ``/models``
+and ``/chat/completions`` with task-shaped replies, after a simulated
+latency drawn from a lognormal distribution and with configurable error
+rates.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.utils.tokens import DEFAULT_MODEL_LIMITS, estimate_messages_tokens, estimate_tokens
+
+PACKED_DOCUMENT = re.compile(r"=== DOCUMENT (\d+) ===")
+
+
+@dataclass
+class LatencyProfile:
+    """Lognormal latency described by its median and 99th percentile, in seconds."""
+
+    median: float
+    p99: float
+
+    def sample(self, rng: random.Random) -> float:
+        sigma = math.log(max(self.p99, self.median * 1.0001) / self.median) / 2.326
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+@dataclass
+class ErrorProfile:
+    """Fraction of requests answered with a 429, a 5xx or a read timeout."""
+
+    rate_limited: float = 0.0
+    server_error: float = 0.0
+    timeout: float = 0.0
+    retry_after: float = 1.0
+
+
+LATENCY_PROFILES: Dict[str, LatencyProfile] = {
+    "instant": LatencyProfile(median=0.001, p99=0.005),
+    "fast": LatencyProfile(median=0.05, p99=0.25),
+    "realistic": LatencyProfile(median=1.5, p99=12.0),
+    "slow-tail": LatencyProfile(median=1.0, p99=60.0),
+}
+
+ERROR_PROFILES: Dict[str, ErrorProfile] = {
+    "none": ErrorProfile(),
+    "flaky": ErrorProfile(rate_limited=0.02, server_error=0.01, timeout=0.005),
+    "throttled": ErrorProfile(rate_limited=0.2),
+    "outage": ErrorProfile(server_error=0.5, timeout=0.1),
+}
+
+
+def _classification(number: Optional[int] = None) -> Dict[str, Any]:
+    result = {
+        "primary_category": "Financial",
+        "secondary_categories": ["Business"],
+        "document_type": "Invoice",
+        "confidence": 0.91,
+        "tags": ["invoice", "payment", "vendor"],
+        "subject_area": "Accounts payable",
+        "language": "en",
+        "formality_level": "formal",
+        "target_audience": "Finance team",
+        "urgency_level": "medium",
+        "sensitivity_level": "internal",
+        "action_required": True,
+        "key_topics": ["payment terms", "amount due"],
+        "industry_vertical": "Manufacturing",
+        "compliance_indicators": ["SOX"]
+    }
+    if number is not None:
+        result["document_number"] = number
+    return result
+
+
+EXTRACTION_REPLY = {
+    "entities": [
+        {"text": "Acme Corporation", "type": "organization"},
+        {"text": "Jane Smith", "type": "person"},
+    ],
+    "dates": ["2024-03-01", "2024-03-31"],
+    "amounts": [{"value": 12500.0, "currency": "USD"}],
+    "key_phrases": ["net 30", "purchase order", "late fee"],
+    "structured_data": {"invoice_number": "INV-1042"}
+}
+
+ANALYSIS_REPLY = {
+    "summary": "An invoice from Acme Corporation requesting payment within thirty days.",
+    "insights": ["Payment is due within 30 days", "A late fee applies"],
+    "sentiment": "neutral",
+    "readability": 0.72,
+    "topics": ["billing", "payment terms"],
+    "recommendations": ["Schedule payment before the due date"]
+}
+
+
+def reply_for(messages: List[Dict[str, str]]) -> str:
+    """Choose a plausible reply from the request's system prompt."""
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+
+    if "classification" in system and "JSON array" in system:
+        numbers = [int(n) for n in PACKED_DOCUMENT.findall(user)] or [1]
+        return json.dumps([_classification(n) for n in numbers])
+    if "classification" in system:
+        return json.dumps(_classification())
+    if "extraction" in system:
+        return json.dumps(EXTRACTION_REPLY)
+    if "analysis" in system:
+        return json.dumps(ANALYSIS_REPLY)
+    if "tagging" in system:
+        return json.dumps(["invoice", "finance", "payment", "vendor"])
+    return "This document is an invoice requesting payment of 12,500 USD within thirty days."
+
+
+class MockOpenRouter(httpx.MockTransport):
+    """In-process stand-in for the OpenRouter API."""
+
+    def __init__(
+        self,
+        latency: LatencyProfile = LATENCY_PROFILES["fast"],
+        errors: ErrorProfile = ERROR_PROFILES["none"],
+        seed: int = 0,
+        stream_chunk_chars: int = 40
+    ):
+        super().__init__(self.handle)
+        self.latency = latency
+        self.errors = errors
+        self.rng = random.Random(seed)
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stats = {"requests": 0, "rate_limited": 0, "server_error": 0, "timeout": 0}
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/models"):
+            return httpx.Response(200, json={"data": self._models()})
+
+        self.stats["requests"] += 1
+        payload = json.loads(request.content or b"{}")
+        await asyncio.sleep(self.latency.sample(self.rng))
+
+        roll = self.rng.random()
+        if roll < self.errors.timeout:
+            self.stats["timeout"] += 1
+            raise httpx.ReadTimeout("Simulated upstream timeout", request=request)
+        roll -= self.errors.timeout
+        if roll < self.errors.rate_limited:
+            self.stats["rate_limited"] += 1
+            return httpx.Response(
+                429,
+                json={"error": {"message": "Rate limit exceeded"}},
+                headers={"Retry-After": str(self.errors.retry_after)}
+            )
+        roll -= self.errors.rate_limited
+        if roll < self.errors.server_error:
+            self.stats["server_error"] += 1
+            return httpx.Response(502, json={"error": {"message": "Upstream unavailable"}})
+
+        messages = payload.get("messages", [])
+        model = payload.get("model", "")
+        content = reply_for(messages)
+
+        if payload.get("stream"):
+            return httpx.Response(
+                200,
+                content=self._sse_body(model, content),
+                headers={"Content-Type": "text/event-stream"}
+            )
+
+        prompt_tokens = estimate_messages_tokens(messages)
+        completion_tokens = estimate_tokens(content)
+        return httpx.Response(200, json={
+            "id": f"gen-{self.stats['requests']}",
+            "model": model,
+            "created": int(time.time()),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    def _sse_body(self, model: str, content: str) -> bytes:
+        size = self.stream_chunk_chars
+        events = [
+            "data: " + json.dumps({"model": model, "choices": [{"index": 0, "delta": {"content": content[i:i + size]}}]})
+            for i in range(0, len(content), size)
+        ]
+        events.append("data: [DONE]")
+        return ("\n\n".join(events) + "\n\n").encode("utf-8")
+
+    @staticmethod
+    def _models() -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": model_id,
+                "context_length": limits["context_length"],
+                "pricing": {"prompt": str(limits["prompt_price"]), "completion": str(limits["completion_price"])},
+                "supported_parameters": ["temperature", "max_tokens", "response_format"]
+            }
+            for model_id, limits in DEFAULT_MODEL_LIMITS.items()
+        ]
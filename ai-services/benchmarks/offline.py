@@ -0,0 +1,115 @@
+"""
+Stand-ins for the parts of ``main`` that the offline benchmark does not measure.
+
+``main`` imports the database layer, request/response models, the OCR,
+extraction, analysis and document services and auth. Where one of those
+modules is not importable (it is not part of every checkout, or its
+dependencies are not installed), ``install_missing_modules`` registers a
+minimal stand-in in ``sys.modules`` so the app can still be built.
+Extraction and analysis stand-ins call the shared ``OpenRouterClient``
+directly, so those routes still exercise the upstream path; OCR requests fail.
+Modules that import normally are left untouched.
+"""
+
+import importlib
+import sys
+import types
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class NullDocumentService:
+    """Stands in for the database-backed processing log."""
+
+    async def log_processing(self, **kwargs) -> None:
+        return None
+
+    async def log_batch_processing(self, **kwargs) -> None:
+        return None
+
+
+async def noop() -> None:
+    return None
+
+
+class _Model(BaseModel):
+    """Permissive model: responses pass through unchanged."""
+
+    model_config = ConfigDict(extra="allow")
+
+
+class ClassificationRequest(_Model):
+    content: str
+    document_id: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class ExtractionRequest(ClassificationRequest):
+    extraction_types: List[str] = ["entities", "dates", "amounts", "key_phrases"]
+
+
+class AnalysisRequest(ClassificationRequest):
+    analysis_types: List[str] = ["summary", "sentiment", "topics"]
+
+
+class _Service:
+    def __init__(self, openrouter_client=None, executor=None):
+        self.client = openrouter_client
+
+    async def initialize(self) -> None:
+        return None
+
+
+class ExtractionService(_Service):
+    async def extract_information(self, content: str, extraction_types: List[str], metadata=None) -> Dict[str, Any]:
+        return await self.client.extract_information(content, extraction_types)
+
+
+class AnalysisService(_Service):
+    async def analyze_content(self, content: str, analysis_types: List[str], metadata=None) -> Dict[str, Any]:
+        return await self.client.analyze_content(content, analysis_types)
+
+
+class OCRService(_Service):
+    async def process_document(self, *args, **kwargs) -> Dict[str, Any]:
+        raise RuntimeError("OCR service is not available in this checkout")
+
+
+async def verify_token() -> Dict[str, str]:
+    return {"user_id": "anonymous", "username": "anonymous"}
+
+
+STAND_INS: Dict[str, Dict[str, Any]] = {
+    "app.database": {"init_db": noop, "close_db": noop},
+    "app.models": {
+        "OCRRequest": _Model,
+        "OCRResponse": _Model,
+        "ClassificationRequest": ClassificationRequest,
+        "ClassificationResponse": _Model,
+        "ExtractionRequest": ExtractionRequest,
+        "ExtractionResponse": _Model,
+        "AnalysisRequest": AnalysisRequest,
+        "AnalysisResponse": _Model,
+        "HealthResponse": _Model,
+    },
+    "app.services.ocr_service": {"OCRService": OCRService},
+    "app.services.extraction_service": {"ExtractionService": ExtractionService},
+    "app.services.analysis_service": {"AnalysisService": AnalysisService},
+    "app.services.document_service": {"DocumentService": NullDocumentService},
+    "app.utils.auth": {"verify_token": verify_token},
+}
+
+
+def install_missing_modules() -> List[str]:
+    """Register a stand-in for each module ``main`` needs that cannot be imported; return their names."""
+    installed = []
+    for name, attributes in STAND_INS.items():
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            module = types.ModuleType(name)
+            module.__dict__.update(attributes)
+            sys.modules[name] = module
+            installed.append(name)
+    return installed
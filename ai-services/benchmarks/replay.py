@@ -0,0 +1,259 @@
+"""
+Replay recorded OpenRouter traffic against the service at N× speed.
+
+Reads a journal written with ``OPENROUTER_RECORD_PATH`` (see
+``app.utils.cassette``) and re-issues each recorded inbound request at its
+original offset divided by ``--speed``. Documents are regenerated at their
+original size, and repeated documents (same content hash) get the same text,
+so cache hit rates carry over. The upstream is a ``ReplayTransport`` that
+answers each task with its recorded replies, errors and latencies.
+
+Usage (from ai-services/):
+
+    python -m benchmarks.replay /var/lib/dms/recordings --speed 24
+    python -m benchmarks.replay recording.jsonl.gz --speed 10 --limit 5000 --latency-scale 0.5
+
+Packed batch calls are replayed as one document per recorded upstream call,
+and OCR traffic is not part of the journal.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.run import offline_client, peak_rss_mb, percentile
+from benchmarks.documents import DocumentFactory
+from benchmarks.mock_openrouter import MockOpenRouter
+
+from app.utils.cassette import read_cassette, task_hash
+
+# Request bodies for each recorded endpoint, given the regenerated document text
+ENDPOINT_PAYLOADS = {
+    "/classify/document": lambda text: {"content": text},
+    "/classify/document/stream": lambda text: {"content": text},
+    "/extract/content": lambda text: {"content": text, "extraction_types": ["entities", "dates", "amounts", "key_phrases"]},
+    "/extract/content/stream": lambda text: {"content": text, "extraction_types": ["entities", "dates", "amounts", "key_phrases"]},
+    "/analyze/document": lambda text: {"content": text, "analysis_types": ["summary", "sentiment", "topics"]},
+    "/analyze/document/stream": lambda text: {"content": text, "analysis_types": ["summary", "sentiment", "topics"]},
+    "/summarize/stream": lambda text: {"content": text},
+}
+STREAMING_ENDPOINTS = {"/classify/batch", "/classify/document/stream", "/extract/content/stream", "/analyze/document/stream", "/summarize/stream"}
+
+
+class ReplayTransport(httpx.MockTransport):
+    """Upstream that answers each task with its recorded responses, in recorded order, at recorded latency."""
+
+    def __init__(self, records: List[Dict[str, Any]], latency_scale: float = 1.0):
+        super().__init__(self.handle)
+        self.latency_scale = latency_scale
+        self.pools: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.positions: Dict[str, int] = defaultdict(int)
+        self.stats = {"requests": 0, "unmatched": 0}
+
+        for record in records:
+            # Cancelled calls (e.g. hedge losers) say nothing about upstream behaviour
+            if record["response"].get("error") == "cancelled":
+                continue
+            self.pools[record["request"]["task"]].append(record)
+            self.pools["*"].append(record)
+
+    def _next(self, task: str) -> Dict[str, Any]:
+        pool = self.pools.get(task)
+        if not pool:
+            self.stats["unmatched"] += 1
+            task, pool = "*", self.pools["*"]
+        record = pool[self.positions[task] % len(pool)]
+        self.positions[task] += 1
+        return record
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/models"):
+            return httpx.Response(200, json={"data": MockOpenRouter._models()})
+
+        self.stats["requests"] += 1
+        payload = json.loads(request.content or b"{}")
+        system = next((m["content"] for m in payload.get("messages", []) if m.get("role") == "system"), "")
+        record = self._next(task_hash(system))
+        response = record["response"]
+
+        duration = record["duration_ms"] / 1000 * self.latency_scale
+        ttfb = (record.get("ttfb_ms") or record["duration_ms"]) / 1000 * self.latency_scale
+
+        if response.get("status") is None:
+            await asyncio.sleep(duration)
+            raise httpx.ReadTimeout(f"Replayed {response.get('error')}", request=request)
+
+        await asyncio.sleep(ttfb)
+        if response["status"] != 200 or response.get("error"):
+            headers = {"Retry-After": str(response["retry_after"])} if response.get("retry_after") else {}
+            return httpx.Response(response["status"] if response["status"] != 200 else 502, headers=headers, json={
+                "error": {"message": "Replayed upstream error"}
+            })
+
+        model = response.get("model") or payload.get("model")
+        content = response.get("content", "")
+        if payload.get("stream"):
+            return httpx.Response(
+                200,
+                content=self._sse(model, content, response.get("chunks") or 1, max(duration - ttfb, 0.0)),
+                headers={"Content-Type": "text/event-stream"}
+            )
+
+        return httpx.Response(200, json={
+            "id": f"replay-{self.stats['requests']}",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": response.get("usage")
+        })
+
+    async def _sse(self, model: str, content: str, chunks: int, remaining: float):
+        """Stream ``content`` in the recorded number of chunks, spread over the rest of the recorded duration."""
+        size = max(1, -(-len(content) // chunks))
+        pause = remaining / chunks
+        for i in range(0, len(content), size):
+            await asyncio.sleep(pause)
+            event = {"model": model, "choices": [{"index": 0, "delta": {"content": content[i:i + size]}}]}
+            yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+
+def inbound_requests(records: List[Dict[str, Any]]) -> List[Tuple[float, str, List[Tuple[int, str]]]]:
+    """
+    Group upstream calls by the inbound request that made them.
+
+    Returns ``(arrival time, path, [(document chars, document hash), ...])``
+    per inbound request, in arrival order.
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for record in records:
+        if record.get("trace") and record.get("endpoint"):
+            groups[record["trace"]].append(record)
+
+    requests = []
+    for calls in groups.values():
+        method, path = calls[0]["endpoint"].split(" ", 1)
+        if method != "POST" or (path not in ENDPOINT_PAYLOADS and path != "/classify/batch"):
+            continue
+        documents = []
+        for call in calls:
+            user = [m for m in call["request"]["messages"] if m["role"] == "user"]
+            if user:
+                documents.append((user[-1]["chars"], user[-1]["hash"]))
+        if not documents:
+            continue
+        if path != "/classify/batch":
+            # Chunked or retried calls for one document: keep the original document once
+            documents = [max(documents)]
+        requests.append((min(c["t"] for c in calls), path, documents))
+
+    requests.sort(key=lambda r: r[0])
+    return requests
+
+
+class DocumentCache:
+    """Regenerates the same synthetic text for the same recorded document hash."""
+
+    def __init__(self):
+        self._texts: Dict[str, str] = {}
+
+    def text(self, chars: int, content_hash: str) -> str:
+        text = self._texts.get(content_hash)
+        if text is None:
+            factory = DocumentFactory(seed=int(content_hash[:8], 16))
+            text = self._texts[content_hash] = factory.text(chars=max(chars, 1))
+        return text
+
+
+async def replay(args: argparse.Namespace) -> int:
+    records = list(read_cassette(args.cassette))
+    requests = inbound_requests(records)
+    if args.limit:
+        requests = requests[:args.limit]
+    if not requests:
+        print("No replayable requests in the recording")
+        return 1
+
+    transport = ReplayTransport(records, latency_scale=args.latency_scale)
+    documents = DocumentCache()
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    in_flight = 0
+    peak_in_flight = 0
+
+    async def send(client: httpx.AsyncClient, path: str, docs: List[Tuple[int, str]]) -> None:
+        nonlocal in_flight, peak_in_flight
+        if path == "/classify/batch":
+            body: Dict[str, Any] = {"documents": [{"content": documents.text(*d)} for d in docs]}
+        else:
+            body = ENDPOINT_PAYLOADS[path](documents.text(*docs[0]))
+
+        in_flight += 1
+        peak_in_flight = max(peak_in_flight, in_flight)
+        started = time.perf_counter()
+        try:
+            if path in STREAMING_ENDPOINTS:
+                async with client.stream("POST", path, json=body) as response:
+                    async for _ in response.aiter_bytes():
+                        pass
+            else:
+                response = await client.post(path, json=body)
+            # Failures are counted apart so they do not skew the latency percentiles
+            if response.status_code >= 400:
+                errors[path] += 1
+            else:
+                latencies[path].append(time.perf_counter() - started)
+        except Exception:
+            errors[path] += 1
+        finally:
+            in_flight -= 1
+
+    origin = requests[0][0]
+    span = (requests[-1][0] - origin) / args.speed
+    print(f"Replaying {len(requests)} requests recorded over {(requests[-1][0] - origin) / 60:.1f} min "
+          f"in {span / 60:.1f} min ({args.speed}x)")
+
+    async with offline_client(transport) as client:
+        tasks = []
+        started = time.perf_counter()
+        for arrival, path, docs in requests:
+            delay = (arrival - origin) / args.speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(client, path, docs)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    print(f"{'endpoint':<28} {'ok':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for path in sorted(latencies.keys() | errors.keys()):
+        values = latencies[path]
+        print(
+            f"{path:<28} {len(values):>6} {errors[path]:>5} {percentile(values, 50) * 1000:>9.1f} "
+            f"{percentile(values, 95) * 1000:>9.1f} {percentile(values, 99) * 1000:>9.1f}"
+        )
+    succeeded = sum(len(values) for values in latencies.values())
+    print(f"throughput {succeeded / elapsed:.1f} ok req/s ({sum(errors.values())} errors), peak in flight {peak_in_flight}, "
+          f"peak RSS {peak_rss_mb():.1f} MB, upstream {transport.stats}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded OpenRouter traffic against the service")
+    parser.add_argument("cassette", help="Recording file or directory written via OPENROUTER_RECORD_PATH")
+    parser.add_argument("--speed", type=float, default=1.0, help="Compress inter-arrival times by this factor")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply recorded upstream latencies")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N inbound requests")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(replay(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
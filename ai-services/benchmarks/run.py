@@ -0,0 +1,306 @@
+"""
+Offline load benchmark for the AI services.
+
+Runs the real FastAPI app in-process against a mock OpenRouter upstream, so
+results reflect this service's own overhead (routing, prompt building,
+caching, parsing, streaming) rather than the network or the models.
+The database and request logging are replaced with no-ops and auth is
+overridden with a fixed benchmark user. Modules ``main`` imports that are
+missing from the checkout are replaced by the stand-ins in
+``benchmarks.offline``.
+
+Usage (from ai-services/):
+
+    python -m benchmarks.run
+    python -m benchmarks.run --scenarios classify,extract --concurrency 1,16,64 --latency realistic
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --tolerance 0.15
+
+RPS and latency percentiles cover successful requests only; failed
+requests are counted separately under ``err``, so a fast-failing run
+cannot look like a speed-up.
+
+``--compare`` exits with status 1 if any scenario's RPS drops, its p95
+latency grows by more than the tolerance, or it has more errors.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+# Settings are read at import time, so offline defaults must be in place before importing the app
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_REDIS_ENABLED", "false")
+os.environ.setdefault("RESULT_CACHE_REDIS_ENABLED", "false")
+os.environ.setdefault("UPSTREAM_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("UPSTREAM_RATE_LIMIT_REDIS_ENABLED", "false")
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+
+import httpx  # noqa: E402
+
+from benchmarks.documents import DocumentFactory  # noqa: E402
+from benchmarks.mock_openrouter import ERROR_PROFILES, LATENCY_PROFILES, MockOpenRouter  # noqa: E402
+from benchmarks.offline import NullDocumentService, noop, install_missing_modules  # noqa: E402
+
+BENCH_USER = {"user_id": "bench-user", "username": "bench"}
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    payload: Callable[[DocumentFactory], Dict[str, Any]]
+    files: Optional[Callable[[DocumentFactory], Dict[str, Any]]] = None
+    streaming: bool = False
+
+
+def _ocr_files(factory: DocumentFactory) -> Dict[str, Any]:
+    return {"file": ("bench.png", factory.image(), "image/png")}
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s for s in [
+        Scenario("classify", "POST", "/classify/document", lambda f: f.classification("small")),
+        Scenario("classify-large", "POST", "/classify/document", lambda f: f.classification("large")),
+        Scenario("classify-batch", "POST", "/classify/batch?pack=true", lambda f: f.batch(10), streaming=True),
+        Scenario("extract", "POST", "/extract/content", lambda f: f.extraction()),
+        Scenario("analyze", "POST", "/analyze/document", lambda f: f.analysis()),
+        Scenario("classify-stream", "POST", "/classify/document/stream", lambda f: f.classification(), streaming=True),
+        Scenario("summarize-stream", "POST", "/summarize/stream", lambda f: f.summary(), streaming=True),
+        Scenario("ocr", "POST", "/ocr/process", lambda f: {}, files=_ocr_files),
+    ]
+}
+
+DEFAULT_SCENARIOS = ["classify", "classify-large", "classify-batch", "extract", "analyze", "summarize-stream"]
+
+
+@dataclass
+class Result:
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int
+    seconds: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+    factory: DocumentFactory,
+    headers: Dict[str, str]
+) -> Result:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def send() -> None:
+        # Build every request before timing it so document generation is not measured
+        kwargs: Dict[str, Any] = {"headers": headers}
+        if scenario.files is not None:
+            kwargs["files"] = scenario.files(factory)
+        else:
+            kwargs["json"] = scenario.payload(factory)
+
+        started = time.perf_counter()
+        if scenario.streaming:
+            async with client.stream(scenario.method, scenario.path, **kwargs) as response:
+                async for _ in response.aiter_bytes():
+                    pass
+        else:
+            response = await client.request(scenario.method, scenario.path, **kwargs)
+        if response.status_code >= 400:
+            raise httpx.HTTPStatusError("error", request=response.request, response=response)
+        latencies.append(time.perf_counter() - started)
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            try:
+                await send()
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return Result(
+        scenario=scenario.name,
+        concurrency=concurrency,
+        requests=requests,
+        errors=errors,
+        seconds=round(elapsed, 3),
+        rps=round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        peak_rss_mb=round(peak_rss_mb(), 1)
+    )
+
+
+@asynccontextmanager
+async def offline_client(transport: httpx.AsyncBaseTransport) -> AsyncIterator[httpx.AsyncClient]:
+    """Start the app against ``transport`` in offline mode and yield a client bound to it in-process."""
+    stand_ins = install_missing_modules()
+    if stand_ins:
+        print(f"Using stand-ins for missing modules: {', '.join(stand_ins)}", file=sys.stderr)
+
+    import main as service
+    from app.utils.auth import verify_token
+
+    # Offline mode: no database, no processing log, fixed user
+    service.init_db = noop
+    service.close_db = noop
+    service.DocumentService = NullDocumentService
+    service.app.dependency_overrides[verify_token] = lambda: BENCH_USER
+    service.app.state.openrouter_transport = transport
+
+    async with service.app.router.lifespan_context(service.app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=service.app),
+            base_url="http://bench",
+            timeout=None
+        ) as client:
+            yield client
+
+
+async def run_benchmarks(args: argparse.Namespace, transport: httpx.AsyncBaseTransport) -> List[Result]:
+    factory = DocumentFactory(seed=args.seed)
+    headers = {"Cache-Control": "no-cache"} if args.no_cache else {}
+    results = []
+
+    async with offline_client(transport) as client:
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            if args.warmup:
+                await run_scenario(client, scenario, 1, args.warmup, factory, headers)
+            for concurrency in args.concurrency:
+                result = await run_scenario(client, scenario, concurrency, args.requests, factory, headers)
+                results.append(result)
+                print(format_row(result), flush=True)
+
+    return results
+
+
+HEADER = f"{'scenario':<18} {'conc':>5} {'reqs':>6} {'err':>5} {'ok rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MB':>8}"
+
+
+def format_row(r: Result) -> str:
+    return (
+        f"{r.scenario:<18} {r.concurrency:>5} {r.requests:>6} {r.errors:>5} {r.rps:>9.1f} "
+        f"{r.p50_ms:>9.1f} {r.p95_ms:>9.1f} {r.p99_ms:>9.1f} {r.peak_rss_mb:>8.1f}"
+    )
+
+
+def compare(results: List[Result], baseline_path: str, tolerance: float) -> List[str]:
+    """Return a description of every result that regressed beyond ``tolerance`` against the baseline."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(b["scenario"], b["concurrency"]): b for b in json.load(f)["results"]}
+
+    regressions = []
+    for r in results:
+        base = baseline.get((r.scenario, r.concurrency))
+        if base is None:
+            continue
+        if base["rps"] and r.rps < base["rps"] * (1 - tolerance):
+            regressions.append(f"{r.scenario} @{r.concurrency}: rps {r.rps:.1f} < baseline {base['rps']:.1f}")
+        if base["p95_ms"] and r.p95_ms > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{r.scenario} @{r.concurrency}: p95 {r.p95_ms:.1f}ms > baseline {base['p95_ms']:.1f}ms")
+        if r.errors > base["errors"]:
+            regressions.append(f"{r.scenario} @{r.concurrency}: {r.errors} errors > baseline {base['errors']}")
+    return regressions
+
+
+def _csv(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline AI services benchmark")
+    parser.add_argument("--scenarios", type=_csv, default=DEFAULT_SCENARIOS,
+                        help=f"Comma-separated scenarios: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in _csv(v)], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency", choices=list(LATENCY_PROFILES), default="fast")
+    parser.add_argument("--errors", choices=list(ERROR_PROFILES), default="none")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-cache", action="store_true", help="Send Cache-Control: no-cache with every request")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    transport = MockOpenRouter(
+        latency=LATENCY_PROFILES[args.latency],
+        errors=ERROR_PROFILES[args.errors],
+        seed=args.seed
+    )
+
+    print(HEADER)
+    results = asyncio.run(run_benchmarks(args, transport))
+    print(f"mock upstream: {transport.stats}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": time.time(),
+                "latency": args.latency,
+                "errors": args.errors,
+                "results": [asdict(r) for r in results]
+            }, f, indent=2)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,18 @@ Provides OCR, classification, content extraction, and analysis capabilities.
 """
 
 import asyncio
+import json
 import logging
+import os
+import time
 from contextlib import asynccontextmanager
 from typing import List, Optional
 
 import uvicorn
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
-from prometheus_client import make_asgi_app
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
 import structlog
 
 from app.config import settings
@@ -25,6 +27,8 @@ from app.models import (
     AnalysisRequest, AnalysisResponse,
     HealthResponse
 )
+from app.services.openrouter_client import OpenRouterClient, create_http_client
+from app.services.model_router import set_latency_tier
 from app.services.ocr_service import OCRService
 from app.services.classification_service import ClassificationService
 from app.services.extraction_service import ExtractionService
@@ -32,6 +36,26 @@ from app.services.analysis_service import AnalysisService
 from app.services.document_service import DocumentService
 from app.utils.auth import verify_token
 from app.utils.rate_limiter import RateLimiter
+from app.utils.cache import result_cache, set_cache_bypass
+from app.utils.metrics import (
+    OCR_DOCUMENT_SECONDS,
+    OCR_PAGE_SECONDS,
+    create_metrics_app,
+    mark_process_dead,
+    monitor_event_loop_lag
+)
+from app.utils.middleware import (
+    RequestTimingMiddleware,
+    StreamingAwareGZipMiddleware,
+    TracingMiddleware,
+    UploadSizeLimitMiddleware,
+    mark_handler_start
+)
+from app.utils.process_pool import ProcessPoolEngine
+from app.utils.sse import sse_response
+from app.utils.tracing import span, traced
+from app.utils.upstream_limiter import upstream_limiter
+from app.utils.uploads import UploadTooLargeError, remove_spooled_upload, spool_upload, spooled_upload
 
 # Configure structured logging
 structlog.configure(
@@ -55,6 +79,9 @@ structlog.configure(
 logger = structlog.get_logger(__name__)
 
 # Global service instances
+openrouter_http_client = None
+openrouter_client = None
+ocr_pool = None
 ocr_service = None
 classification_service = None
 extraction_service = None
@@ -62,10 +89,32 @@ analysis_service = None
 document_service = None
 rate_limiter = None
 
+# Background initialization state per service (initializing, ready or failed), reported by /health
+service_status = {name: "initializing" for name in ("ocr", "classification", "extraction", "analysis")}
+# Services that track their own status (e.g. while retrying initialization) are reported live
+service_objects = {}
+
+async def initialize_service(name: str, service, warm_up=None):
+    """Initialize one service in the background and record the outcome for /health."""
+    service_objects[name] = service
+    try:
+        if warm_up is not None:
+            await warm_up()
+        await service.initialize()
+        service_status[name] = getattr(service, "status", "ready")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        service_status[name] = "failed"
+        logger.error("Service initialization failed", service=name, error=str(e))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown events."""
+    global openrouter_http_client, openrouter_client, ocr_pool
     global ocr_service, classification_service, extraction_service, analysis_service, document_service, rate_limiter
+    lag_monitor = None
+    init_tasks = []
     
     try:
         # Startup
@@ -74,23 +123,39 @@ async def lifespan(app: FastAPI):
         # Initialize database connections
         await init_db()
         
+        # One pooled HTTP client per worker, shared by every service that calls OpenRouter
+        # Benchmarks install a mock upstream transport on app.state before startup
+        openrouter_http_client = create_http_client(
+            transport=getattr(app.state, "openrouter_transport", None)
+        )
+        openrouter_client = OpenRouterClient(http_client=openrouter_http_client)
+        
+        # CPU-bound OCR and image work runs in worker processes, off the event loop;
+        # they are warmed up in the background with the OCR service
+        ocr_pool = ProcessPoolEngine()
+        await ocr_pool.start(warm=False)
+        
         # Initialize services
-        ocr_service = OCRService()
-        classification_service = ClassificationService()
-        extraction_service = ExtractionService()
-        analysis_service = AnalysisService()
+        ocr_service = OCRService(executor=ocr_pool)
+        classification_service = ClassificationService(openrouter_client=openrouter_client)
+        extraction_service = ExtractionService(openrouter_client=openrouter_client)
+        analysis_service = AnalysisService(openrouter_client=openrouter_client)
         document_service = DocumentService()
         rate_limiter = RateLimiter()
+        rate_limiter.start()
         
-        # Load ML models
-        await asyncio.gather(
-            ocr_service.initialize(),
-            classification_service.initialize(),
-            extraction_service.initialize(),
-            analysis_service.initialize()
-        )
+        # Load ML models in the background so a slow upstream or model load never delays
+        # accepting requests; /health reports progress and requests wait for readiness
+        init_tasks = [
+            asyncio.create_task(initialize_service("ocr", ocr_service, warm_up=ocr_pool.warm_up)),
+            asyncio.create_task(initialize_service("classification", classification_service)),
+            asyncio.create_task(initialize_service("extraction", extraction_service)),
+            asyncio.create_task(initialize_service("analysis", analysis_service)),
+        ]
+        
+        lag_monitor = asyncio.create_task(monitor_event_loop_lag())
         
-        logger.info("AI services initialized successfully")
+        logger.info("AI services started, initializing in background")
         yield
         
     except Exception as e:
@@ -99,7 +164,22 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down AI services")
+        for task in init_tasks:
+            task.cancel()
+        if lag_monitor is not None:
+            lag_monitor.cancel()
+        if rate_limiter is not None:
+            await rate_limiter.close()
+        await result_cache.close()
+        await upstream_limiter.close()
+        if openrouter_client is not None:
+            await openrouter_client.aclose()
+        if openrouter_http_client is not None:
+            await openrouter_http_client.aclose()
+        if ocr_pool is not None:
+            await ocr_pool.shutdown()
         await close_db()
+        mark_process_dead()
 
 # Create FastAPI application
 app = FastAPI(
@@ -109,22 +189,47 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
-    lifespan=lifespan
+    lifespan=lifespan,
+    dependencies=[Depends(mark_handler_start)]
 )
 
-# Add middleware
+# Add middleware (the last one added runs outermost)
+
+# Refuse oversized uploads from their Content-Length, before the body is received;
+# added before CORS so its 413 responses still carry CORS headers
+app.add_middleware(UploadSizeLimitMiddleware, limits={
+    "/ocr/process": settings.MAX_FILE_SIZE,
+    "/ocr/batch": settings.MAX_FILE_SIZE * settings.MAX_BATCH_SIZE,
+})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Trace-Id"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Streaming endpoints must flush each event immediately, so they skip compression
+STREAMING_PATHS = [
+    "/classify/batch",
+    "/classify/document/stream",
+    "/extract/content/stream",
+    "/analyze/document/stream",
+    "/summarize/stream",
+]
+
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=1000, streaming_paths=STREAMING_PATHS)
+
+# Per-endpoint queue wait vs processing time
+app.add_middleware(RequestTimingMiddleware)
 
-# Add Prometheus metrics
-metrics_app = make_asgi_app()
+# Stage timings in a Server-Timing header (outermost, so its total covers the whole request)
+app.add_middleware(TracingMiddleware)
+
+# Add Prometheus metrics (aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set)
+metrics_app = create_metrics_app()
 app.mount("/metrics", metrics_app)
 
 # Dependency for getting services
@@ -143,20 +248,47 @@ async def get_analysis_service() -> AnalysisService:
 async def get_document_service() -> DocumentService:
     return document_service
 
+async def get_openrouter_client() -> OpenRouterClient:
+    return openrouter_client
+
+async def enforce_rate_limit(current_user=Depends(verify_token)):
+    """Apply the per-user request limits; raises 429 with Retry-After when exceeded."""
+    await rate_limiter.check_rate_limit(current_user["user_id"])
+
+async def cache_control(request: Request):
+    """Honour ``Cache-Control: no-cache`` by bypassing the model result cache."""
+    directives = request.headers.get("cache-control", "").lower()
+    set_cache_bypass("no-cache" in directives or "no-store" in directives)
+
+async def latency_tier(request: Request):
+    """Apply the client's ``X-Latency-Tier`` (fast, standard, accurate) to model routing."""
+    set_latency_tier(request.headers.get("x-latency-tier"))
+
 # Health check endpoint
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint for monitoring."""
-    return HealthResponse(
-        status="healthy",
-        version="1.0.0",
-        services={
-            "ocr": "ready" if ocr_service else "not_ready",
-            "classification": "ready" if classification_service else "not_ready",
-            "extraction": "ready" if extraction_service else "not_ready",
-            "analysis": "ready" if analysis_service else "not_ready",
-        }
-    )
+    """
+    Health check endpoint for monitoring.
+    
+    ``status`` is ``healthy`` once every service is ready, ``initializing``
+    while background startup is still running, and ``degraded`` if a
+    service failed to initialize (it is retried) or the last model catalog
+    refresh failed.
+    """
+    services = {
+        name: getattr(service_objects.get(name), "status", state)
+        for name, state in service_status.items()
+    }
+    services["model_catalog"] = openrouter_client.catalog_status() if openrouter_client else "initializing"
+    
+    if "failed" in services.values() or services["model_catalog"] == "stale":
+        status = "degraded"
+    elif "initializing" in services.values():
+        status = "initializing"
+    else:
+        status = "healthy"
+    
+    return HealthResponse(status=status, version="1.0.0", services=services)
 
 # OCR Endpoints
 @app.post("/ocr/process", response_model=OCRResponse)
@@ -166,7 +298,7 @@ async def process_ocr(
     background_tasks: BackgroundTasks = BackgroundTasks(),
     ocr_svc: OCRService = Depends(get_ocr_service),
     current_user=Depends(verify_token),
-    _rate_limit=Depends(lambda: rate_limiter.check_rate_limit)
+    _rate_limit=Depends(enforce_rate_limit)
 ):
     """
     Process document with OCR to extract text content.
@@ -179,15 +311,19 @@ async def process_ocr(
         if not file.filename.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg', '.tiff', '.bmp')):
             raise HTTPException(status_code=400, detail="Unsupported file format")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Process OCR
-        result = await ocr_svc.process_document(
-            file_content=file_content,
-            filename=file.filename,
-            language=language
-        )
+        # Spool the upload to disk in chunks so memory stays flat for large files
+        try:
+            async with spooled_upload(file, max_size=settings.MAX_FILE_SIZE) as file_path:
+                started = time.perf_counter()
+                with span("ocr"):
+                    result = await ocr_svc.process_document(
+                        file_path=file_path,
+                        filename=file.filename,
+                        language=language
+                    )
+                record_ocr_timing(file.filename, started, result)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
         
         # Log processing in background
         background_tasks.add_task(
@@ -200,10 +336,86 @@ async def process_ocr(
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("OCR processing failed", error=str(e), filename=file.filename)
         raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
 
+def record_ocr_timing(filename: str, started: float, result) -> None:
+    """Observe OCR time per document and, where the result reports pages, per page."""
+    elapsed = time.perf_counter() - started
+    file_type = os.path.splitext(filename or "")[1].lstrip(".").lower() or "unknown"
+    OCR_DOCUMENT_SECONDS.labels(file_type=file_type).observe(elapsed)
+    
+    fields = result if isinstance(result, dict) else getattr(result, "__dict__", {})
+    pages = fields.get("page_count") or fields.get("pages") or 1
+    if isinstance(pages, list):
+        pages = len(pages) or 1
+    OCR_PAGE_SECONDS.observe(elapsed / pages)
+
+async def run_ocr_pipeline(
+    files: List[UploadFile],
+    language: str,
+    ocr_svc: OCRService
+) -> list:
+    """
+    Run OCR over a batch with a bounded producer/consumer pipeline.
+    
+    One producer spools files to disk while OCR_BATCH_WINDOW workers process
+    them; each temporary file is removed as soon as its OCR finishes.
+    Returns results in input order, with exceptions in place of failed items.
+    """
+    workers = max(1, min(settings.OCR_BATCH_WINDOW, len(files)))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    results: list = [None] * len(files)
+    
+    async def produce():
+        for index, file in enumerate(files):
+            try:
+                file_path = await spool_upload(file, max_size=settings.MAX_FILE_SIZE)
+            except Exception as e:
+                results[index] = e
+                continue
+            finally:
+                # Release the request's copy of the upload as soon as it is spooled
+                await file.close()
+            await queue.put((index, file, file_path))
+        
+        for _ in range(workers):
+            await queue.put(None)
+    
+    async def consume():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            
+            index, file, file_path = item
+            try:
+                started = time.perf_counter()
+                results[index] = await ocr_svc.process_document(
+                    file_path=file_path,
+                    filename=file.filename,
+                    language=language
+                )
+                record_ocr_timing(file.filename, started, results[index])
+            except Exception as e:
+                results[index] = e
+            finally:
+                remove_spooled_upload(file_path)
+    
+    try:
+        await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+    finally:
+        # Clean up anything left queued if the pipeline was cancelled
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                remove_spooled_upload(item[2])
+    
+    return results
+
 @app.post("/ocr/batch", response_model=List[OCRResponse])
 async def process_ocr_batch(
     files: List[UploadFile] = File(...),
@@ -211,9 +423,9 @@ async def process_ocr_batch(
     background_tasks: BackgroundTasks = BackgroundTasks(),
     ocr_svc: OCRService = Depends(get_ocr_service),
     current_user=Depends(verify_token),
-    _rate_limit=Depends(lambda: rate_limiter.check_rate_limit)
+    _rate_limit=Depends(enforce_rate_limit)
 ):
-    """Process multiple documents with OCR in parallel."""
+    """Process multiple documents with OCR through a bounded pipeline."""
     try:
         logger.info("Processing batch OCR request", file_count=len(files), language=language)
         
@@ -221,18 +433,8 @@ async def process_ocr_batch(
         if len(files) > settings.MAX_BATCH_SIZE:
             raise HTTPException(status_code=400, detail=f"Too many files. Maximum {settings.MAX_BATCH_SIZE} allowed")
         
-        # Process files in parallel
-        tasks = []
-        for file in files:
-            file_content = await file.read()
-            task = ocr_svc.process_document(
-                file_content=file_content,
-                filename=file.filename,
-                language=language
-            )
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Spool and OCR files as a pipeline so OCR starts before every file is read
+        results = await run_ocr_pipeline(files, language, ocr_svc)
         
         # Handle exceptions and create response
         responses = []
@@ -258,6 +460,8 @@ async def process_ocr_batch(
         
         return responses
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Batch OCR processing failed", error=str(e))
         raise HTTPException(status_code=500, detail=f"Batch OCR processing failed: {str(e)}")
@@ -268,8 +472,10 @@ async def classify_document(
     request: ClassificationRequest,
     background_tasks: BackgroundTasks = BackgroundTasks(),
     classification_svc: ClassificationService = Depends(get_classification_service),
+    _cache_control=Depends(cache_control),
+    _latency_tier=Depends(latency_tier),
     current_user=Depends(verify_token),
-    _rate_limit=Depends(lambda: rate_limiter.check_rate_limit)
+    _rate_limit=Depends(enforce_rate_limit)
 ):
     """Classify document content using AI models."""
     try:
@@ -282,7 +488,7 @@ async def classify_document(
         
         # Log processing in background
         background_tasks.add_task(
-            document_service.log_processing,
+            traced("log_write", document_service.log_processing),
             user_id=current_user["user_id"],
             document_id=request.document_id,
             processing_type="CLASSIFICATION",
@@ -295,14 +501,71 @@ async def classify_document(
         logger.error("Classification failed", error=str(e), document_id=request.document_id)
         raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
 
+class BatchClassificationRequest(BaseModel):
+    """Documents to classify in a single streaming batch."""
+    documents: List[ClassificationRequest]
+
+@app.post("/classify/batch")
+async def classify_batch(
+    request: BatchClassificationRequest,
+    pack: Optional[bool] = None,
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    classification_svc: ClassificationService = Depends(get_classification_service),
+    _cache_control=Depends(cache_control),
+    _latency_tier=Depends(latency_tier),
+    current_user=Depends(verify_token),
+    _rate_limit=Depends(enforce_rate_limit)
+):
+    """
+    Classify multiple documents, streaming results as newline-delimited JSON.
+    Each line is emitted as soon as its document finishes and carries its document_index.
+    Set ``pack`` to classify several short documents per model request.
+    """
+    logger.info("Processing batch classification request", document_count=len(request.documents))
+    
+    if len(request.documents) > settings.MAX_CLASSIFY_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many documents. Maximum {settings.MAX_CLASSIFY_BATCH_SIZE} allowed"
+        )
+    
+    documents = [{"content": doc.content, "metadata": doc.metadata} for doc in request.documents]
+    document_ids = [doc.document_id for doc in request.documents]
+    summaries = []
+    
+    async def stream_results():
+        async for result in classification_svc.iter_batch_classify(documents, pack=pack):
+            result["document_id"] = document_ids[result["document_index"]]
+            # Keep only a compact summary for the processing log, not the full result
+            summaries.append({
+                "document_index": result["document_index"],
+                "document_id": result["document_id"],
+                "success": result.get("success", True),
+                "primary_category": result.get("primary_category")
+            })
+            yield json.dumps(result, default=str) + "\n"
+    
+    # Runs once the stream has been fully sent
+    background_tasks.add_task(
+        document_service.log_batch_processing,
+        user_id=current_user["user_id"],
+        filenames=document_ids,
+        processing_type="CLASSIFICATION_BATCH",
+        results=summaries
+    )
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 # Content Extraction Endpoints
 @app.post("/extract/content", response_model=ExtractionResponse)
 async def extract_content(
     request: ExtractionRequest,
     background_tasks: BackgroundTasks = BackgroundTasks(),
     extraction_svc: ExtractionService = Depends(get_extraction_service),
+    _cache_control=Depends(cache_control),
+    _latency_tier=Depends(latency_tier),
     current_user=Depends(verify_token),
-    _rate_limit=Depends(lambda: rate_limiter.check_rate_limit)
+    _rate_limit=Depends(enforce_rate_limit)
 ):
     """Extract structured information from document content."""
     try:
@@ -316,7 +579,7 @@ async def extract_content(
         
         # Log processing in background
         background_tasks.add_task(
-            document_service.log_processing,
+            traced("log_write", document_service.log_processing),
             user_id=current_user["user_id"],
             document_id=request.document_id,
             processing_type="EXTRACTION",
@@ -335,8 +598,10 @@ async def analyze_document(
     request: AnalysisRequest,
     background_tasks: BackgroundTasks = BackgroundTasks(),
     analysis_svc: AnalysisService = Depends(get_analysis_service),
+    _cache_control=Depends(cache_control),
+    _latency_tier=Depends(latency_tier),
     current_user=Depends(verify_token),
-    _rate_limit=Depends(lambda: rate_limiter.check_rate_limit)
+    _rate_limit=Depends(enforce_rate_limit)
 ):
     """Perform comprehensive analysis of document content."""
     try:
@@ -350,7 +615,7 @@ async def analyze_document(
         
         # Log processing in background
         background_tasks.add_task(
-            document_service.log_processing,
+            traced("log_write", document_service.log_processing),
             user_id=current_user["user_id"],
             document_id=request.document_id,
             processing_type="ANALYSIS",
@@ -363,13 +628,167 @@ async def analyze_document(
         logger.error("Document analysis failed", error=str(e), document_id=request.document_id)
         raise HTTPException(status_code=500, detail=f"Document analysis failed: {str(e)}")
 
+async def stream_model_events(events, final_result: dict, include_tokens: bool = True):
+    """
+    Forward streamed model events, re-tagging token deltas and keeping the final result.
+    
+    If the stream fails, the error is kept in ``final_result`` so the
+    processing log records it instead of an empty result.
+    """
+    try:
+        async for event, data in events:
+            if event == "token":
+                if include_tokens:
+                    yield "token", {"text": data}
+            else:
+                if event == "result":
+                    final_result.update(data)
+                yield event, data
+    except Exception as e:
+        final_result.clear()
+        final_result.update(success=False, error=str(e))
+        raise
+
+@app.post("/classify/document/stream")
+async def classify_document_stream(
+    request: ClassificationRequest,
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    classification_svc: ClassificationService = Depends(get_classification_service),
+    _latency_tier=Depends(latency_tier),
+    current_user=Depends(verify_token),
+    _rate_limit=Depends(enforce_rate_limit)
+):
+    """
+    Stream a document classification as server-sent events.
+    Emits ``field``/``item`` events as each classification field completes and a final ``result`` event.
+    """
+    logger.info("Processing streaming classification", document_id=request.document_id)
+    
+    final_result = {}
+    events = classification_svc.stream_classify(
+        content=request.content,
+        metadata=request.metadata
+    )
+    
+    background_tasks.add_task(
+        document_service.log_processing,
+        user_id=current_user["user_id"],
+        document_id=request.document_id,
+        processing_type="CLASSIFICATION",
+        result=final_result
+    )
+    
+    return sse_response(stream_model_events(events, final_result, include_tokens=False))
+
+@app.post("/extract/content/stream")
+async def extract_content_stream(
+    request: ExtractionRequest,
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    client: OpenRouterClient = Depends(get_openrouter_client),
+    _latency_tier=Depends(latency_tier),
+    current_user=Depends(verify_token),
+    _rate_limit=Depends(enforce_rate_limit)
+):
+    """
+    Stream content extraction as server-sent events.
+    Emits ``field`` events per completed field, ``item`` events per entity and a final ``result`` event.
+    """
+    logger.info("Processing streaming content extraction", document_id=request.document_id)
+    
+    final_result = {}
+    events = client.stream_extraction(
+        content=request.content,
+        extraction_types=request.extraction_types
+    )
+    
+    background_tasks.add_task(
+        document_service.log_processing,
+        user_id=current_user["user_id"],
+        document_id=request.document_id,
+        processing_type="EXTRACTION",
+        result=final_result
+    )
+    
+    return sse_response(stream_model_events(events, final_result, include_tokens=False))
+
+@app.post("/analyze/document/stream")
+async def analyze_document_stream(
+    request: AnalysisRequest,
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    client: OpenRouterClient = Depends(get_openrouter_client),
+    _latency_tier=Depends(latency_tier),
+    current_user=Depends(verify_token),
+    _rate_limit=Depends(enforce_rate_limit)
+):
+    """
+    Stream a document analysis as server-sent events.
+    Emits ``token`` events as text arrives, ``field``/``item`` events as each analysis
+    field completes, and a final ``result`` event with the parsed analysis.
+    """
+    logger.info("Processing streaming document analysis", document_id=request.document_id)
+    
+    final_result = {}
+    events = client.stream_analysis(
+        content=request.content,
+        analysis_types=request.analysis_types
+    )
+    
+    # Runs once the stream has been fully sent
+    background_tasks.add_task(
+        document_service.log_processing,
+        user_id=current_user["user_id"],
+        document_id=request.document_id,
+        processing_type="ANALYSIS",
+        result=final_result
+    )
+    
+    return sse_response(stream_model_events(events, final_result))
+
+class SummaryRequest(BaseModel):
+    """Document content to summarize."""
+    content: str
+    document_id: Optional[str] = None
+    max_length: Optional[int] = None
+
+@app.post("/summarize/stream")
+async def summarize_stream(
+    request: SummaryRequest,
+    background_tasks: BackgroundTasks = BackgroundTasks(),
+    client: OpenRouterClient = Depends(get_openrouter_client),
+    _latency_tier=Depends(latency_tier),
+    current_user=Depends(verify_token),
+    _rate_limit=Depends(enforce_rate_limit)
+):
+    """
+    Stream a document summary as server-sent events.
+    Emits ``token`` events as text arrives and a final ``result`` event with the full summary.
+    """
+    logger.info("Processing streaming summary", document_id=request.document_id)
+    
+    final_result = {}
+    events = client.stream_summary(
+        content=request.content,
+        max_length=request.max_length
+    )
+    
+    background_tasks.add_task(
+        document_service.log_processing,
+        user_id=current_user["user_id"],
+        document_id=request.document_id,
+        processing_type="SUMMARY",
+        result=final_result
+    )
+    
+    return sse_response(stream_model_events(events, final_result))
+
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     logger.error("HTTP exception", status_code=exc.status_code, detail=exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail}
+        content={"error": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
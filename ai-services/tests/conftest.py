@@ -0,0 +1,47 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, List
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.openrouter_client import OpenRouterClient
+from app.utils.cache import ResultCache
+
+
+def completion(content: str, model: str) -> Dict[str, Any]:
+    return {
+        "id": "gen-test",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    }
+
+
+class Upstream:
+    """OpenRouter stand-in on ``httpx.MockTransport``; ``reply`` maps a request payload to the reply text."""
+
+    def __init__(self):
+        self.reply: Callable[[Dict[str, Any]], str] = lambda payload: "{}"
+        self.delays: Dict[str, float] = {}
+        self.requests: List[Dict[str, Any]] = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        self.requests.append(payload)
+        delay = self.delays.get(payload["model"])
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(200, json=completion(self.reply(payload), payload["model"]))
+
+    def client(self, max_entries: int = 100) -> OpenRouterClient:
+        http_client = httpx.AsyncClient(base_url=settings.OPENROUTER_BASE_URL, transport=httpx.MockTransport(self.handle))
+        return OpenRouterClient(http_client=http_client, cache=ResultCache(max_entries=max_entries, redis_enabled=False))
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    # The shared upstream limiter's primitives belong to one event loop; each test runs its own
+    monkeypatch.setattr(settings, "UPSTREAM_RATE_LIMIT_ENABLED", False)
+    return Upstream()
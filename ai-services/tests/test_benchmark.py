@@ -0,0 +1,19 @@
+import asyncio
+
+from benchmarks.documents import DocumentFactory
+from benchmarks.mock_openrouter import LATENCY_PROFILES, MockOpenRouter
+from benchmarks.run import SCENARIOS, offline_client, run_scenario
+
+
+def test_one_benchmark_iteration_against_mock_openrouter():
+    transport = MockOpenRouter(latency=LATENCY_PROFILES["instant"])
+
+    async def main():
+        async with offline_client(transport) as client:
+            return await run_scenario(client, SCENARIOS["classify"], 1, 2, DocumentFactory(), {})
+
+    result = asyncio.run(main())
+    assert result.errors == 0
+    assert result.requests == 2
+    assert result.rps > 0
+    assert transport.stats
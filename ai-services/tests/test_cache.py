@@ -0,0 +1,92 @@
+import asyncio
+
+from app.utils import cache as cache_module
+from app.utils.cache import ResultCache
+
+MODEL = "openai/gpt-3.5-turbo"
+MESSAGES = [{"role": "user", "content": "Classify this invoice"}]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2, ttl_seconds=60, redis_enabled=False)
+
+    async def main():
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        await cache.get("a")  # a becomes the most recently used
+        await cache.set("c", {"v": 3})
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(main()) == [{"v": 1}, None, {"v": 3}]
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["memory_hits"] == 3
+    assert cache.stats["misses"] == 1
+
+
+def test_expired_entry_misses(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ResultCache(max_entries=10, ttl_seconds=60, redis_enabled=False)
+
+    async def main():
+        await cache.set("a", {"v": 1})
+        fresh = await cache.get("a")
+        now[0] += 61
+        return fresh, await cache.get("a")
+
+    assert asyncio.run(main()) == ({"v": 1}, None)
+
+
+def test_identical_requests_are_served_from_the_cache(upstream):
+    upstream.reply = lambda payload: "ok"
+    client = upstream.client()
+
+    async def main():
+        first = await client.cached_chat_completion(MODEL, MESSAGES, max_tokens=50)
+        second = await client.cached_chat_completion(MODEL, MESSAGES, max_tokens=50)
+        other = await client.cached_chat_completion(MODEL, MESSAGES, max_tokens=60)
+        return first, second, other
+
+    first, second, other = asyncio.run(main())
+    assert first == second
+    assert len(upstream.requests) == 2
+    assert client.cache.stats["memory_hits"] == 1
+    assert client.cache.stats["misses"] == 2
+
+
+def test_cache_can_be_bypassed(upstream):
+    client = upstream.client()
+
+    async def main():
+        for _ in range(2):
+            await client.cached_chat_completion(MODEL, MESSAGES, use_cache=False)
+
+    asyncio.run(main())
+    assert len(upstream.requests) == 2
+    assert client.cache.stats["writes"] == 0
+
+
+def test_rejected_reply_is_not_cached(upstream):
+    client = upstream.client()
+
+    async def main():
+        for _ in range(2):
+            await client.cached_chat_completion(MODEL, MESSAGES, cache_if=lambda response: False)
+
+    asyncio.run(main())
+    assert len(upstream.requests) == 2
+    assert client.cache.stats["writes"] == 0
+
+
+def test_eviction_sends_the_request_upstream_again(upstream):
+    client = upstream.client(max_entries=1)
+    other = [{"role": "user", "content": "Classify this contract"}]
+
+    async def main():
+        await client.cached_chat_completion(MODEL, MESSAGES)
+        await client.cached_chat_completion(MODEL, other)
+        await client.cached_chat_completion(MODEL, MESSAGES)
+
+    asyncio.run(main())
+    assert len(upstream.requests) == 3
+    assert client.cache.stats["evictions"] == 2
@@ -0,0 +1,66 @@
+import gzip
+import json
+
+import pytest
+
+from app.utils import cassette
+from app.utils.cassette import CassetteRecorder, build_record, content_hash, scrub, scrub_reply
+from app.utils.json_output import extract_json
+
+
+@pytest.fixture(autouse=True)
+def hash_key(monkeypatch):
+    monkeypatch.setattr(cassette, "_hash_key", b"test-key")
+
+
+def completion(content):
+    return json.dumps({
+        "model": "openai/gpt-3.5-turbo",
+        "choices": [{"message": {"content": content}}],
+        "usage": {"total_tokens": 120}
+    }).encode("utf-8")
+
+
+def test_schema_keys_are_kept_and_values_scrubbed():
+    scrubbed = scrub({"primary_category": "Legal", "confidence": 0.87, "tags": ["nda"]})
+    assert scrubbed == {"primary_category": "lorem", "confidence": 0.1, "tags": ["lor"]}
+
+
+def test_unknown_keys_are_hashed():
+    scrubbed = scrub({"structured_data": {"patient_name": "Jane Smith", "ssn_123-45-6789": True}})
+    assert set(scrubbed) == {"structured_data"}
+    assert set(scrubbed["structured_data"]) == {content_hash("patient_name"), content_hash("ssn_123-45-6789")}
+    # The same key hashes the same way, so repeated shapes still line up
+    assert scrub({"patient_name": 1}) == {content_hash("patient_name"): 1}
+
+
+def test_reply_keeps_its_length():
+    reply = 'Here you go: {"summary": "Short", "insights": []}'
+    assert len(scrub_reply(reply)) == len(reply)
+
+
+def test_recorded_reply_with_sensitive_key(tmp_path):
+    reply = json.dumps({
+        "entities": [{"text": "Jane Smith", "type": "person"}],
+        "structured_data": {"Jane Smith diagnosis": "hypertension"}
+    })
+    payload = {
+        "model": "openai/gpt-3.5-turbo",
+        "messages": [{"role": "system", "content": "extract"}, {"role": "user", "content": "Jane Smith ..."}]
+    }
+    recorder = CassetteRecorder(str(tmp_path))
+    recorder._write([dict(payload=payload, started_at=1.0, ttfb=0.1, duration=0.2, status=200, body=completion(reply))])
+
+    with gzip.open(recorder.path, "rt", encoding="utf-8") as f:
+        raw = f.read()
+    assert "Jane" not in raw and "diagnosis" not in raw and "hypertension" not in raw
+
+    record = json.loads(raw)
+    content = extract_json(record["response"]["content"])
+    assert set(content["structured_data"]) == {content_hash("Jane Smith diagnosis")}
+    assert set(content["entities"][0]) == {"text", "type"}
+
+
+def test_failed_call_keeps_retry_after():
+    record = build_record({"messages": []}, started_at=1.0, ttfb=0.05, duration=0.05, status=429, retry_after="2")
+    assert record["response"] == {"status": 429, "error": None, "retry_after": "2"}
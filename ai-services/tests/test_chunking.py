@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+from app.config import settings
+from app.utils.chunking import merge_partial_results, split_into_chunks
+
+SECTIONS = ["alpha", "bravo", "charlie"]
+
+
+def document(words_per_section: int = 20) -> str:
+    return "\n\n".join(
+        f"# {name.title()}\n\n" + " ".join([name] * words_per_section) + "."
+        for name in SECTIONS
+    )
+
+
+def test_short_text_is_one_chunk():
+    assert split_into_chunks("short text", 100) == ["short text"]
+
+
+def test_sections_stay_together_within_the_limit():
+    text = document()
+    chunks = split_into_chunks(text, 250)
+    assert all(len(chunk) <= 250 for chunk in chunks)
+    assert [chunk.split("\n", 1)[0] for chunk in chunks] == ["# Alpha", "# Bravo", "# Charlie"]
+    assert "\n\n".join(chunks) == text
+
+
+def test_oversized_paragraph_is_split_on_sentences():
+    paragraph = " ".join(f"Sentence number {i} ends here." for i in range(20))
+    chunks = split_into_chunks(paragraph, 100)
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == paragraph
+
+
+def test_partial_results_are_merged():
+    merged = merge_partial_results([
+        {
+            "summary": "First part.",
+            "topics": ["Billing", "payments"],
+            "entities": [{"text": "Acme", "type": "organization"}],
+            "readability": 0.4,
+            "sentiment": "neutral",
+            "structured_data": {"invoice_number": "INV-1"},
+        },
+        {
+            "summary": "Second part.",
+            "topics": ["billing", "late fees"],
+            "entities": [{"text": "ACME ", "type": "organization"}, {"text": "Jane", "type": "person"}],
+            "readability": 0.8,
+            "sentiment": "neutral",
+            "structured_data": {"due_date": "2024-03-31"},
+        },
+        {"summary": "Third part.", "sentiment": "negative", "readability": None},
+    ])
+
+    assert merged["summary"] == "First part.\n\nSecond part.\n\nThird part."
+    assert merged["topics"] == ["Billing", "payments", "late fees"]
+    assert [e["text"] for e in merged["entities"]] == ["Acme", "Jane"]
+    assert merged["readability"] == pytest.approx(0.6)
+    assert merged["sentiment"] == "neutral"
+    assert merged["structured_data"] == {"invoice_number": "INV-1", "due_date": "2024-03-31"}
+
+
+def test_long_analysis_is_mapped_per_chunk_and_summaries_reduced(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_MAX_CHARS", 250)
+
+    def reply(payload):
+        system, user = payload["messages"][0]["content"], payload["messages"][-1]["content"]
+        if "summarizer" in system:
+            return "One summary of the whole document."
+        section = next(name for name in SECTIONS if name in user)
+        return json.dumps({
+            "summary": f"About {section}.",
+            "insights": [section],
+            "sentiment": "neutral",
+            "topics": [section, "shared"],
+            "recommendations": []
+        })
+
+    upstream.reply = reply
+    client = upstream.client()
+
+    result = asyncio.run(client.analyze_content(document(), ["summary", "topics"], model="openai/gpt-3.5-turbo"))
+
+    assert result["summary"] == "One summary of the whole document."
+    assert result["topics"] == ["alpha", "shared", "bravo", "charlie"]
+    assert result["insights"] == SECTIONS
+    # One request per chunk plus the summary reduction
+    assert len(upstream.requests) == len(SECTIONS) + 1
@@ -0,0 +1,116 @@
+import pytest
+
+from app.utils import circuit_breaker as circuit_breaker_module
+from app.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def fail(breaker: CircuitBreaker, error: Exception = RuntimeError("upstream down"), is_failure=lambda e: True):
+    with pytest.raises(type(error)):
+        with breaker.call(is_failure):
+            raise error
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("m", failure_threshold=3, reset_timeout=30)
+    fail(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.is_open
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        with breaker.call():
+            pass
+    assert excinfo.value.retry_after == 30
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("m", failure_threshold=2, reset_timeout=30)
+    fail(breaker)
+    with breaker.call():
+        pass
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_trial(clock):
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=30)
+    fail(breaker)
+
+    clock.now += 30
+    assert not breaker.is_open
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one trial at a time
+    assert not breaker.allow()
+    assert breaker.is_open
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker("m", failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        fail(breaker)
+
+    clock.now += 31
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.retry_after == 30
+
+
+def test_non_failures_count_as_success(clock):
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=30)
+    fail(breaker, ValueError("bad request"), is_failure=lambda e: False)
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+def test_cancelled_trial_releases_the_slot(clock):
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=30)
+    fail(breaker)
+    clock.now += 30
+
+    with pytest.raises(GeneratorExit):
+        with breaker.call():
+            raise GeneratorExit()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_registry_shares_breakers_per_model(clock):
+    registry = CircuitBreakerRegistry()
+    assert not registry.is_open("m")
+    assert registry.get("m") is registry.get("m")
+
+    breaker = registry.get("m")
+    breaker.failure_threshold = 1
+    fail(breaker)
+    assert registry.is_open("m")
+    assert not registry.is_open("other")
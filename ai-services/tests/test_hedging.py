@@ -0,0 +1,49 @@
+import asyncio
+
+from app.config import settings
+from app.utils.hedging import HedgeBudget
+
+PRIMARY = "anthropic/claude-3-haiku"
+MESSAGES = [{"role": "user", "content": "Summarise this report"}]
+
+
+def test_budget_is_exhausted_after_its_burst():
+    budget = HedgeBudget(ratio=0.5, burst=2)
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    budget.record_request()
+    assert not budget.try_acquire()
+    budget.record_request()
+    assert budget.try_acquire()
+    assert budget.stats == {"granted": 3, "denied": 2}
+
+
+def test_quiet_period_saves_at_most_the_burst():
+    budget = HedgeBudget(ratio=1, burst=1)
+    for _ in range(10):
+        budget.record_request()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+
+def test_slow_primary_is_hedged_until_the_budget_runs_out(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "HEDGING_ENABLED", True)
+    fallback = settings.HEDGE_FALLBACK_MODELS[PRIMARY]
+    upstream.reply = lambda payload: payload["model"]
+    upstream.delays[PRIMARY] = 0.2
+    client = upstream.client()
+    client.hedge_budget = HedgeBudget(ratio=0, burst=1)
+    monkeypatch.setattr(client, "_hedge_delay", lambda model: 0.01)
+
+    async def main():
+        hedged = await client.chat_completion(PRIMARY, MESSAGES)
+        exhausted = await client.chat_completion(PRIMARY, MESSAGES)
+        return hedged, exhausted
+
+    hedged, exhausted = asyncio.run(main())
+    assert hedged["model"] == fallback
+    assert exhausted["model"] == PRIMARY
+    assert client.hedge_budget.stats == {"granted": 1, "denied": 1}
+    assert [r["model"] for r in upstream.requests] == [PRIMARY, fallback, PRIMARY]
@@ -0,0 +1,65 @@
+import json
+
+from app.utils.incremental_json import IncrementalJSONParser
+
+REPLY = {
+    "primary_category": "Legal",
+    "confidence": 0.9,
+    "tags": ["contract", "nda"],
+    "entities": [{"text": "Acme {Corp}", "type": "organization"}, {"text": "say \"hi\"", "type": "quote"}],
+    "metadata": {"pages": [1, 2]},
+    "action_required": False,
+}
+
+
+def feed_all(chunks):
+    parser = IncrementalJSONParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    return parser, events
+
+
+def test_fields_and_items_in_order():
+    parser, events = feed_all([json.dumps(REPLY)])
+
+    assert parser.done
+    assert [e for e in events if e[0] == "field"] == [("field", k, v) for k, v in REPLY.items()]
+    assert [e for e in events if e[0] == "item"] == [
+        ("item", "tags", 0, "contract"),
+        ("item", "tags", 1, "nda"),
+        ("item", "entities", 0, REPLY["entities"][0]),
+        ("item", "entities", 1, REPLY["entities"][1]),
+    ]
+
+
+def test_character_by_character_matches_whole_text():
+    text = json.dumps(REPLY, indent=2)
+    assert feed_all(list(text))[1] == feed_all([text])[1]
+
+
+def test_field_is_emitted_as_soon_as_it_completes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"primary_category": "Le') == []
+    assert parser.feed('gal", "tags": ["a"') == [("field", "primary_category", "Legal")]
+    assert parser.feed(", ") == [("item", "tags", 0, "a")]
+
+
+def test_prose_and_fence_around_object_are_ignored():
+    text = "Here is the result:\n```json\n" + json.dumps({"a": 1}) + "\n```\n{\"b\": 2}"
+    parser, events = feed_all([text])
+    assert events == [("field", "a", 1)]
+    assert parser.done
+
+
+def test_unparseable_value_is_skipped():
+    _, events = feed_all(['{"a": tru, "b": 2}'])
+    assert events == [("field", "b", 2)]
+
+
+def test_truncated_stream_emits_only_complete_values():
+    text = json.dumps(REPLY)
+    parser, events = feed_all([text[:text.index('"entities"') + 30]])
+    assert not parser.done
+    assert ("field", "tags", ["contract", "nda"]) in events
+    assert not any(e[1] == "entities" for e in events)
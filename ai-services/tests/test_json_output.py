@@ -0,0 +1,122 @@
+import json
+import time
+
+from app.utils.json_output import JsonReply, extract_json, parse_json_reply
+
+
+def test_extract_bare_json():
+    assert extract_json('{"a": 1}') == {"a": 1}
+
+
+def test_extract_from_code_fence():
+    text = 'Here you go:\n```json\n{"primary_category": "Legal"}\n```\nThanks'
+    assert extract_json(text, dict) == {"primary_category": "Legal"}
+
+
+def test_extract_expected_object_skips_earlier_array_in_prose():
+    text = 'Based on section [1] of the contract: {"primary_category": "Legal"}'
+    assert extract_json(text, dict) == {"primary_category": "Legal"}
+
+
+def test_extract_prose_prefixed_array_of_objects():
+    text = 'Here you go: [{"primary_category": "Legal"}, {"primary_category": "Finance"}]'
+    expected = [{"primary_category": "Legal"}, {"primary_category": "Finance"}]
+    assert extract_json(text) == expected
+    assert extract_json(text, list) == expected
+    assert extract_json(text, dict) is None
+
+
+def test_extract_skips_bracketed_prose_that_is_not_json():
+    assert extract_json('See [appendix A] for details: {"a": 1}') == {"a": 1}
+
+
+def test_extract_expected_list():
+    assert extract_json('Tags: ["a", "b"] as requested', list) == ["a", "b"]
+
+
+def test_extract_truncated_reply_returns_none_not_nested_object():
+    full = json.dumps({"entities": [{"text": f"Acme {i}", "type": "organization"} for i in range(3)]})
+    truncated = "Result: " + full[:-10]
+    assert extract_json(truncated) is None
+    assert extract_json(truncated, dict) is None
+
+
+def test_extract_whole_reply_of_wrong_type_is_rejected():
+    assert extract_json('[{"a": 1}]', dict) is None
+
+
+def test_extract_large_truncated_reply_is_linear():
+    entities = [{"text": f"Acme {i}", "type": "organization"} for i in range(2000)]
+    truncated = "Here: " + json.dumps({"entities": entities})[:20000]
+    started = time.perf_counter()
+    assert extract_json(truncated, dict) is None
+    assert time.perf_counter() - started < 1
+
+
+def test_extract_empty():
+    assert extract_json("") is None
+    assert extract_json("no json here") is None
+
+
+def test_parse_json_reply_checks_type():
+    assert parse_json_reply('{"a": 1}', "test") == {"a": 1}
+    assert parse_json_reply('["a"]', "test") is None
+    assert parse_json_reply('["a"]', "test", expected=list) == ["a"]
+    assert parse_json_reply(None, "test") is None
+
+
+def test_json_reply_parses_once(monkeypatch):
+    calls = []
+
+    def counting_parse(text, task, expected=dict):
+        calls.append(text)
+        return parse_json_reply(text, task, expected)
+
+    monkeypatch.setattr("app.utils.json_output.parse_json_reply", counting_parse)
+    reply = JsonReply("classification")
+    response = {"choices": [{"message": {"content": '{"primary_category": "Legal"}'}}]}
+
+    assert reply.cacheable(response)
+    assert reply.parse(response["choices"][0]["message"]["content"]) == {"primary_category": "Legal"}
+    assert len(calls) == 1
+
+
+def test_json_reply_not_cacheable():
+    reply = JsonReply("classification")
+    assert not reply.cacheable({"choices": [{"message": {"content": "I cannot help with that"}}]})
+    assert not reply.cacheable({"choices": []})
+
+
+def test_response_format_without_catalog_entry_uses_json_object(monkeypatch):
+    from app.utils.json_output import CLASSIFICATION_SCHEMA, response_format_for
+    from app.utils.tokens import ModelCatalog
+
+    monkeypatch.setattr("app.utils.json_output.model_catalog", ModelCatalog())
+    assert response_format_for("openai/unknown-model", "classification", CLASSIFICATION_SCHEMA) == {"type": "json_object"}
+    assert response_format_for("anthropic/unknown-model", "classification", CLASSIFICATION_SCHEMA) is None
+
+
+def test_response_format_follows_catalog(monkeypatch):
+    from app.utils.json_output import CLASSIFICATION_SCHEMA, response_format_for
+    from app.utils.tokens import ModelCatalog
+
+    catalog = ModelCatalog()
+    catalog.update_from_models([
+        {"id": "openai/gpt-3.5-turbo", "supported_parameters": ["response_format"]},
+        {"id": "openai/gpt-4o", "supported_parameters": ["response_format", "structured_outputs"]},
+        {"id": "anthropic/claude-3-haiku", "supported_parameters": ["temperature"]},
+    ])
+    monkeypatch.setattr("app.utils.json_output.model_catalog", catalog)
+
+    assert response_format_for("openai/gpt-3.5-turbo", "classification", CLASSIFICATION_SCHEMA) == {"type": "json_object"}
+    schema_format = response_format_for("openai/gpt-4o", "classification", CLASSIFICATION_SCHEMA)
+    assert schema_format["type"] == "json_schema"
+    assert schema_format["json_schema"]["schema"] is CLASSIFICATION_SCHEMA
+    assert response_format_for("anthropic/claude-3-haiku", "classification", CLASSIFICATION_SCHEMA) is None
+
+
+def test_response_format_disabled(monkeypatch):
+    from app.utils.json_output import response_format_for, settings
+
+    monkeypatch.setattr(settings, "STRUCTURED_OUTPUT_ENABLED", False)
+    assert response_format_for("openai/gpt-4o", "classification", None) is None
@@ -0,0 +1,20 @@
+import asyncio
+
+from benchmarks.mock_openrouter import MockOpenRouter
+from benchmarks.run import offline_client
+
+
+def test_oversized_upload_is_refused_with_cors_headers():
+    origin = "http://localhost:3000"
+
+    async def main():
+        async with offline_client(MockOpenRouter()) as client:
+            return await client.post(
+                "/ocr/process",
+                content=b"x",
+                headers={"Origin": origin, "Content-Length": str(10 ** 10), "Content-Type": "multipart/form-data"}
+            )
+
+    response = asyncio.run(main())
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == origin
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.openrouter_client import OpenRouterClient
+
+
+def test_entries_are_ordered_by_document_number():
+    parsed = [
+        {"document_number": 2, "primary_category": "Legal"},
+        {"document_number": 1, "primary_category": "Financial"},
+    ]
+    assert OpenRouterClient._packed_classifications(parsed, 2) == [
+        {"primary_category": "Financial"},
+        {"primary_category": "Legal"},
+    ]
+    # The parsed reply is left untouched
+    assert parsed[0]["document_number"] == 2
+
+
+def test_array_wrapped_in_an_object_is_unwrapped():
+    parsed = {"classifications": [{"primary_category": "HR"}]}
+    assert OpenRouterClient._packed_classifications(parsed, 1) == [{"primary_category": "HR"}]
+
+
+@pytest.mark.parametrize("parsed", [
+    [{"primary_category": "HR"}],
+    [{"primary_category": "HR"}, "Legal"],
+    {"primary_category": "HR"},
+    "HR",
+])
+def test_malformed_replies_are_rejected(parsed):
+    with pytest.raises(ValueError):
+        OpenRouterClient._packed_classifications(parsed, 2)
+
+
+def test_only_valid_packed_replies_are_cached(upstream):
+    replies = iter([
+        json.dumps([{"document_number": 1, "primary_category": "HR"}]),
+        json.dumps([{"document_number": 1, "primary_category": "HR"}, {"document_number": 2, "primary_category": "Legal"}]),
+    ])
+    upstream.reply = lambda payload: next(replies)
+    client = upstream.client()
+
+    async def main():
+        with pytest.raises(ValueError):
+            await client.classify_packed_content("Document 1 ...\nDocument 2 ...", 2)
+        first = await client.classify_packed_content("Document 1 ...\nDocument 2 ...", 2)
+        second = await client.classify_packed_content("Document 1 ...\nDocument 2 ...", 2)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == second == [{"primary_category": "HR"}, {"primary_category": "Legal"}]
+    assert len(upstream.requests) == 2
+    assert client.cache.stats["writes"] == 1
@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import rate_limiter as rate_limiter_module
+from app.utils.rate_limiter import RateLimiter
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incrby(self, key, amount):
+        self.commands.append(("incrby", key, amount))
+
+    def expire(self, key, seconds):
+        self.commands.append(("expire", key, seconds))
+
+    async def execute(self):
+        self.redis.clock.now += self.redis.latency
+        if self.redis.fail:
+            raise ConnectionError("redis down")
+        results = []
+        for command, key, value in self.commands:
+            if command == "incrby":
+                self.redis.counts[key] = self.redis.counts.get(key, 0) + value
+                results.append(self.redis.counts[key])
+            else:
+                results.append(True)
+        return results
+
+
+class FakeRedis:
+    def __init__(self, clock: Clock, latency: float = 0.0):
+        self.clock = clock
+        self.latency = latency
+        self.counts = {}
+        self.fail = False
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(6000.0)  # Start of a minute and of an hour window
+    monkeypatch.setattr(rate_limiter_module.time, "time", clock.time)
+    monkeypatch.setattr(rate_limiter_module.settings, "RATE_LIMIT_ENABLED", True)
+    return clock
+
+
+def allowed(limiter: RateLimiter, user: str = "u1") -> bool:
+    try:
+        asyncio.run(limiter.check_rate_limit(user))
+    except HTTPException as e:
+        assert e.status_code == 429
+        return False
+    return True
+
+
+def test_rejects_past_limit_with_retry_after(clock):
+    limiter = RateLimiter(per_minute=3, per_hour=100, redis_enabled=False)
+    assert [allowed(limiter) for _ in range(4)] == [True, True, True, False]
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(limiter.check_rate_limit("u1"))
+    assert excinfo.value.headers["Retry-After"] == "60"
+    assert allowed(limiter, "u2")
+
+
+def test_previous_window_is_weighted_by_overlap(clock):
+    limiter = RateLimiter(per_minute=10, per_hour=100, redis_enabled=False)
+    for _ in range(10):
+        assert allowed(limiter)
+
+    # Half way into the next minute, half of the previous 10 still count
+    clock.now += 90
+    assert [allowed(limiter) for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_old_windows_are_forgotten(clock):
+    limiter = RateLimiter(per_minute=1, per_hour=100, redis_enabled=False)
+    assert allowed(limiter)
+    clock.now += 120
+    assert allowed(limiter)
+
+
+def test_sync_adopts_cluster_totals(clock):
+    limiter = RateLimiter(per_minute=5, per_hour=100, redis_enabled=True)
+    redis = limiter._redis = FakeRedis(clock)
+    # Another worker already counted 4 requests in this minute
+    redis.counts["dms:ai:ratelimit:u1:60:100"] = 4
+
+    assert allowed(limiter)
+    asyncio.run(limiter.sync())
+
+    assert limiter._windows[("u1", 60)].current == 5
+    assert not limiter._pending
+    assert not allowed(limiter)
+
+
+def test_failed_sync_requeues_only_live_windows(clock):
+    limiter = RateLimiter(per_minute=5, per_hour=100, redis_enabled=True)
+    # The failing call takes long enough for the minute window to expire
+    redis = limiter._redis = FakeRedis(clock, latency=150)
+    redis.fail = True
+
+    assert allowed(limiter)
+    with pytest.raises(ConnectionError):
+        asyncio.run(limiter.sync())
+
+    assert dict(limiter._pending) == {("u1", 3600, 1): 1}
+
+    redis.fail = False
+    redis.latency = 0
+    asyncio.run(limiter.sync())
+    assert redis.counts == {"dms:ai:ratelimit:u1:3600:1": 1}
+
+
+def test_expired_pending_counts_are_pruned(clock):
+    limiter = RateLimiter(per_minute=5, per_hour=100, redis_enabled=True)
+    limiter._redis = FakeRedis(clock)
+    assert allowed(limiter)
+
+    clock.now += 7200
+    limiter._prune(clock.now)
+    assert not limiter._pending
+    assert not limiter._windows
+
+
+def test_idle_users_are_evicted_without_redis(clock):
+    limiter = RateLimiter(per_minute=5, per_hour=100, redis_enabled=False)
+    for user in ("u1", "u2", "u3"):
+        assert allowed(limiter, user)
+    assert len(limiter._windows) == 6
+
+    # Two hours later only the active user's windows remain
+    clock.now += 7200
+    assert allowed(limiter, "u4")
+    assert set(limiter._windows) == {("u4", 60), ("u4", 3600)}
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.utils.upstream_limiter import AdaptiveConcurrencyLimiter, LocalTokenBucket, UpstreamLimiter
+
+
+def make_limiter():
+    concurrency = AdaptiveConcurrencyLimiter(initial=4, minimum=1, maximum=10, latency_target=0.05)
+    return UpstreamLimiter(bucket=LocalTokenBucket(rate=1000, burst=1000), concurrency=concurrency)
+
+
+def test_slow_response_shrinks_the_limit():
+    limiter = make_limiter()
+
+    async def main():
+        async with limiter.slot("m"):
+            await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert limiter.concurrency.limit < 4
+
+
+def test_stream_is_timed_to_its_first_chunk():
+    limiter = make_limiter()
+
+    async def main():
+        async with limiter.slot("m") as upstream_slot:
+            upstream_slot.first_chunk()
+            # A slow downstream reader is not upstream latency
+            await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert limiter.concurrency.limit > 4
+    assert limiter.concurrency.in_flight == 0